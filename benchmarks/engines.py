@@ -0,0 +1,334 @@
+"""Benchmark suite of the hot path: `check_cells` and `GameEngine.process()` over a matrix of cases.
+
+The cases are every combination of the grid sizes, the initial fields
+(random soups of some densities and the patterns of `benchmarks.patterns`),
+the modes and the rules. The results are saved as JSON, `--compare` shows
+the change of the speed against the results of another commit.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime
+from itertools import product
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import click
+import numpy as np
+
+import src.misc.logs as lg
+from benchmarks.patterns import PATTERNS, parse_plaintext, place, soup
+from src.engines import GameEngine
+from src.engines.rules import compile_rule
+from src.misc.states import Backend, Mode, Rules
+from src.misc.type_aliases import Size
+
+SIZES = (256, 1024, 2048, 4096, 8192)
+DENSITIES = (0.05, 0.25, 0.5)
+KERNEL = "check_cells"  # The target which calls `check_cells` itself, the others are the backends of `GameEngine`
+
+
+class Case(NamedTuple):
+    """One measurement of the matrix.
+
+    Attributes:
+        target: `KERNEL` or the backend of `GameEngine`.
+        size: Width and height of the field.
+        start: The initial field: `soup-<density>` or the name of a pattern.
+        mode: Neighborhood of the cells.
+        rule: The rule of the game.
+
+    """
+
+    target: str
+    size: int
+    start: str
+    mode: Mode
+    rule: str
+
+    @property
+    def key(self) -> str:
+        """Name of the case in the results."""
+        return f"{self.target}/{self.size}/{self.start}/{self.mode.value}/{self.rule}"
+
+
+class Measurement(NamedTuple):
+    """Result of a case.
+
+    Attributes:
+        generations: Number of the timed generations.
+        seconds: Median time of a generation.
+        cells_per_second: Cells of the field calculated per second.
+        allocations: Memory allocations of numba (NRT) in a generation.
+        peak_bytes: Peak of the memory allocated by Python (`tracemalloc`) in a generation.
+        population: Number of the living cells after the last generation.
+
+    """
+
+    generations: int
+    seconds: float
+    cells_per_second: float
+    allocations: int
+    peak_bytes: int
+    population: int
+
+
+def initial_field(start: str, size: int, seed: int = 0) -> np.ndarray:
+    """The field of the case: `soup-<density>` or the name of a pattern placed in the center."""
+    if start.startswith("soup-"):
+        return soup(size, size, density=float(start.removeprefix("soup-")), seed=seed)
+    return place(PATTERNS[start], size, size)
+
+
+def _nrt_allocations() -> int:
+    """Number of the memory allocations of numba since its statistics were enabled (by the first call)."""
+    from numba.core.runtime import _nrt_python, rtsys  # type: ignore[attr-defined]  # noqa: PLC0415
+
+    if not _nrt_python.memsys_stats_enabled():
+        _nrt_python.memsys_enable_stats()
+    return int(rtsys.get_allocation_stats().alloc)
+
+
+def new_engine(case: Case, field: np.ndarray) -> GameEngine:
+    """A `GameEngine` for the case with the given field."""
+    engine = GameEngine(size=Size(width=case.size, height=case.size), backend=Backend(case.target), track_changes=False)
+    engine.mode = case.mode
+    engine.preset = case.rule
+    engine.load_field(field)
+    return engine
+
+
+def close_engine(engine: GameEngine) -> None:
+    """Stops the workers of the engine."""
+    if engine.stripe_pool is not None:
+        engine.stripe_pool.close()
+
+
+def _stepper(
+    case: Case,
+    field: np.ndarray,
+) -> tuple[Callable[[], object], Callable[[], np.ndarray], Callable[[], None]]:
+    """Functions which calculate a generation of the case, return the field and release the resources."""
+    if case.target != KERNEL:
+        engine = new_engine(case, field)
+        return engine.process, lambda: engine.field, lambda: close_engine(engine)
+
+    from src.engines.core import check_cells  # noqa: PLC0415
+
+    areas = [field, np.zeros_like(field)]
+    table = compile_rule(case.rule).table
+
+    def step() -> None:
+        areas[1], _cells = check_cells(areas[0], areas[1], case.size, case.size, table, case.mode.get_name())
+        areas.reverse()
+
+    return step, lambda: areas[0], lambda: None
+
+
+def measure(case: Case, generations: int, seed: int = 0) -> Measurement:
+    """Times the generations of the case one by one, after one generation which compiles the kernels.
+
+    One more generation counts the allocations, so `tracemalloc` does not
+    slow down the timed ones.
+    """
+    step, field, close = _stepper(case, initial_field(case.start, case.size, seed=seed))
+    try:
+        step()
+        times = []
+        for _ in range(generations):
+            start = time.perf_counter()
+            step()
+            times.append(time.perf_counter() - start)
+
+        allocations = _nrt_allocations()
+        tracemalloc.start()
+        step()
+        _current, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocations = _nrt_allocations() - allocations
+
+        population = int(np.count_nonzero(field() == 1))
+    finally:
+        close()
+
+    seconds = statistics.median(times)
+    return Measurement(
+        generations=generations,
+        seconds=seconds,
+        cells_per_second=case.size * case.size / seconds if seconds else 0.0,
+        allocations=allocations,
+        peak_bytes=peak_bytes,
+        population=population,
+    )
+
+
+def cases(
+    targets: list[str],
+    sizes: list[int],
+    starts: list[str],
+    modes: list[Mode],
+    rules: list[str],
+) -> Iterator[Case]:
+    """Every combination of the parameters, the patterns which do not fit into the size are skipped."""
+    for target, size, start, mode, rule in product(targets, sizes, starts, modes, rules):
+        if start in PATTERNS and max(parse_plaintext(PATTERNS[start].cells).shape) > size:
+            continue
+        yield Case(target=target, size=size, start=start, mode=mode, rule=rule)
+
+
+def _commit() -> str | None:
+    """The current commit of the repository, None outside of git."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def environment() -> dict[str, Any]:
+    """Where the results were measured."""
+    import numba  # noqa: PLC0415
+
+    return {
+        "commit": _commit(),
+        "date": datetime.now(tz=UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": numba.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def compare(results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]]) -> list[tuple[str, float]]:
+    """Speed of the cases relative to the baseline (> 1 is faster), for the cases present in both."""
+    return [
+        (key, result["cells_per_second"] / baseline[key]["cells_per_second"])
+        for key, result in results.items()
+        if key in baseline and baseline[key]["cells_per_second"]
+    ]
+
+
+def _validate_rules(_ctx: click.Context, _param: click.Parameter, value: tuple[str, ...]) -> tuple[str, ...]:
+    for rule in value:
+        try:
+            compile_rule(rule)
+        except ValueError as exc:
+            raise click.BadParameter(str(exc)) from exc
+    return value
+
+
+@click.command()
+@click.option(
+    "--target",
+    "targets",
+    type=click.Choice([KERNEL] + [backend.value for backend in Backend]),
+    multiple=True,
+    default=[KERNEL, Backend.NUMBA.value],
+    help="`check_cells` itself or a backend of `GameEngine.process()`.",
+)
+@click.option(
+    "--size",
+    "sizes",
+    type=click.Choice([str(size) for size in SIZES]),
+    multiple=True,
+    default=["256", "1024"],
+    help="Width and height of the field.",
+)
+@click.option("--density", "densities", type=float, multiple=True, default=DENSITIES, help="Density of a random soup.")
+@click.option(
+    "--pattern",
+    "patterns",
+    type=click.Choice(list(PATTERNS)),
+    multiple=True,
+    default=list(PATTERNS),
+    help="Pattern in the center of an empty field.",
+)
+@click.option(
+    "--mode",
+    "modes",
+    type=click.Choice([mode.value for mode in Mode]),
+    multiple=True,
+    default=[mode.value for mode in Mode],
+    help="Neighborhood of the cells.",
+)
+@click.option(
+    "--rule",
+    "rules",
+    multiple=True,
+    default=[rule.value for rule in Rules],
+    callback=_validate_rules,
+    help="Rule of the game, all the presets by default.",
+)
+@click.option("--generations", type=click.IntRange(min=1), default=20, help="Timed generations of every case.")
+@click.option("--seed", type=int, default=0, help="Seed of the random soups.")
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="JSON file for the results, `benchmarks/results/<commit>.json` by default.",
+)
+@click.option(
+    "--compare",
+    "baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="JSON results of another run to compare with.",
+)
+def main(  # noqa: PLR0913
+    targets: list[str],
+    sizes: list[str],
+    densities: list[float],
+    patterns: list[str],
+    modes: list[str],
+    rules: list[str],
+    generations: int,
+    seed: int,
+    output: Path | None,
+    baseline: Path | None,
+) -> None:
+    """Measures cells per second and allocations of every case and saves them as JSON."""
+    lg.init(log=False)
+
+    starts = [f"soup-{density:g}" for density in densities] + list(patterns)
+    matrix = list(cases(targets, [int(size) for size in sizes], starts, [Mode(mode) for mode in modes], rules))
+
+    results: dict[str, dict[str, Any]] = {}
+    print(f"{'case':<56} {'Mcells/s':>9} {'gen/s':>9} {'allocs':>7} {'peak, KiB':>10}")
+    for case in matrix:
+        try:
+            measurement = measure(case, generations=generations, seed=seed)
+        except ValueError as exc:  # The rule is not supported by the backend
+            print(f"{case.key:<56} skipped: {exc}")
+            continue
+        results[case.key] = {**case._asdict(), "mode": case.mode.value, **measurement._asdict()}
+        print(
+            f"{case.key:<56} {measurement.cells_per_second / 1e6:>9.1f} {1 / measurement.seconds:>9.1f} "
+            f"{measurement.allocations:>7} {measurement.peak_bytes / 1024:>10.1f}",
+        )
+
+    environment_ = environment()
+    output = output or Path(__file__).parent / "results" / f"{environment_['commit'] or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"environment": environment_, "results": results}, indent=2))
+    print(f"\nsaved to {output}")
+
+    if baseline is not None:
+        previous = json.loads(baseline.read_text())
+        print(f"\ncompared with {previous['environment']['commit']} (> 1 is faster)")
+        for key, ratio in compare(results, previous["results"]):
+            print(f"{key:<56} {ratio:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
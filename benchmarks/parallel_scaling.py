@@ -0,0 +1,23 @@
+"""Scaling report of the parallel backend: generations per second against the number of threads."""
+
+import click
+
+from src.engines.parallel import scaling_report
+
+
+@click.command()
+@click.option("--size", type=click.IntRange(min=1), default=1024, help="Width and height of the field.")
+@click.option("--generations", type=click.IntRange(min=1), default=20, help="Generations for each thread count.")
+def main(size: int, generations: int) -> None:
+    """Prints generations per second of `check_cells_parallel` for 1..N threads."""
+    report = scaling_report(size=size, generations=generations)
+    single = report[0][1]
+
+    print(f"field {size}x{size}, {generations} generations")
+    print(f"{'threads':>8} {'gen/s':>10} {'speedup':>8}")
+    for threads, rate in report:
+        print(f"{threads:>8} {rate:>10.2f} {rate / single:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
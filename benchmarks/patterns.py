@@ -0,0 +1,142 @@
+"""Corpus of the standard patterns of the game of Life (b3/s23) and random soups for the benchmarks."""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Pattern(NamedTuple):
+    """A pattern in the plaintext format: `O` is a living cell, `.` is a dead one.
+
+    Attributes:
+        name: Name of the pattern.
+        kind: What the pattern does: still life, oscillator, spaceship, methuselah or gun.
+        cells: Rows of the pattern.
+
+    """
+
+    name: str
+    kind: str
+    cells: str
+
+
+GLIDER = Pattern(
+    name="glider",
+    kind="spaceship",
+    cells="""
+.O.
+..O
+OOO
+""",
+)
+
+LWSS = Pattern(
+    name="lwss",
+    kind="spaceship",
+    cells="""
+.O..O
+O....
+O...O
+OOOO.
+""",
+)
+
+PULSAR = Pattern(
+    name="pulsar",
+    kind="oscillator",
+    cells="""
+..OOO...OOO..
+.............
+O....O.O....O
+O....O.O....O
+O....O.O....O
+..OOO...OOO..
+.............
+..OOO...OOO..
+O....O.O....O
+O....O.O....O
+O....O.O....O
+.............
+..OOO...OOO..
+""",
+)
+
+R_PENTOMINO = Pattern(
+    name="r-pentomino",
+    kind="methuselah",
+    cells="""
+.OO
+OO.
+.O.
+""",
+)
+
+ACORN = Pattern(
+    name="acorn",
+    kind="methuselah",
+    cells="""
+.O.....
+...O...
+OO..OOO
+""",
+)
+
+DIEHARD = Pattern(
+    name="diehard",
+    kind="methuselah",
+    cells="""
+......O.
+OO......
+.O...OOO
+""",
+)
+
+GOSPER_GUN = Pattern(
+    name="gosper-gun",
+    kind="gun",
+    cells="""
+........................O...........
+......................O.O...........
+............OO......OO............OO
+...........O...O....OO............OO
+OO........O.....O...OO..............
+OO........O...O.OO....O.O...........
+..........O.....O.......O...........
+...........O...O....................
+............OO......................
+""",
+)
+
+PATTERNS = {pattern.name: pattern for pattern in (GLIDER, LWSS, PULSAR, R_PENTOMINO, ACORN, DIEHARD, GOSPER_GUN)}
+
+
+def parse_plaintext(cells: str) -> np.ndarray:
+    """Matrix (uint8) of the pattern, the short rows are padded with dead cells."""
+    rows = [row for row in cells.strip().splitlines() if not row.startswith("!")]
+    field = np.zeros((len(rows), max(map(len, rows))), dtype=np.uint8)
+    for y, row in enumerate(rows):
+        field[y, : len(row)] = [char == "O" for char in row]
+    return field
+
+
+def place(pattern: Pattern, width: int, height: int) -> np.ndarray:
+    """A field of the size with the pattern in its center.
+
+    Raises:
+        ValueError: If the pattern does not fit into the field.
+    """
+    cells = parse_plaintext(pattern.cells)
+    rows, columns = cells.shape
+    if rows > height or columns > width:
+        msg = f"{pattern.name} ({columns}x{rows}) does not fit into {width}x{height}"
+        raise ValueError(msg)
+
+    field = np.zeros((height, width), dtype=np.uint8)
+    top, left = (height - rows) // 2, (width - columns) // 2
+    field[top : top + rows, left : left + columns] = cells
+    return field
+
+
+def soup(width: int, height: int, density: float, seed: int = 0) -> np.ndarray:
+    """A random field where every cell is alive with the probability `density`."""
+    return (np.random.default_rng(seed).random((height, width)) < density).astype(np.uint8)
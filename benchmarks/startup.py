@@ -0,0 +1,139 @@
+"""Startup cost: time to the first frame and generation of the game, and `python -X importtime` of the packages."""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import click
+
+from src.misc.states import Backend
+
+MODULES = ("src", "src.cli", "src.engines", "src.headless", "src.main")
+
+# Runs the startup of `run.py` in a fresh interpreter and reports the end of the first frame and generation
+FIRST_FRAME = """
+from src.cli import parse_argv
+from src.main import launch
+
+app = launch(parse_argv())
+frames = 0
+while app.engine.generation == 0:
+    app._handle_events()
+    app._process()
+    app._draw()
+    frames += 1
+    if frames == 1:
+        print("frame", flush=True)
+print("generation", frames, flush=True)
+"""
+
+
+class Startup(NamedTuple):
+    """Seconds from the start of the interpreter to the end of the first frame and of the first generation."""
+
+    frame: float
+    generation: float
+
+
+def import_time(module: str) -> float:
+    """Cumulative import time of the module in milliseconds, by `python -X importtime`."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:  # noqa: PLR2004
+            return int(fields[1]) / 1000
+    msg = f"no import time of {module!r}"
+    raise RuntimeError(msg)
+
+
+def first_frame(backend: Backend, env: dict[str, str], warm_up: bool = True) -> Startup:
+    """Starts the game and measures the time to its first frame and first generation."""
+    start = time.perf_counter()
+    process = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-c", FIRST_FRAME, "--backend", backend.value, "--warm-up" if warm_up else "--no-warm-up"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        env=env,
+    )
+    assert process.stdout is not None
+    frame = None
+    for line in process.stdout:
+        if line.startswith("frame"):
+            frame = time.perf_counter() - start
+        elif line.startswith("generation") and frame is not None:
+            process.wait()
+            return Startup(frame=frame, generation=time.perf_counter() - start)
+    msg = f"the game with the {backend.value} backend has not calculated a generation"
+    raise RuntimeError(msg)
+
+
+def median_startup(runs: list[Startup]) -> Startup:
+    """Median of every time of the runs."""
+    return Startup(*(statistics.median(times) for times in zip(*runs, strict=True)))
+
+
+@click.command()
+@click.option("--repeat", type=click.IntRange(min=1), default=3, help="Runs of every measurement, the median is shown.")
+@click.option(
+    "--backend",
+    "backends",
+    type=click.Choice([backend.value for backend in Backend]),
+    multiple=True,
+    default=[Backend.NUMBA.value, Backend.NUMPY.value],
+    help="Backends for the time to the first frame.",
+)
+@click.option("--display/--no-display", default=False, help="Use the real display instead of the dummy SDL driver.")
+@click.option("--warm-up/--no-warm-up", default=True, help="Compile the backend in the background (as the game does).")
+@click.option("--budget-cold", type=float, default=10.0, help="Seconds to the first generation with an empty cache.")
+@click.option("--budget-warm", type=float, default=2.0, help="Seconds to the first generation with a filled cache.")
+def main(  # noqa: PLR0913
+    repeat: int,
+    backends: list[str],
+    display: bool,
+    warm_up: bool,
+    budget_cold: float,
+    budget_warm: float,
+) -> None:
+    """Prints the import time of the packages and the time to the first frame and generation of the game.
+
+    A cold start has an empty cache of the compiled kernels (`NUMBA_CACHE_DIR`
+    is a new folder for every run), a warm start has the cache of a previous run.
+    """
+    print(f"{'module':<16} {'import, ms':>10}")
+    for module in MODULES:
+        print(f"{module:<16} {statistics.median(import_time(module) for _ in range(repeat)):>10.1f}")
+
+    env = dict(os.environ)
+    if not display:
+        env["SDL_VIDEODRIVER"] = "dummy"
+
+    print(f"\n{'backend':<14} {'start':<6} {'frame, s':>9} {'generation, s':>14} {'budget, s':>10}")
+    with tempfile.TemporaryDirectory() as cache:
+        for backend in backends:
+            cold = []
+            for run in range(repeat):
+                env["NUMBA_CACHE_DIR"] = str(Path(cache) / f"{backend}-{run}")
+                cold.append(first_frame(Backend(backend), env, warm_up=warm_up))
+            # The cache of the last cold run is filled now
+            warm = [first_frame(Backend(backend), env, warm_up=warm_up) for _ in range(repeat)]
+
+            for name, runs, budget in (("cold", cold, budget_cold), ("warm", warm, budget_warm)):
+                result = median_startup(runs)
+                status = "ok" if result.generation <= budget else "over"
+                times = f"{result.frame:>9.3f} {result.generation:>14.3f} {budget:>6.1f}"
+                print(f"{backend:<14} {name:<6} {times} {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
-from src import GameCellularAutomaton
+from src.cli import parse_argv
 
 
 def main() -> None:
     """Main func."""
-    GameCellularAutomaton.start()
+    argv = parse_argv()
+
+    # pygame, numba and the GUI are loaded only after the arguments are parsed
+    from src.main import start  # noqa: PLC0415
+
+    start(argv)
 
 
 if __name__ == "__main__":
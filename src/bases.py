@@ -1,13 +1,20 @@
-from abc import ABC, abstractmethod
+from __future__ import annotations
 
-import numpy as np
-import pygame as pg
-from pydantic import NonNegativeFloat, NonNegativeInt
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
 
-from src.misc.states import Mode, Rules, StateInit
-from src.misc.type_aliases import Resolution, ResultToDrawing
 from src.misc.utils import SingletonABC
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import numpy as np
+    import pygame as pg
+    from pydantic import NonNegativeFloat, NonNegativeInt
+
+    from src.misc.states import Mode, Rules, StateInit
+    from src.misc.type_aliases import Resolution, ResultToDrawing
+
 
 class RectBase(ABC):
     left: NonNegativeInt
@@ -102,8 +109,9 @@ class GUIBase(metaclass=SingletonABC):
         pass
 
 
-class GameEngineBase(metaclass=SingletonABC):
+class GameEngineBase(ABC):
     _mode: Mode
+    turbo: int
 
     @abstractmethod
     def init_area(self, state: StateInit) -> np.ndarray:
@@ -129,6 +137,11 @@ class GameEngineBase(metaclass=SingletonABC):
     def preset(self, value: Rules | str) -> None:
         pass
 
+    @property
+    @abstractmethod
+    def field(self) -> np.ndarray:
+        pass
+
     @abstractmethod
     def process(self) -> ResultToDrawing:
         pass
@@ -138,6 +151,7 @@ class AppBase(metaclass=SingletonABC):
     resolution: Resolution
 
     pause: bool
+    show_profile: bool
 
     screen: pg.SurfaceType
     clock: pg.time.Clock
@@ -149,6 +163,8 @@ class AppBase(metaclass=SingletonABC):
         self.resolution = res
         self.pause = pause
 
+        import pygame as pg  # noqa: PLC0415  # Only the window needs pygame, not the engine
+
         self.screen = pg.display.set_mode(self.resolution.values())
         self.clock = pg.time.Clock()
 
@@ -171,3 +187,11 @@ class AppBase(metaclass=SingletonABC):
     @abstractmethod
     def _run(self) -> None:
         pass
+
+    @abstractmethod
+    def save_snapshot(self) -> None:
+        pass
+
+    @abstractmethod
+    def change_engine(self, change: Callable[[GameEngineBase], object]) -> None:
+        pass
@@ -1,18 +1,199 @@
+import sys
+from pathlib import Path
+from typing import cast
+
 import click
+from loguru import logger
 
 from src import config
-from src.misc.states import ARGV, Mode
+from src.engines import TOPOLOGY_BACKENDS
+from src.engines.rules import compile_rule
+from src.misc.states import ARGV, PATTERN_SUFFIXES, PROFILE_FORMATS, Backend, Mode, Renderer, Topology
 
 default_argv = ARGV(logging=False, show_fps=True, mode=Mode.MOORE)
 
 
+def _validate_export(_ctx: click.Context, _param: click.Parameter, value: Path | None) -> Path | None:
+    if value is not None and value.suffix not in PROFILE_FORMATS:
+        msg = f"expected a {' or '.join(PROFILE_FORMATS)} file"
+        raise click.BadParameter(msg)
+    return value
+
+
+def validate_pattern(_ctx: click.Context, _param: click.Parameter, value: Path | None) -> Path | None:
+    """Checks that the pattern file has one of the known suffixes, the file itself is read later."""
+    if value is not None and value.suffix.lower() not in PATTERN_SUFFIXES:
+        msg = f"expected a {', '.join(PATTERN_SUFFIXES)} file"
+        raise click.BadParameter(msg)
+    return value
+
+
+def validate_rule(_ctx: click.Context, _param: click.Parameter, value: str | None) -> str | None:
+    """Checks that the rule can be compiled, None (the default rule) passes."""
+    if value is None:
+        return value
+    try:
+        compile_rule(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+    return value
+
+
+def check_topology(backend: Backend, topology: Topology) -> None:
+    """Checks that the backend can join the edges of the field.
+
+    Raises:
+        click.BadParameter: If the backend has dead edges only and the topology is another one.
+    """
+    if topology is not Topology.DEAD and backend not in TOPOLOGY_BACKENDS:
+        backends = " and ".join(sorted(backend.value for backend in TOPOLOGY_BACKENDS))
+        msg = f"the {backend.value} backend has dead edges only, {topology.value} needs {backends}"
+        raise click.BadParameter(msg, param_hint="'--topology'")
+
+
 @click.command()
 @click.version_option(version=config.MetaInfo.version, prog_name=config.WindowConfig.caption)
 @click.option(*config.CLI.Param.logging, is_flag=True, default=False, help=config.CLI.Docs.logging)
 @click.option(*config.CLI.Param.hide_fps, is_flag=True, default=True, help=config.CLI.Docs.hide_fps)
 @click.option(*config.CLI.Param.moore, flag_value=Mode.MOORE.value, default=True, help=config.CLI.Docs.Mode.moore)
 @click.option(*config.CLI.Param.neumann, flag_value=Mode.NEUMANN.value, help=config.CLI.Docs.Mode.neumann)
-def run(logging: bool, show_fps: bool, mode: Mode) -> ARGV:
+@click.option(
+    *config.CLI.Param.topology,
+    type=click.Choice([topology.value for topology in Topology]),
+    default=Topology.DEAD.value,
+    help=config.CLI.Docs.topology,
+)
+@click.option(
+    *config.CLI.Param.backend,
+    type=click.Choice([backend.value for backend in Backend]),
+    default=Backend.NUMBA.value,
+    help=config.CLI.Docs.backend,
+)
+@click.option(
+    *config.CLI.Param.threads,
+    type=click.IntRange(min=0),
+    default=config.GameSettings.threads,
+    help=config.CLI.Docs.threads,
+)
+@click.option(
+    *config.CLI.Param.workers,
+    type=click.IntRange(min=0),
+    default=config.GameSettings.workers,
+    help=config.CLI.Docs.workers,
+)
+@click.option(
+    *config.CLI.Param.renderer,
+    type=click.Choice([renderer.value for renderer in Renderer]),
+    default=Renderer.SURFARRAY.value,
+    help=config.CLI.Docs.renderer,
+)
+@click.option(*config.CLI.Param.warm_up, is_flag=True, default=True, help=config.CLI.Docs.warm_up)
+@click.option(*config.CLI.Param.profile, is_flag=True, default=False, help=config.CLI.Docs.profile)
+@click.option(
+    *config.CLI.Param.profile_export,
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    callback=_validate_export,
+    help=config.CLI.Docs.profile_export,
+)
+@click.option(*config.CLI.Param.threaded, is_flag=True, default=False, help=config.CLI.Docs.threaded)
+@click.option(
+    *config.CLI.Param.turbo,
+    type=click.IntRange(min=1, max=config.GameSettings.turbo_max),
+    default=1,
+    help=config.CLI.Docs.turbo,
+)
+@click.option(*config.CLI.Param.auto_freeze, is_flag=True, default=False, help=config.CLI.Docs.auto_freeze)
+@click.option(
+    *config.CLI.Param.pattern,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    callback=validate_pattern,
+    help=config.CLI.Docs.pattern,
+)
+@click.option(*config.CLI.Param.offset, type=(int, int), default=None, help=config.CLI.Docs.offset)
+@click.option(
+    *config.CLI.Param.snapshot,
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=config.CLI.Docs.snapshot,
+)
+@click.option(
+    *config.CLI.Param.snapshot_every,
+    type=click.IntRange(min=0),
+    default=config.GameSettings.snapshot_every,
+    help=config.CLI.Docs.snapshot_every,
+)
+@click.option(
+    *config.CLI.Param.resume,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help=config.CLI.Docs.resume,
+)
+@click.option(
+    *config.CLI.Param.history,
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=config.CLI.Docs.history,
+)
+def run(
+    logging: bool,
+    show_fps: bool,
+    mode: Mode,
+    topology: str,
+    backend: str,
+    threads: int,
+    workers: int,
+    renderer: str,
+    warm_up: bool,
+    profile: bool,
+    profile_export: Path | None,
+    threaded: bool,
+    turbo: int,
+    auto_freeze: bool,
+    pattern: Path | None,
+    offset: tuple[int, int] | None,
+    snapshot: Path | None,
+    snapshot_every: int,
+    resume: Path | None,
+    history: Path | None,
+) -> ARGV:
     """The entry point to the game of Live."""
-    result = ARGV(logging=logging, show_fps=show_fps, mode=mode)
+    check_topology(Backend(backend), Topology(topology))
+    result = ARGV(
+        logging=logging,
+        show_fps=show_fps,
+        mode=mode,
+        topology=Topology(topology),
+        backend=Backend(backend),
+        threads=threads,
+        workers=workers,
+        renderer=Renderer(renderer),
+        warm_up=warm_up,
+        profile=profile,
+        profile_export=profile_export,
+        threaded=threaded,
+        turbo=turbo,
+        auto_freeze=auto_freeze,
+        pattern=pattern,
+        offset=offset,
+        snapshot=snapshot,
+        snapshot_every=snapshot_every,
+        resume=resume,
+        history=history,
+    )
     return result
+
+
+def parse_argv() -> ARGV:
+    """Parses the command line of the game, `--help` and `--version` exit here, before pygame is loaded."""
+    # the try/except block for the case of testing the cli part of the program
+    try:
+        argv = run(standalone_mode=False)
+    except (click.exceptions.NoSuchOption, click.exceptions.UsageError) as exc:
+        logger.error(exc)
+        argv = default_argv
+
+    if isinstance(argv, int):
+        sys.exit(argv)
+    return cast(ARGV, argv)
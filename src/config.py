@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from pydantic import BaseModel, NonNegativeInt
+from pydantic import BaseModel, NonNegativeFloat, NonNegativeInt, PositiveInt
 
 from src.misc.type_aliases import Color, DeclareOptionModeType, DeclareOptionType, Resolution
 
@@ -8,18 +8,41 @@ from src.misc.type_aliases import Color, DeclareOptionModeType, DeclareOptionTyp
 class _MetaInfo(BaseModel):
     author: str = "Ivan Kovach"
     copyright: str = "Copyright 2024 (c) Ivan Kovach aka Qu1nel"
-    license: str = Path(__file__).parent.with_name("LICENSE").read_text(encoding="UTF-8")
     version: str = "1.1.0"
 
     maintainer: str = "Ivan Kovach"
     email: str = "covach.qn@gmail.com"
     status: str = "Development"
 
+    @property
+    def license(self) -> str:
+        """Text of the LICENSE file, it is read only when it is asked for."""
+        return Path(__file__).parent.with_name("LICENSE").read_text(encoding="UTF-8")
+
 
 class _GameSettings(BaseModel):
     fps: NonNegativeInt = 100
     low_fps: NonNegativeInt = 14
     chill_fps: NonNegativeInt = 18
+    threads: NonNegativeInt = 0  # For the parallel backend, 0 means all cores
+    workers: NonNegativeInt = 0  # For the multiprocess backend, 0 means all cores
+    sparse_density: NonNegativeFloat = 0.05  # The sparse backend uses the dense kernel above this density
+    tile: PositiveInt = 32  # Width and height (in cells) of the tiles of the tiled backend
+    chunk: PositiveInt = 64  # Width and height (in cells) of the chunks of the chunked backend
+    chunk_idle: PositiveInt = 16  # Generations an empty chunk of the chunked backend is kept before it is freed
+    full_repaint_ratio: NonNegativeFloat = 0.1  # Share of the changed cells above which the whole field is redrawn
+    dirty_rects: PositiveInt = 64  # The maximum number of the rectangles passed to `pg.display.update`
+    profiler_frames: PositiveInt = 600  # Frames kept by the profiler of the phases of a frame
+    turbo_max: PositiveInt = 1024  # The maximum number of generations per frame of the turbo mode
+    frame_queue: PositiveInt = 2  # Generations queued between the simulation thread and the render loop
+    cycle_window: PositiveInt = 256  # Generations whose hashes are kept, the longest period that is found
+    snapshot_every: NonNegativeInt = 0  # Generations between the automatic snapshots, 0 - never
+    snapshot_level: NonNegativeInt = 6  # zlib compression level of the snapshots, 0-9
+    history_keyframe_every: PositiveInt = 256  # Generations between the keyframes of the history log
+    history_buffer: PositiveInt = 1 << 20  # Bytes of the history buffered before they are written
+    export_fps: PositiveInt = 25  # Frame rate of the exported GIF animations
+    export_level: NonNegativeInt = 6  # zlib compression level of the exported PNG frames, 0-9
+    export_queue: PositiveInt = 2  # Frames queued for every encoding process of the export
 
     class GUIColors:
         cell: Color = Color(R=241, G=196, B=15)  # Yellow almost
@@ -37,6 +60,7 @@ class _WindowConfig(BaseModel):
     class PathToFile:
         log_name: Path = Path("debug.log")
         icon: Path = Path("icons/icon.png")
+        snapshot: Path = Path("snapshot.snap")
 
 
 class _RotationSettings(BaseModel):
@@ -49,16 +73,83 @@ class _CLI(BaseModel):
     class Docs:
         logging: str = "Enables game logging."
         hide_fps: str = "Disable showing fps in game."
+        backend: str = "Set the generation algorithm (default numba)"
+        threads: str = "Threads of the parallel backend (0 - all)"
+        workers: str = "Multiprocess backend workers (0 - all)"
+        renderer: str = "How the cells are drawn (default surfarray)"
+        warm_up: str = "Compile the backend in the background while the window is drawn"
+        profile: str = "Show the times of the phases of a frame (F3 toggles it)"
+        profile_export: str = "Save the times of the last frames to a .csv or .jsonl file on exit"
+        threaded: str = "Calculate the generations in a thread of their own"
+        turbo: str = "Generations per frame, only the last one is drawn (+/- change it)"
+        auto_freeze: str = "Replay the cycle of a periodic field instead of calculating it"
+        pattern: str = "Start from a pattern file: RLE, Life 1.06, plaintext or macrocell"
+        offset: str = "X Y of the top left corner of the pattern (default centered)"
+        snapshot: str = "File of the snapshots (default snapshot.snap), F5 saves one in the game"
+        snapshot_every: str = "Save a snapshot every N generations (0 - never)"
+        resume: str = "Resume from a snapshot file: its field, rule, mode and generation"
+        history: str = "Record every generation to a history log for seeking"
+
+        topology: str = "How the edges are joined: dead, torus or klein"
 
         class Mode:
             moore: str = "Set Moore count neighbors mode (default)"
             neumann: str = "Set Neumann count neighbors mode"
 
+        class Batch:
+            width: str = "Width of the field in cells"
+            height: str = "Height of the field in cells"
+            rule: str = "Rule of the automaton, like b3/s23, B2-a/S12 or B2/S/C3 (default: of the pattern or b3/s23)"
+            seed: str = "Seed of the random initial field"
+            generations: str = "Number of generations to calculate"
+            dump_every: str = "Save the field every N generations (0 - never)"
+            dump_dir: str = "Folder for the saved fields"
+
+        class Export:
+            frames: str = "Number of frames to export, the first one is the initial field"
+            output: str = "A .gif file, or a folder for the PNG frames"
+            turbo: str = "Generations between the frames"
+            cell: str = "Size of a cell in pixels (default of the game)"
+            fps: str = "Frame rate of the GIF animation"
+            workers: str = "Encoding processes (0 - all cores)"
+
     class Param:
         logging: DeclareOptionType = ("-L", "--logging/--no-logging")
         hide_fps: DeclareOptionType = ("-S", "--show-fps/--no-show-fps")
         moore: DeclareOptionModeType = ("-M", "--Moore", "mode")
         neumann: DeclareOptionModeType = ("-N", "--Neumann", "mode")
+        topology: DeclareOptionType = ("-J", "--topology")
+        backend: DeclareOptionType = ("-B", "--backend")
+        threads: DeclareOptionType = ("-T", "--threads")
+        workers: DeclareOptionType = ("-W", "--workers")
+        renderer: DeclareOptionType = ("-R", "--renderer")
+        warm_up: DeclareOptionType = ("-C", "--warm-up/--no-warm-up")
+        profile: DeclareOptionType = ("-P", "--profile/--no-profile")
+        profile_export: DeclareOptionType = ("-E", "--profile-export")
+        threaded: DeclareOptionType = ("-D", "--threaded/--no-threaded")
+        turbo: DeclareOptionType = ("-K", "--turbo")
+        auto_freeze: DeclareOptionType = ("-F", "--auto-freeze/--no-auto-freeze")
+        pattern: DeclareOptionType = ("-I", "--pattern")
+        offset: DeclareOptionType = ("-A", "--offset")
+        snapshot: DeclareOptionType = ("-V", "--snapshot")
+        snapshot_every: DeclareOptionType = ("-Z", "--snapshot-every")
+        resume: DeclareOptionType = ("-U", "--resume")
+        history: DeclareOptionType = ("-H", "--history")
+
+        class Batch:
+            width: DeclareOptionType = ("-X", "--width")
+            height: DeclareOptionType = ("-Y", "--height")
+            rule: DeclareOptionType = ("-R", "--rule")
+            seed: DeclareOptionType = ("-S", "--seed")
+            generations: DeclareOptionType = ("-G", "--generations")
+            dump_every: DeclareOptionType = ("-D", "--dump-every")
+            dump_dir: DeclareOptionType = ("-O", "--dump-dir")
+
+        class Export:
+            frames: DeclareOptionType = ("-G", "--frames")
+            output: DeclareOptionType = ("-O", "--output")
+            cell: DeclareOptionType = ("-C", "--cell")
+            fps: DeclareOptionType = ("-P", "--fps")
 
 
 MetaInfo = _MetaInfo()
@@ -1,16 +1,34 @@
-import copy
-from random import randint
-from typing import Union, assert_never, cast
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING, Union, assert_never
 
 import numpy as np
 from loguru import logger
 
 from src import config
-from src.bases import AppBase, GameEngineBase
-from src.engines.core import check_cells
-from src.misc.states import Mode, Rules, StateInit
-from src.misc.type_aliases import ResultToDrawing, Size
-from src.misc.utils import get_empty_area
+from src.bases import GameEngineBase
+from src.engines.cycles import CycleDetector, Frame
+from src.engines.rules import RuleTable, compile_rule
+from src.misc.states import Backend, Mode, Rules, StateInit, Topology
+from src.misc.utils import field_changes, get_empty_area
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from src.engines.buffered import DoubleBuffer
+    from src.engines.chunks import ChunkWorld
+    from src.engines.hashlife import HashLife
+    from src.engines.history import HistoryRecorder
+    from src.engines.multiprocess import StripePool
+    from src.engines.patterns import DecodedPattern
+    from src.engines.snapshots import SnapshotInfo
+    from src.engines.sparse import SparseEngine
+    from src.engines.tiles import TileMap
+    from src.misc.type_aliases import Kernel, ResultToDrawing, Size
+
+
+TOPOLOGY_BACKENDS = frozenset({Backend.NUMBA, Backend.NUMPY})  # The backends whose edges can be joined
 
 
 class GameEngine(GameEngineBase):
@@ -18,28 +36,168 @@ class GameEngine(GameEngineBase):
 
     Attributes:
         _mode: The mod you need to render the game with.
-        app: An instance of the game.
-        current_area: Current playing field.
+        backend: The algorithm that calculates the next state of the field.
+        births: Array (N, 2) of (x, y) pairs of the cells born in the last generation.
+        chunk_world: Chunks of the unbounded plane of the chunked backend, the areas only get its visible region.
+        cycles: Hashes of the recent generations which find the period of the field, None - not looked for.
+        auto_freeze: Whether a confirmed cycle is replayed from its saved generations
+            instead of being calculated (not for the hashlife and chunked backends, their areas are only a region).
+        deaths: Array (N, 2) of (x, y) pairs of the cells died in the last generation.
+        generation: Number of the generations calculated since the start.
+        double_buffer: Preallocated fields and index buffer of the numba backend,
+            its fields are used as `current_area` and `next_area`.
+        current_area: Current playing field, uint8 (packed by `pack_field` for the bitpacked backend).
         next_area: The following is the state of the playing field.
+        recorder: Appends every calculated generation to a history log, None - not recorded.
+        hashlife: Quadtree of the hashlife backend, the areas only get its visible region.
         size_area: Size of playing filed.
+        seed: Seed of the random initial field, None for a fresh one every run.
+        sparse_engine: Switch between the dense and the sparse calculation of the sparse backend.
+        stripe_pool: Worker processes of the multiprocess backend, their shared
+            buffers are used as `current_area` and `next_area`.
+        threads: Number of threads used by the parallel backend.
+        tile_map: Activity of the tiles of the tiled backend, `tile_map.stats` shows the skipped work.
+        topology: How the edges of the field are joined, set when the engine is created.
+        turbo: Number of generations calculated by one `process`, only the last one is drawn.
+        track_changes: Whether `births` and `deaths` are found, they are not needed without a window.
 
     """
 
-    app: AppBase
+    backend: Backend
+    births: np.ndarray
+    chunk_world: ChunkWorld | None = None
+    cycles: CycleDetector | None
+    auto_freeze: bool
+    deaths: np.ndarray
+    generation: int
+    double_buffer: DoubleBuffer | None = None
     current_area: np.ndarray
     next_area: np.ndarray
+    hashlife: HashLife | None = None
+    recorder: HistoryRecorder | None = None
     size_area: Size
+    seed: int | None
+    sparse_engine: SparseEngine | None = None
+    stripe_pool: StripePool | None = None
+    threads: int
+    tile_map: TileMap | None = None
+    topology: Topology
+    turbo: int
+    track_changes: bool
+    _kernel: Kernel
+
+    def __init__(
+        self,
+        size: Size,
+        backend: Backend = Backend.NUMBA,
+        threads: int = 0,
+        workers: int = 0,
+        seed: int | None = None,
+        track_changes: bool = True,
+        detect_cycles: bool = False,
+        auto_freeze: bool = False,
+        topology: Topology = Topology.DEAD,
+    ) -> None:
+        """Creates the field and the backend.
 
-    def __init__(self, app: AppBase) -> None:
-        self.app = app
+        Raises:
+            ValueError: If the backend supports only the dead edges and the topology is another one.
+        """
+        if topology is not Topology.DEAD and backend not in TOPOLOGY_BACKENDS:
+            msg = f"the {backend.value} backend has dead edges only, the {topology.value} topology is not supported"
+            raise ValueError(msg)
+
+        self.size_area = size
+        self.seed = seed
+        self.track_changes = track_changes
+        self._rng = np.random.default_rng(seed)
+        self.backend = backend
+        self.topology = topology
+        self.threads = threads
         self._preset: str = Rules.b3_s23.value
+        self._rule: RuleTable = compile_rule(self._preset)
+        self.births = self.deaths = np.empty((0, 2), dtype=np.intp)
+        self.generation = 0
+        self.turbo = 1
 
-        width_area = self.app.resolution.width // config.GameSettings.Sizes.cell
-        height_area = self.app.resolution.height // config.GameSettings.Sizes.cell
-        self.size_area = Size(width=width_area, height=height_area)
+        # The freezing needs the period, so it looks for the cycles too
+        self.cycles = None
+        if detect_cycles or auto_freeze:
+            self.cycles = CycleDetector(size.width, size.height, window=config.GameSettings.cycle_window)
+        self.auto_freeze = auto_freeze and backend not in {Backend.HASHLIFE, Backend.CHUNKED}
+        self._cycle_key: tuple[int, Mode, int] | None = None  # What the detected cycle depends on
+        self._frames: list[Frame] = []  # The last generations of the cycle, replayed when it is frozen
+        self._frozen_at: int | None = None  # Index of the next replayed frame, None - calculated
 
         self.current_area = self.init_area(state=StateInit.RANDOM)
-        self.next_area = get_empty_area(width=width_area, height=height_area)
+        self.next_area = get_empty_area(width=self.size_area.width, height=self.size_area.height)
+        self._init_backend(threads=threads, workers=workers)
+
+    def _init_backend(self, threads: int, workers: int) -> None:
+        """Imports the module of the backend and prepares its kernel.
+
+        The backend does not change, so its kernel is resolved once here, and
+        the modules of the other backends (and numba for the numpy backend) are
+        never imported.
+        """
+        width_area, height_area = self.size_area.width, self.size_area.height
+        match self.backend:
+            case Backend.NUMBA:
+                from src.engines.buffered import DoubleBuffer  # noqa: PLC0415
+
+                self.double_buffer = DoubleBuffer(width=width_area, height=height_area, topology=self.topology)
+                self.double_buffer.areas[0][:] = self.current_area
+                self.current_area, self.next_area = self.double_buffer.areas
+                self._kernel = self.double_buffer.check_cells
+            case Backend.NUMPY:
+                from src.engines.vectorized import check_cells_vectorized  # noqa: PLC0415
+
+                self._kernel = partial(check_cells_vectorized, topology=self.topology)
+            case Backend.BITPACKED:
+                from src.engines.bitpacked import check_cells_bitpacked, get_empty_packed_area  # noqa: PLC0415
+
+                self.next_area = get_empty_packed_area(width=width_area, height=height_area)
+                self._kernel = check_cells_bitpacked
+            case Backend.PARALLEL:
+                from src.engines.parallel import check_cells_parallel, set_threads  # noqa: PLC0415
+
+                # Starting the threads of numba only when they are needed, it does not survive `fork`
+                self.threads = set_threads(threads)
+                self._kernel = check_cells_parallel
+            case Backend.MULTIPROCESS:
+                from src.engines.multiprocess import StripePool  # noqa: PLC0415
+
+                self.stripe_pool = StripePool(width=width_area, height=height_area, workers=workers)
+                self.stripe_pool.areas[0][:] = self.current_area
+                self.current_area, self.next_area = self.stripe_pool.areas
+                self._kernel = self.stripe_pool.check_cells
+            case Backend.HASHLIFE:
+                from src.engines.hashlife import HashLife  # noqa: PLC0415
+
+                self.hashlife = HashLife()
+                self.hashlife.load(self.current_area)
+                self._kernel = self.hashlife.check_cells
+            case Backend.SPARSE:
+                from src.engines.sparse import SparseEngine  # noqa: PLC0415
+
+                self.sparse_engine = SparseEngine(width_area, height_area, threshold=config.GameSettings.sparse_density)
+                self._kernel = self.sparse_engine.check_cells
+            case Backend.TILED:
+                from src.engines.tiles import TileMap  # noqa: PLC0415
+
+                self.tile_map = TileMap(width_area, height_area, tile=config.GameSettings.tile)
+                self._kernel = self.tile_map.check_cells
+            case Backend.CHUNKED:
+                from src.engines.chunks import ChunkWorld  # noqa: PLC0415
+
+                self.chunk_world = ChunkWorld(
+                    chunk=config.GameSettings.chunk,
+                    idle_generations=config.GameSettings.chunk_idle,
+                )
+                self.chunk_world.load(self.current_area)
+                self._kernel = self.chunk_world.check_cells
+            case _ as unreachable:
+                assert_never(unreachable)
 
     def init_area(self, state: StateInit) -> np.ndarray:
         """Initialization of the initial playing field.
@@ -50,20 +208,199 @@ class GameEngine(GameEngineBase):
         Returns:
             The matrix as a playing field.
         """
-        width = self.app.resolution.width // config.GameSettings.Sizes.cell
-        height = self.app.resolution.height // config.GameSettings.Sizes.cell
+        width, height = self.size_area.width, self.size_area.height
 
         match state:
             case StateInit.RANDOM:
-                current_area = np.array([[randint(0, 1) for _ in range(width)] for _ in range(height)])
+                current_area = self._rng.integers(0, 2, size=(height, width), dtype=np.uint8)
             case StateInit.DOT:
-                current_area = np.array([[0 for _ in range(width)] for _ in range(height)])
+                current_area = get_empty_area(width=width, height=height)
                 current_area[height // 2][width // 2] = 1
             case _ as unreachable:
                 assert_never(unreachable)
 
+        if self.backend is Backend.BITPACKED:
+            from src.engines.bitpacked import pack_field  # noqa: PLC0415
+
+            return pack_field(current_area)
         return current_area
 
+    def load_field(self, field: np.ndarray) -> None:
+        """Replaces the current playing field, the calculation starts over from it.
+
+        Args:
+            field: Matrix (height x width) with the states of the cells.
+
+        Raises:
+            ValueError: If the size of the field is not `size_area`.
+        """
+        width, height = self.size_area.width, self.size_area.height
+        if field.shape != (height, width):
+            msg = f"the field is {field.shape[1]}x{field.shape[0]}, expected {width}x{height}"
+            raise ValueError(msg)
+
+        if self.backend is Backend.BITPACKED:
+            from src.engines.bitpacked import pack_field  # noqa: PLC0415
+
+            self.current_area = pack_field(field.astype(np.uint8))
+        else:
+            # Written in place: the areas of the numba and multiprocess backends are their own buffers
+            self.current_area[:height, :width] = field
+        self._restart()
+
+    def load_pattern(self, pattern: DecodedPattern, offset: tuple[int, int] | None = None) -> None:
+        """Replaces the current playing field by the pattern on dead cells, the calculation starts over from it.
+
+        The cells are written straight into `current_area`, only the
+        bitpacked backend needs a field of bytes to pack.
+
+        Args:
+            pattern: The cells of the pattern (`read_pattern`).
+            offset: (x, y) of the top left corner of the pattern, None - the pattern is in the center.
+
+        Raises:
+            ValueError: If the pattern does not fit into the field or has more states than the rule.
+        """
+        from src.engines.patterns import place_pattern  # noqa: PLC0415
+
+        if len(pattern.states) and pattern.states.max() >= self._rule.states:
+            msg = f"the pattern has the state {pattern.states.max()}, the rule {self._preset} has {self._rule.states}"
+            raise ValueError(msg)
+
+        if self.backend is Backend.BITPACKED:
+            field = get_empty_area(width=self.size_area.width, height=self.size_area.height)
+            place_pattern(pattern, field, offset)
+            self.load_field(field)
+            return
+
+        place_pattern(pattern, self.field, offset)
+        self._restart()
+
+    def load_snapshot(self, path: Path) -> SnapshotInfo:
+        """Resumes the game from the snapshot file: its field, rule, mode, generation and seed.
+
+        The field is decompressed straight into `current_area`, only the
+        bitpacked backend needs a field of bytes to pack.
+
+        Args:
+            path: The file written by `write_snapshot`.
+
+        Returns:
+            What the snapshot keeps besides the field.
+
+        Raises:
+            ValueError: If the file is not a snapshot or its field is not `size_area`.
+        """
+        from src.engines.snapshots import read_info, read_snapshot  # noqa: PLC0415
+
+        info = read_info(path)
+        width, height = self.size_area.width, self.size_area.height
+        if (info.width, info.height) != (width, height):
+            msg = f"the snapshot is {info.width}x{info.height}, expected {width}x{height}"
+            raise ValueError(msg)
+
+        self.preset = info.rule
+        self.mode = info.mode
+        self.seed = info.seed
+        self._rng = np.random.default_rng(info.seed)
+        if self.backend is Backend.BITPACKED:
+            _info, field = read_snapshot(path)
+            self.load_field(field)
+        else:
+            read_snapshot(path, self.field)
+        self._restart(generation=info.generation)
+        return info
+
+    def snapshot_info(self) -> SnapshotInfo:
+        """What a snapshot of the current generation keeps besides the field."""
+        from src.engines.snapshots import SnapshotInfo  # noqa: PLC0415
+
+        return SnapshotInfo(
+            width=self.size_area.width,
+            height=self.size_area.height,
+            rule=self._preset,
+            mode=self.mode,
+            generation=self.generation,
+            seed=self.seed,
+            states=self._rule.states,
+        )
+
+    def record_history(self, path: Path, keyframe_every: int = config.GameSettings.history_keyframe_every) -> None:
+        """Starts recording the generations to the history log, the current field is its first keyframe.
+
+        Args:
+            path: The log, an existing one is replaced.
+            keyframe_every: Generations between the keyframes of the whole field.
+
+        Raises:
+            ValueError: If the field is too large for a history.
+            OSError: If the log cannot be created.
+        """
+        from src.engines.history import HistoryRecorder  # noqa: PLC0415
+
+        self.stop_recording()
+        self.recorder = HistoryRecorder(
+            path,
+            self.snapshot_info(),
+            keyframe_every=keyframe_every,
+            buffer=config.GameSettings.history_buffer,
+        )
+        self.recorder.keyframe(self.generation, self.field)
+
+    def stop_recording(self) -> None:
+        """Writes the rest of the history log and closes it."""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def _record(self) -> None:
+        """Appends the generation to the history: its changes, or the whole field when a keyframe is due."""
+        assert self.recorder is not None
+        if self.recorder.keyframe_due(self.generation):
+            self.recorder.keyframe(self.generation, self.field)
+            return
+        dying = None
+        # The cells of the Generations rules die into their dying states, not into 0
+        if self._rule.states > 2:  # noqa: PLR2004
+            dying = self.field[self.deaths[:, 1], self.deaths[:, 0]]
+        self.recorder.delta(self.generation, self.births, self.deaths, dying)
+
+    def _restart(self, generation: int = 0) -> None:
+        """The calculation starts over from `current_area` with the generation, no changes and no cycle."""
+        self._reset_backend()
+        self._unfreeze()
+        self.births = self.deaths = np.empty((0, 2), dtype=np.intp)
+        if self.recorder is not None:
+            if self.recorder.generation is not None and generation < self.recorder.generation:
+                # The generations of a log only go forward, seeking could not tell the two runs apart
+                logger.warning(f"the history {self.recorder.path} ends at the generation {self.recorder.generation}")
+                self.stop_recording()
+            else:
+                self.recorder.keyframe(generation, self.field)
+        self.generation = generation
+        if self.cycles is not None:
+            self.cycles.reset(self.field, self.generation)
+
+    def _reset_backend(self) -> None:
+        """Makes the backend forget the previous generations, the next one is calculated from `current_area` alone."""
+        match self.backend:
+            case Backend.HASHLIFE:
+                assert self.hashlife is not None
+                self.hashlife.load(self.field)
+            case Backend.CHUNKED:
+                assert self.chunk_world is not None
+                self.chunk_world.load(self.field)
+            case Backend.SPARSE:
+                assert self.sparse_engine is not None
+                self.sparse_engine.sparse = False  # The next generation is dense and finds the active cells again
+            case Backend.TILED:
+                assert self.tile_map is not None
+                self.tile_map.changed[:] = True
+            case Backend.NUMBA | Backend.NUMPY | Backend.BITPACKED | Backend.PARALLEL | Backend.MULTIPROCESS:
+                pass  # Their kernels overwrite every cell of the next field
+            case _ as unreachable:
+                assert_never(unreachable)
+
     @property
     def mode(self) -> Mode:
         """Property for `_mode` attribute."""
@@ -81,28 +418,176 @@ class GameEngine(GameEngineBase):
     @preset.setter
     def preset(self, value: Union[Rules, str]) -> None:
         logger.info(f"SET RULE: '{value}'")
-        if isinstance(value, str):
-            self._preset = value
         if isinstance(value, Rules):
-            self._preset = value.value
-        else:
+            value = value.value
+        elif not isinstance(value, str):
             msg = "no way"
             raise TypeError(msg)
 
+        # The rule is parsed only here, `compile_rule` raises ValueError for a wrong rule
+        self._rule = compile_rule(value)
+        self._preset = value
+
+    @property
+    def rule(self) -> RuleTable:
+        """The compiled rule of `preset`."""
+        return self._rule
+
+    @property
+    def field(self) -> np.ndarray:
+        """The states of the cells of the current playing field, unpacked for the bitpacked backend."""
+        if self.backend is Backend.BITPACKED:
+            from src.engines.bitpacked import unpack_field  # noqa: PLC0415
+
+            return unpack_field(self.current_area, self.size_area.width)
+        return self.current_area[: self.size_area.height, : self.size_area.width]
+
+    @property
+    def period(self) -> int | None:
+        """Period of the field, None if it does not repeat or the cycles are not looked for."""
+        return self.cycles.period if self.cycles is not None else None
+
+    @property
+    def frozen(self) -> bool:
+        """Whether the generations are replayed from the saved cycle."""
+        return self._frozen_at is not None
+
+    def _find_changes(self, previous: np.ndarray | None = None) -> np.ndarray:
+        """Fills `births` and `deaths` since the `previous` field, by default `next_area` (the previous generation).
+
+        Returns:
+            The previous field the changes were found against.
+        """
+        if previous is None:
+            previous = self.next_area
+            if self.backend is Backend.BITPACKED:
+                from src.engines.bitpacked import unpack_field  # noqa: PLC0415
+
+                previous = unpack_field(previous, self.size_area.width)
+            previous = previous[: self.size_area.height, : self.size_area.width]
+        self.births, self.deaths = field_changes(previous, self.field)
+        return previous
+
+    def _skip(self, generations: int) -> None:
+        """Calculates the generations without their draw lists, the numba and hashlife backends in one call."""
+        width, height = self.size_area.width, self.size_area.height
+        if self.backend is Backend.NUMBA:
+            assert self.double_buffer is not None
+            moore = self.mode is Mode.MOORE
+            self.double_buffer.step_many(self.current_area, self.next_area, self._rule.table, moore, generations)
+            if generations % 2:
+                self.current_area, self.next_area = self.next_area, self.current_area
+        elif self.backend is Backend.HASHLIFE:
+            # One jump of the quadtree instead of a generation at a time, then the visible region
+            assert self.hashlife is not None
+            self.hashlife.set_rule(self._rule.table, self.mode.get_name())
+            self.hashlife.step(generations)
+            self.hashlife.region(self.current_area[:height, :width])
+        else:
+            for _ in range(generations):
+                self.next_area, _cells = self._kernel(
+                    current_field=self.current_area,
+                    next_field=self.next_area,
+                    width=width,
+                    height=height,
+                    mode=self.mode.get_name(),
+                    rule=self._rule.table,
+                )
+                self.current_area, self.next_area = self.next_area, self.current_area
+        self.generation += generations
+
+    def _unfreeze(self) -> None:
+        """Drops the saved cycle, the detector starts over from the current field."""
+        if self._frozen_at is not None:
+            self._reset_backend()
+        self._frozen_at = None
+        self._frames.clear()
+        self._cycle_key = None
+
+    def _replay(self) -> ResultToDrawing:
+        """The next generation of the frozen cycle, copied from its saved frame."""
+        assert self._frozen_at is not None
+        frame = self._frames[self._frozen_at]
+        self._frozen_at = (self._frozen_at + 1) % len(self._frames)
+        np.copyto(self.current_area, frame.area)
+        self.births, self.deaths = frame.births, frame.deaths
+        self.generation += self.turbo
+        return frame.cells
+
+    def _observe_cycle(self, previous: np.ndarray, cells: ResultToDrawing) -> None:
+        """Updates the hash of the field by the last changes, saves the generations of the cycle and freezes it."""
+        assert self.cycles is not None
+        key = (id(self._rule), self.mode, self.turbo)
+        if key != self._cycle_key:
+            # Another rule, mode or step makes another sequence of the fields, it starts from the previous one
+            self._cycle_key = key
+            self._frames.clear()
+            self.cycles.reset(previous, self.generation - self.turbo)
+
+        known = self.cycles.period
+        self.cycles.update(previous, self.field, np.concatenate((self.births, self.deaths)))
+        period = self.cycles.observe(self.generation)
+        if period is None:
+            self._frames.clear()
+            return
+        if period != known:
+            self._frames.clear()
+            logger.info(f"the field is periodic with period {period} since generation {self.cycles.start}")
+
+        if self.auto_freeze:
+            # The numba backend draws a view of its buffer, it is overwritten by the next generation
+            saved = cells.copy() if isinstance(cells, np.ndarray) else cells
+            self._frames.append(Frame(self.current_area.copy(), saved, self.births, self.deaths))
+            frames = period // self.turbo  # The generations are observed every `turbo` ones
+            del self._frames[:-frames]
+            if self.cycles.confirmed and len(self._frames) == frames:
+                logger.info(f"the cycle of {len(self._frames)} frames is frozen at generation {self.generation}")
+                self._frozen_at = 0
+
     def process(self) -> ResultToDrawing:
-        """Calculates the next state of self.area from the current state."""
-        b, s = self._preset.split("/")
-        preset = (tuple(int(i) for i in b[1:]), tuple(int(i) for i in s[1:]))
+        """Calculates the next `turbo` generations, `births` and `deaths` get the changes since the current one.
+
+        A frozen cycle is replayed until the rule, the mode or `turbo` changes.
+        The last generation is appended to the history if it is recorded.
 
-        self.next_area, draw_rects = check_cells(
+        Returns:
+            The living cells of the last generation.
+        """
+        cells = self._advance()
+        if self.recorder is not None:
+            self._record()
+        return cells
+
+    def _advance(self) -> ResultToDrawing:
+        """The next `turbo` generations of `process`, replayed or calculated."""
+        if self._frozen_at is not None:
+            if self._cycle_key == (id(self._rule), self.mode, self.turbo):
+                return self._replay()
+            self._unfreeze()
+
+        track_changes = self.track_changes or self.cycles is not None or self.recorder is not None
+        start = None
+        if self.turbo > 1:
+            # Only the last generation is drawn, the changes are counted from the current field
+            start = self.field.copy() if track_changes else None
+            self._skip(self.turbo - 1)
+
+        self.next_area, cells = self._kernel(
             current_field=self.current_area,
             next_field=self.next_area,
             width=self.size_area.width,
             height=self.size_area.height,
             mode=self.mode.get_name(),
-            rule=preset,
+            rule=self._rule.table,
         )
 
-        self.current_area = copy.deepcopy(self.next_area)
+        # The buffers are swapped instead of copied, the kernels overwrite every cell of `next_field`
+        self.current_area, self.next_area = self.next_area, self.current_area
+        self.generation += 1
+
+        if track_changes:
+            previous = self._find_changes(start)
+            if self.cycles is not None:
+                self._observe_cycle(previous, cells)
 
-        return cast(ResultToDrawing, draw_rects)
+        return cells
@@ -0,0 +1,219 @@
+from typing import Literal
+
+import numpy as np
+from numba import njit  # type: ignore
+
+from src.engines.rules import totalistic_masks
+from src.misc.type_aliases import CheckCells
+
+WORD_BITS = 64
+
+_ONE = np.uint64(1)
+_HIGH = np.uint64(WORD_BITS - 1)
+_FULL = np.uint64(0xFFFF_FFFF_FFFF_FFFF)
+
+
+def words_per_row(width: int) -> int:
+    """Number of uint64 words needed to store a row of `width` cells."""
+    return (width + WORD_BITS - 1) // WORD_BITS
+
+
+def pack_field(field: np.ndarray) -> np.ndarray:
+    """Packs a matrix of cells into rows of uint64 words, 64 cells per word.
+
+    Cell `x` of a row is stored in bit `x % 64` of word `x // 64`, the unused
+    bits of the last word are always zero.
+
+    Args:
+        field: The playing field as a matrix of 0 and 1.
+
+    Returns:
+        Matrix of uint64 words with shape (height, ceil(width / 64)).
+    """
+    height, width = field.shape
+    padded = np.zeros((height, words_per_row(width) * WORD_BITS), dtype=np.bool_)
+    padded[:, :width] = field != 0
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8")
+
+
+def unpack_field(words: np.ndarray, width: int) -> np.ndarray:
+    """Reverse operation to `pack_field`.
+
+    Args:
+        words: The packed playing field.
+        width: Number of cells in a row.
+
+    Returns:
+        The playing field as a matrix (uint8) of 0 and 1.
+    """
+    cells = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=1, bitorder="little")
+    return cells[:, :width]
+
+
+def get_empty_packed_area(width: int, height: int) -> np.ndarray:
+    """Generates an empty packed playing field."""
+    return np.zeros((height, words_per_row(width)), dtype=np.uint64)
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def _full_adder(a: np.uint64, b: np.uint64, c: np.uint64) -> tuple[np.uint64, np.uint64]:
+    """Adds three bit planes, returns the bit planes of the sum and the carry."""
+    half = a ^ b
+    return half ^ c, (a & b) | (half & c)
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def _count_equals(
+    count: int,
+    ones: np.uint64,
+    twos: np.uint64,
+    fours: np.uint64,
+    eights: np.uint64,
+) -> np.uint64:
+    """Bits of the word where the neighbor count (given by its bit planes) is equal to `count`."""
+    result = ones if count & 1 else ~ones
+    result &= twos if count & 2 else ~twos
+    result &= fours if count & 4 else ~fours
+    result &= eights if count & 8 else ~eights
+    return result
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def _step_words(
+    current: np.ndarray,
+    following: np.ndarray,
+    width: int,
+    born: int,
+    survives: int,
+    moore: bool,
+) -> None:
+    """Calculates the next state of the packed field with bitwise full adders.
+
+    Every word is processed as 64 cells at once: the neighbors are the words
+    above and below and the words shifted by one cell (with the bit carried
+    over from the adjacent word), their sum is built bit plane by bit plane.
+    """
+    height, n_words = current.shape
+    tail = width % WORD_BITS
+    last_mask = (_ONE << np.uint64(tail)) - _ONE if tail else _FULL
+    zero = np.uint64(0)
+
+    for y in range(height):
+        for j in range(n_words):
+            # Rows above, at and below the cell together with the adjacent words
+            up = current[y - 1, j] if y > 0 else zero
+            mid = current[y, j]
+            down = current[y + 1, j] if y < height - 1 else zero
+
+            up_w, up_e = up << _ONE, up >> _ONE
+            mid_w, mid_e = mid << _ONE, mid >> _ONE
+            down_w, down_e = down << _ONE, down >> _ONE
+
+            if j > 0:
+                mid_w |= current[y, j - 1] >> _HIGH
+                if y > 0:
+                    up_w |= current[y - 1, j - 1] >> _HIGH
+                if y < height - 1:
+                    down_w |= current[y + 1, j - 1] >> _HIGH
+            if j < n_words - 1:
+                mid_e |= current[y, j + 1] << _HIGH
+                if y > 0:
+                    up_e |= current[y - 1, j + 1] << _HIGH
+                if y < height - 1:
+                    down_e |= current[y + 1, j + 1] << _HIGH
+
+            if moore:
+                sum_a, carry_a = _full_adder(up_w, up, up_e)
+                sum_b, carry_b = _full_adder(mid_w, mid_e, down_w)
+                sum_c, carry_c = down ^ down_e, down & down_e
+                ones, carry_d = _full_adder(sum_a, sum_b, sum_c)
+                twos_a, carry_e = _full_adder(carry_a, carry_b, carry_c)
+                twos, carry_f = twos_a ^ carry_d, twos_a & carry_d
+                fours, eights = carry_e ^ carry_f, carry_e & carry_f
+            else:
+                sum_a, carry_a = _full_adder(up, down, mid_w)
+                ones, carry_b = sum_a ^ mid_e, sum_a & mid_e
+                twos, fours = carry_a ^ carry_b, carry_a & carry_b
+                eights = zero
+
+            alive = zero
+            for count in range(9):
+                if survives >> count & 1:
+                    alive |= mid & _count_equals(count, ones, twos, fours, eights)
+                if born >> count & 1:
+                    alive |= ~mid & _count_equals(count, ones, twos, fours, eights)
+
+            if j == n_words - 1:
+                alive &= last_mask
+            following[y, j] = alive
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def live_cells_packed(words: np.ndarray) -> np.ndarray:
+    """Collects the coordinates of the living cells of a packed field.
+
+    Empty words are skipped entirely, so a sparse field is scanned quickly.
+
+    Returns:
+        Array with shape (N, 2) of (x, y) pairs of living cells.
+    """
+    height, n_words = words.shape
+    total = 0
+    for y in range(height):
+        for j in range(n_words):
+            word = words[y, j]
+            while word:
+                word &= word - _ONE
+                total += 1
+
+    result = np.empty((total, 2), dtype=np.int64)
+    index = 0
+    for y in range(height):
+        for j in range(n_words):
+            word = words[y, j]
+            bit = 0
+            while word:
+                if word & _ONE:
+                    result[index, 0] = j * WORD_BITS + bit
+                    result[index, 1] = y
+                    index += 1
+                word >>= _ONE
+                bit += 1
+    return result
+
+
+def check_cells_bitpacked(
+    current_field: np.ndarray,
+    next_field: np.ndarray,
+    width: int,
+    height: int,
+    rule: np.ndarray,
+    mode: Literal["Moore", "Neumann"] = "Moore",
+) -> CheckCells:
+    """Alternative to `check_cells` working on a field packed with `pack_field`.
+
+    Only outer-totalistic two-state rules are supported, the table is turned
+    into bitmasks of the counts by `totalistic_masks`.
+
+    Args:
+        current_field: The current packed state of the playing field.
+        next_field: The packed field that will be filled with the new state.
+        width: Number indicating the width of the playing field.
+        height: Number indicating the height of the playing field.
+        rule: The transition table of the rule (`RuleTable.table`).
+        mode: Mod defining the principle of counting cell neighbors.
+
+    Raises:
+        ValueError: If `mode` argument is unknown or the rule is not outer-totalistic.
+
+    Returns:
+        Calculated packed state for the next step, and an array of live cells
+        that will be drawn.
+    """
+    if mode not in {"Moore", "Neumann"}:
+        msg = "mode is not set!"
+        raise ValueError(msg)
+
+    born, survives = totalistic_masks(rule)
+    _step_words(current_field[:height], next_field[:height], width, born, survives, mode == "Moore")
+    return next_field, live_cells_packed(next_field[:height])
@@ -0,0 +1,241 @@
+from typing import Any, Literal
+
+import numpy as np
+from numba import njit, types  # type: ignore
+from numba.core.typing import Signature  # type: ignore
+
+from src.engines.core import FIELD, RULE
+from src.misc.states import Topology
+from src.misc.type_aliases import CheckCells
+
+# The codes of the topologies for the compiled kernels
+DEAD_EDGES, TORUS, KLEIN = 0, 1, 2
+TOPOLOGY_CODES = {Topology.DEAD: DEAD_EDGES, Topology.TORUS: TORUS, Topology.KLEIN: KLEIN}
+
+# Bits of the mask counted in the neighborhood (NW, N, NE, W, E, SW, S, SE, see `src.engines.rules`)
+MOORE_BITS = 0b11111111
+NEUMANN_BITS = 0b01011010
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def fill_halo(field: np.ndarray, topology: int) -> None:
+    """Refills the border of one cell around the field by the topology, `pad_field` does it with NumPy.
+
+    Args:
+        field: Matrix (height + 2 x width + 2), the field in the middle.
+        topology: `DEAD_EDGES`, `TORUS` or `KLEIN` (`TOPOLOGY_CODES`).
+    """
+    height, width = field.shape[0] - 2, field.shape[1] - 2
+    if topology == DEAD_EDGES:
+        field[0, :] = 0
+        field[height + 1, :] = 0
+        field[:, 0] = 0
+        field[:, width + 1] = 0
+        return
+
+    field[1 : height + 1, 0] = field[1 : height + 1, width]
+    field[1 : height + 1, width + 1] = field[1 : height + 1, 1]
+    # The rows go after the columns, so the corners come from the joined columns too
+    if topology == TORUS:
+        field[0, :] = field[height, :]
+        field[height + 1, :] = field[1, :]
+    else:
+        field[0, :] = field[height, ::-1]
+        field[height + 1, :] = field[1, ::-1]
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def step_padded(current_field: np.ndarray, next_field: np.ndarray, rule: np.ndarray, neighbors: int) -> None:
+    """Calculates the next state of the middle of the padded field, its border is the neighbors beyond the edges.
+
+    Every cell has all its neighbors in the padded field, so the mask is
+    built from the three rows around it without branches, and the
+    neighbors out of the neighborhood are masked off.
+
+    Args:
+        current_field: Matrix (height + 2 x width + 2), the border is filled by `fill_halo`.
+        next_field: Matrix of the same shape, its middle receives the next state.
+        rule: The transition table of the rule (`RuleTable.table`).
+        neighbors: `MOORE_BITS` or `NEUMANN_BITS`.
+    """
+    height, width = current_field.shape[0] - 2, current_field.shape[1] - 2
+    for y in range(1, height + 1):
+        above, row, below = current_field[y - 1], current_field[y], current_field[y + 1]
+        target = next_field[y]
+        for x in range(1, width + 1):
+            mask = (
+                np.uint8(above[x - 1] == 1)
+                | np.uint8(above[x] == 1) << 1
+                | np.uint8(above[x + 1] == 1) << 2
+                | np.uint8(row[x - 1] == 1) << 3
+                | np.uint8(row[x + 1] == 1) << 4
+                | np.uint8(below[x - 1] == 1) << 5
+                | np.uint8(below[x] == 1) << 6
+                | np.uint8(below[x + 1] == 1) << 7
+            )
+            target[x] = rule[row[x], mask & neighbors]
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def collect_cells(field: np.ndarray, cells: np.ndarray) -> int:
+    """Writes the (x, y) pairs of the living cells of the padded field into `cells`, column by column.
+
+    Returns:
+        The number of living cells.
+    """
+    height, width = field.shape[0] - 2, field.shape[1] - 2
+    count = 0
+    for x in range(width):
+        for y in range(height):
+            if field[y + 1, x + 1] == 1:
+                cells[count, 0] = x
+                cells[count, 1] = y
+                count += 1
+    return count
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def step_into(
+    current_field: np.ndarray,
+    next_field: np.ndarray,
+    rule: np.ndarray,
+    moore: bool,
+    topology: int,
+    cells: np.ndarray,
+) -> int:
+    """Calculates the next state like `check_cells`, but on padded fields and without allocating anything.
+
+    The living cells are written into the preallocated `cells` buffer
+    instead of a list, in the same order (column by column).
+
+    Args:
+        current_field: The current state of the playing field with a border of one cell.
+        next_field: The padded field that will be filled with the new state of the cells.
+        rule: The transition table of the rule (`RuleTable.table`).
+        moore: Whether the Moore (8 cells) or the Neumann (4 cells) neighborhood is used.
+        topology: How the edges are joined (`TOPOLOGY_CODES`).
+        cells: Buffer with shape (width * height, 2) for (x, y) pairs of living cells.
+
+    Returns:
+        The number of living cells written into `cells`.
+    """
+    fill_halo(current_field, topology)
+    step_padded(current_field, next_field, rule, MOORE_BITS if moore else NEUMANN_BITS)
+    return collect_cells(next_field, cells)
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def step_many(
+    current_field: np.ndarray,
+    next_field: np.ndarray,
+    rule: np.ndarray,
+    moore: bool,
+    topology: int,
+    generations: int,
+) -> None:
+    """Calculates several generations in one call, the padded fields are used in turn and no cells are listed.
+
+    Args:
+        current_field: The current state of the playing field with a border of one cell.
+        next_field: The other padded field, it is overwritten.
+        rule: The transition table of the rule (`RuleTable.table`).
+        moore: Whether the Moore (8 cells) or the Neumann (4 cells) neighborhood is used.
+        topology: How the edges are joined (`TOPOLOGY_CODES`).
+        generations: Number of generations to calculate.
+
+    Returns:
+        Nothing, the last generation is in `next_field` if `generations` is
+        odd, otherwise in `current_field`.
+    """
+    neighbors = MOORE_BITS if moore else NEUMANN_BITS
+    source, target = current_field, next_field
+    for _ in range(generations):
+        fill_halo(source, topology)
+        step_padded(source, target, rule, neighbors)
+        source, target = target, source
+
+
+CELLS = types.Array(types.int32, 2, "C")  # `DoubleBuffer.cells`
+
+# Explicit signatures of the kernels for the padded fields, compiled by `compile_kernels` like the ones of `core`
+SIGNATURES: dict[Any, Signature] = {
+    fill_halo: types.none(FIELD, types.int64),
+    step_padded: types.none(FIELD, FIELD, RULE, types.int64),
+    collect_cells: types.int64(FIELD, CELLS),
+    step_into: types.int64(FIELD, FIELD, RULE, types.boolean, types.int64, CELLS),
+    step_many: types.none(FIELD, FIELD, RULE, types.boolean, types.int64, types.int64),
+}
+
+
+class DoubleBuffer:
+    """Two preallocated uint8 fields with a border of one cell and an index buffer, a generation allocates no memory.
+
+    The border of the current field is refilled by the topology before every
+    generation, so the kernel reads the neighbors without bounds checks. The
+    middles of the fields are used as the current and the next state in turn
+    (the caller swaps them), and the living cells of the last generation are
+    returned as a view of the index buffer.
+
+    Attributes:
+        padded: Two fields with the border, height + 2 x width + 2.
+        areas: The middles of `padded`, used as the current and the next state in turn.
+        cells: Buffer of (x, y) pairs of living cells, big enough for the whole field.
+        topology: How the edges of the field are joined.
+
+    """
+
+    padded: tuple[np.ndarray, np.ndarray]
+    areas: tuple[np.ndarray, np.ndarray]
+    cells: np.ndarray
+    topology: Topology
+
+    def __init__(self, width: int, height: int, topology: Topology = Topology.DEAD) -> None:
+        self.padded = (
+            np.zeros((height + 2, width + 2), dtype=np.uint8),
+            np.zeros((height + 2, width + 2), dtype=np.uint8),
+        )
+        self.areas = (self.padded[0][1:-1, 1:-1], self.padded[1][1:-1, 1:-1])
+        self.cells = np.empty((width * height, 2), dtype=np.int32)
+        self.topology = topology
+
+    def _padded(self, area: np.ndarray) -> np.ndarray:
+        """The padded field of one of `areas`."""
+        return self.padded[0] if area is self.areas[0] else self.padded[1]
+
+    def check_cells(
+        self,
+        current_field: np.ndarray,
+        next_field: np.ndarray,
+        width: int,  # noqa: ARG002
+        height: int,  # noqa: ARG002
+        rule: np.ndarray,
+        mode: Literal["Moore", "Neumann"] = "Moore",
+    ) -> CheckCells:
+        """Alternative to `check_cells` over `areas` which returns the living cells as a view of `cells`.
+
+        Raises:
+            ValueError: If `mode` argument is unknown.
+
+        Returns:
+            Calculated state for the next step, and an array (N, 2) of live
+            cells that will be drawn, valid until the next call.
+        """
+        if mode not in {"Moore", "Neumann"}:
+            msg = "mode is not set!"
+            raise ValueError(msg)
+
+        current, following = self._padded(current_field), self._padded(next_field)
+        count = step_into(current, following, rule, mode == "Moore", TOPOLOGY_CODES[self.topology], self.cells)
+        return next_field, self.cells[:count]
+
+    def step_many(
+        self,
+        current_field: np.ndarray,
+        next_field: np.ndarray,
+        rule: np.ndarray,
+        moore: bool,
+        generations: int,
+    ) -> None:
+        """Calculates several generations over `areas` in one compiled call (`step_many`), no cells are listed."""
+        current, following = self._padded(current_field), self._padded(next_field)
+        step_many(current, following, rule, moore, TOPOLOGY_CODES[self.topology], generations)
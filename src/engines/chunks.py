@@ -0,0 +1,307 @@
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+from numba import njit  # type: ignore
+
+from src.misc.type_aliases import CheckCells
+
+CHUNK_SIZE = 64
+IDLE_GENERATIONS = 16
+
+# Edges of a chunk with living cells (`chunk_edges`), the cells of the neighbor chunk on that side can be born
+NORTH, SOUTH, WEST, EAST = 1, 2, 4, 8
+NORTH_WEST, NORTH_EAST, SOUTH_WEST, SOUTH_EAST = 16, 32, 64, 128
+_GROWTH = (
+    (NORTH, 0, -1),
+    (SOUTH, 0, 1),
+    (WEST, -1, 0),
+    (EAST, 1, 0),
+    (NORTH_WEST, -1, -1),
+    (NORTH_EAST, 1, -1),
+    (SOUTH_WEST, -1, 1),
+    (SOUTH_EAST, 1, 1),
+)
+
+# Parts of the padded chunk filled by a neighbor chunk and the parts of the neighbor they are copied from, by offset
+_TARGET = {-1: slice(0, 1), 0: slice(1, -1), 1: slice(-1, None)}
+_SOURCE = {-1: slice(-1, None), 0: slice(None), 1: slice(0, 1)}
+_HALO = tuple(
+    (dx, dy, (_TARGET[dy], _TARGET[dx]), (_SOURCE[dy], _SOURCE[dx]))
+    for dy in (-1, 0, 1)
+    for dx in (-1, 0, 1)
+    if dx or dy
+)
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def step_chunk(padded: np.ndarray, chunk: np.ndarray, rule: np.ndarray, moore: bool) -> tuple[int, int]:
+    """Calculates the next state of a chunk from the chunk with a halo of one cell of its neighbors around it.
+
+    Every cell of `chunk` has all its neighbors in `padded`, so the
+    neighbors are read without bounds checks.
+
+    Args:
+        padded: Matrix (size + 2 x size + 2), the chunk in the middle.
+        chunk: Matrix (size x size) that receives the next state.
+        rule: The transition table of the rule (`RuleTable.table`).
+        moore: Whether the Moore (8 cells) or the Neumann (4 cells) neighborhood is used.
+
+    Returns:
+        The number of living cells and of the cells in any state but 0 of the next state.
+    """
+    size = chunk.shape[0]
+    living = 0
+    occupied = 0
+    for y in range(size):
+        for x in range(size):
+            mask = 0
+            bit = 0
+            for i in range(3):
+                for j in range(3):
+                    if i == 1 and j == 1:
+                        continue
+                    if (moore or i == 1 or j == 1) and padded[y + i, x + j] == 1:
+                        mask |= 1 << bit
+                    bit += 1
+
+            state = rule[padded[y + 1, x + 1], mask]
+            chunk[y, x] = state
+            if state:
+                occupied += 1
+                if state == 1:
+                    living += 1
+    return living, occupied
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def chunk_edges(chunk: np.ndarray) -> int:
+    """The edges and the corners of the chunk with living cells, `NORTH` | `EAST` | ..."""
+    last = chunk.shape[0] - 1
+    edges = 0
+    for k in range(last + 1):
+        if chunk[0, k] == 1:
+            edges |= NORTH
+        if chunk[last, k] == 1:
+            edges |= SOUTH
+        if chunk[k, 0] == 1:
+            edges |= WEST
+        if chunk[k, last] == 1:
+            edges |= EAST
+    if chunk[0, 0] == 1:
+        edges |= NORTH_WEST
+    if chunk[0, last] == 1:
+        edges |= NORTH_EAST
+    if chunk[last, 0] == 1:
+        edges |= SOUTH_WEST
+    if chunk[last, last] == 1:
+        edges |= SOUTH_EAST
+    return edges
+
+
+@dataclass(slots=True)
+class ChunkStats:
+    """Chunks of the world, now and since the start.
+
+    Attributes:
+        chunks: Allocated chunks.
+        allocated: Chunks allocated since the start.
+        freed: Chunks freed since the start.
+        generations: Number of calculated generations.
+
+    """
+
+    chunks: int = 0
+    allocated: int = 0
+    freed: int = 0
+    generations: int = 0
+
+
+class ChunkWorld:
+    """An unbounded plane of square chunks, only the chunks around the pattern are allocated.
+
+    The chunks are kept in a dictionary by their coordinates (the cell (x, y)
+    is in the chunk (x // chunk, y // chunk), negative ones too). Before a
+    generation, a chunk with living cells on an edge allocates the missing
+    neighbor chunk on that side, the only place a cell can be born outside
+    the allocated chunks (B0 rules would fill the whole plane, they are not
+    supported). Every chunk is calculated from a copy of it with a halo of
+    one cell of its neighbors, and a chunk that has been empty for
+    `idle_generations` generations is freed, so the memory follows the
+    footprint of the pattern. An empty chunk next to living cells on the
+    edge of its neighbor is not idle, a still life on the edge would free
+    and allocate it again every few generations.
+
+    Attributes:
+        chunk: Width and height of a chunk in cells.
+        idle_generations: Generations an empty chunk is kept, so an oscillator on its edge does not reallocate it.
+        chunks: The states of the cells of the allocated chunks by their coordinates.
+        population: Number of living cells of the plane.
+        stats: Allocated and freed chunks.
+
+    """
+
+    chunk: int
+    idle_generations: int
+    chunks: dict[tuple[int, int], np.ndarray]
+    population: int
+    stats: ChunkStats
+
+    def __init__(self, chunk: int = CHUNK_SIZE, idle_generations: int = IDLE_GENERATIONS) -> None:
+        self.chunk = chunk
+        self.idle_generations = idle_generations
+        self.chunks = {}
+        self.population = 0
+        self.stats = ChunkStats()
+
+        self._living: dict[tuple[int, int], int] = {}
+        self._edges: dict[tuple[int, int], int] = {}
+        self._idle: dict[tuple[int, int], int] = {}  # Generations the chunk has been empty and idle
+        self._spare: list[np.ndarray] = []  # The chunks of the previous generation, reused for the next one
+        self._padded = np.zeros((chunk + 2, chunk + 2), dtype=np.uint8)
+
+    def load(self, field: np.ndarray, x: int = 0, y: int = 0) -> None:
+        """Replaces the whole plane with the cells of the matrix placed at (x, y)."""
+        self.chunks.clear()
+        self._living.clear()
+        self._edges.clear()
+        self._idle.clear()
+        self._spare.clear()
+        self.population = 0
+
+        height, width = field.shape
+        size = self.chunk
+        for top in range(y // size * size, y + height, size):
+            for left in range(x // size * size, x + width, size):
+                # The part of the matrix in the chunk, in the coordinates of the plane
+                x0, y0 = max(left, x), max(top, y)
+                x1, y1 = min(left + size, x + width), min(top + size, y + height)
+                part = field[y0 - y : y1 - y, x0 - x : x1 - x]
+                if not part.any():
+                    continue
+                key = (left // size, top // size)
+                chunk = self._allocate(key)
+                chunk[y0 - top : y1 - top, x0 - left : x1 - left] = part
+                self._observe(key, chunk, int(np.count_nonzero(chunk == 1)), int(np.count_nonzero(chunk)))
+        self.stats.chunks = len(self.chunks)
+
+    def _allocate(self, key: tuple[int, int]) -> np.ndarray:
+        chunk = np.zeros((self.chunk, self.chunk), dtype=np.uint8)
+        self.chunks[key] = chunk
+        self._living[key] = self._edges[key] = self._idle[key] = 0
+        self.stats.allocated += 1
+        return chunk
+
+    def _observe(self, key: tuple[int, int], chunk: np.ndarray, living: int, occupied: int) -> None:
+        """Keeps the living cells, the edges and the idle generations of the new state of the chunk."""
+        self.population += living - self._living[key]
+        self._living[key] = living
+        self._edges[key] = chunk_edges(chunk) if living else 0
+        self._idle[key] = 0 if occupied else self._idle[key] + 1
+
+    def _bordering(self) -> set[tuple[int, int]]:
+        """The chunks next to the living cells on the edges of the chunks, allocated or not."""
+        return {
+            (column + dx, row + dy)
+            for (column, row), edges in self._edges.items()
+            for edge, dx, dy in _GROWTH
+            if edges & edge
+        }
+
+    def _grow(self) -> None:
+        """Allocates the empty chunks next to the living cells on the edges of the chunks."""
+        for key in self._bordering() - self.chunks.keys():
+            self._allocate(key)
+
+    def _free(self) -> None:
+        """Frees the chunks idle for `idle_generations` generations."""
+        for key in self._bordering() & self._idle.keys():
+            self._idle[key] = 0  # The cells of the neighbor can be born in it at any generation
+        for key in [key for key, idle in self._idle.items() if idle >= self.idle_generations]:
+            self._spare.append(self.chunks.pop(key))
+            del self._living[key], self._edges[key], self._idle[key]
+            self.stats.freed += 1
+        del self._spare[len(self.chunks) :]  # The buffers of the freed chunks are not kept
+
+    def _gather(self, key: tuple[int, int], chunk: np.ndarray) -> np.ndarray:
+        """The chunk with a halo of one cell copied from its neighbor chunks, 0 where they are not allocated."""
+        padded = self._padded
+        padded[1:-1, 1:-1] = chunk
+        column, row = key
+        for dx, dy, target, source in _HALO:
+            neighbor = self.chunks.get((column + dx, row + dy))
+            padded[target] = 0 if neighbor is None else neighbor[source]
+        return padded
+
+    def step(self, rule: np.ndarray, moore: bool = True) -> None:
+        """Advances the plane by one generation.
+
+        Raises:
+            ValueError: If the rule gives birth with 0 neighbors (B0).
+        """
+        if rule[0, 0]:
+            msg = "B0 rules are not supported by the chunked world"
+            raise ValueError(msg)
+
+        self._grow()
+        following = {}
+        for key, chunk in self.chunks.items():
+            target = self._spare.pop() if self._spare else np.empty_like(chunk)
+            living, occupied = step_chunk(self._gather(key, chunk), target, rule, moore)
+            following[key] = target
+            self._observe(key, target, living, occupied)
+
+        self._spare.extend(self.chunks.values())
+        self.chunks = following
+        self._free()
+        self.stats.chunks = len(self.chunks)
+        self.stats.generations += 1
+
+    def region(self, field: np.ndarray, left: int = 0, top: int = 0) -> None:
+        """Copies the cells of the plane from (left, top) into the field, the cells out of the chunks are 0."""
+        height, width = field.shape
+        size = self.chunk
+        field[:] = 0
+        for (column, row), chunk in self.chunks.items():
+            x, y = column * size - left, row * size - top
+            if x >= width or y >= height or x + size <= 0 or y + size <= 0:
+                continue
+            field[max(y, 0) : y + size, max(x, 0) : x + size] = chunk[max(-y, 0) : height - y, max(-x, 0) : width - x]
+
+    def bounds(self) -> tuple[int, int, int, int] | None:
+        """Left, top, right and bottom (exclusive) of the allocated chunks in cells, None if there are none."""
+        if not self.chunks:
+            return None
+        columns, rows = zip(*self.chunks, strict=True)
+        size = self.chunk
+        return min(columns) * size, min(rows) * size, (max(columns) + 1) * size, (max(rows) + 1) * size
+
+    def check_cells(
+        self,
+        current_field: np.ndarray,  # noqa: ARG002
+        next_field: np.ndarray,
+        width: int,
+        height: int,
+        rule: np.ndarray,
+        mode: Literal["Moore", "Neumann"] = "Moore",
+    ) -> CheckCells:
+        """Alternative to `check_cells` which advances the plane by one generation.
+
+        The plane itself is kept in `chunks`, `current_field` is not read, and
+        `next_field` receives the visible region [0, width) x [0, height).
+
+        Raises:
+            ValueError: If `mode` argument is unknown or the rule is B0.
+
+        Returns:
+            The visible region of the next state, and an array of live cells
+            that will be drawn.
+        """
+        if mode not in {"Moore", "Neumann"}:
+            msg = "mode is not set!"
+            raise ValueError(msg)
+
+        self.step(rule, moore=mode == "Moore")
+        self.region(next_field[:height, :width])
+        # Transposed, so the cells come in the same order (column by column) as from `check_cells`
+        return next_field, np.argwhere(next_field[:height, :width].T == 1)
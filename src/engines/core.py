@@ -1,12 +1,30 @@
-from typing import Literal
+from typing import Any, Literal
 
 import numpy as np
-from numba import njit  # type: ignore
+from numba import njit, types  # type: ignore
+from numba.core.typing import Signature  # type: ignore
 
 from src.misc.type_aliases import CheckCells
 
-
-@njit(fastmath=True)  # type: ignore
+FIELD = types.Array(types.uint8, 2, "C")  # The fields of the engine
+RULE = types.Array(types.uint8, 2, "C", readonly=True)  # `RuleTable.table`, it is read-only
+
+# Explicit signatures of the kernels for the types the engine passes. They are compiled (or loaded from the cache on
+# disk) by `compile_kernels`, e.g. in the background at startup, not on the first call. Other types (like the views
+# of the tiled backend) are still compiled on the first call.
+COUNT_SIGNATURE = types.int64(FIELD, types.int64, types.int64, types.int64, types.int64)
+MASK_SIGNATURE = types.int64(FIELD, types.int64, types.int64, types.int64, types.int64, types.boolean)
+CHECK_CELLS_SIGNATURE = types.Tuple((FIELD, types.List(types.UniTuple(types.int64, 2))))(
+    FIELD,
+    FIELD,
+    types.int64,
+    types.int64,
+    RULE,
+    types.unicode_type,
+)
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
 def count_neighbors_Moore(field: np.ndarray, row: int, column: int, width_field: int, height_field: int) -> int:
     """Efficient* counts all 8 neighbors for a cell.
 
@@ -41,7 +59,7 @@ def count_neighbors_Moore(field: np.ndarray, row: int, column: int, width_field:
     return neighbors
 
 
-@njit(fastmath=True)  # type: ignore
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
 def count_neighbors_Neumann(field: np.ndarray, row: int, column: int, width_field: int, height_field: int) -> int:
     """Efficient* counts only 4 neighbors for a cell.
 
@@ -76,24 +94,67 @@ def count_neighbors_Neumann(field: np.ndarray, row: int, column: int, width_fiel
     return neighbors
 
 
-@njit(fastmath=True)
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def neighbors_mask(
+    field: np.ndarray,
+    row: int,
+    column: int,
+    width_field: int,
+    height_field: int,
+    moore: bool,
+) -> int:
+    """Builds the mask of the living neighbors of a cell, the index in a transition table.
+
+    The bits go row by row over the 3x3 square without the centre (NW, N, NE,
+    W, E, SW, S, SE), see `src.engines.rules`. In the Neumann neighborhood
+    the diagonal neighbors are not counted. Only cells in state 1 are living,
+    the dying cells of the Generations rules are not.
+
+    Args:
+        field: The field on which the cells are located
+        row: Cell x coordinate for which neighbors are calculated
+        column: Cell y coordinate for which neighbors are calculated
+        width_field: Field width - boundary for calculations
+        height_field: Field height - boundary for calculations
+        moore: Whether the Moore (8 cells) or the Neumann (4 cells) neighborhood is used
+
+    Returns:
+        Mask of 8 bits with the living neighbors of the cell.
+    """
+    mask = 0
+    bit = 0
+
+    for i in range(-1, 2):
+        for j in range(-1, 2):
+            if i == 0 and j == 0:
+                continue
+
+            x = row + i
+            y = column + j
+            if (moore or i == 0 or j == 0) and 0 <= y < width_field and 0 <= x < height_field and field[x][y] == 1:
+                mask |= 1 << bit
+            bit += 1
+
+    return mask
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
 def check_cells(
     current_field: np.ndarray,
     next_field: np.ndarray,
     width: int,
     height: int,
-    rule: tuple[tuple[int, ...], tuple[int, ...]],
+    rule: np.ndarray,
     mode: Literal["Moore", "Neumann"] = "Moore",
 ) -> CheckCells:
-    """Counts for each cell how many living neighbors are nearby (3x3 cells).
+    """Calculates for each cell its next state by its living neighbors nearby (3x3 cells).
 
     Accepts the current state of the field and the next. Based on the current
-    one, the next state for next_field is calculated. Iterates over each cell
-    and for each cell checks all its 8 neighbors. If there are fewer neighbors
-    by the condition, then the cell dies and will not appear in next_filed.
-    Also, if a cell survives it seems, it is entered into
-    result_for_drawing array, which is sent to the draw_area() method and all
-    the cells in it will be drawn.
+    one, the next state for next_field is calculated. Iterates over each cell,
+    builds the mask of its living neighbors and looks up the next state of the
+    cell in the transition table of the rule. If a cell is alive in the next
+    state, it is entered into result_for_drawing array, which is sent to the
+    draw_area() method and all the cells in it will be drawn.
 
     Args:
         current_field: The current state of the playing field, according to
@@ -105,8 +166,9 @@ def check_cells(
         width: Number indicating the width of the playing field
         height: Number indicating the height of the playing field
         mode: Mod defining the principle of counting cell neighbors
-        rule: A rule of the form [(2, ...), (3, 4, ...)] means that the cell
-            appears with 2 neighbors, and survives if out of 3 or 4.
+        rule: The transition table of the rule (`RuleTable.table` from
+            `compile_rule`): the next state by the current state and the mask
+            of the living neighbors.
 
     Raises:
         ValueError: If `mode` argument was not passed.
@@ -117,42 +179,49 @@ def check_cells(
     """
     result_for_drawing = []
 
+    if mode == "Neumann":
+        moore = False
+    elif mode == "Moore":
+        moore = True
+    else:
+        msg = "mode is not set!"
+        raise ValueError(msg)
+
     for x in range(width):
         for y in range(height):
-            if mode == "Neumann":
-                count_living = count_neighbors_Neumann(
-                    field=current_field,
-                    row=y,
-                    column=x,
-                    width_field=width,
-                    height_field=height,
-                )
-            elif mode == "Moore":
-                count_living = count_neighbors_Moore(
-                    field=current_field,
-                    row=y,
-                    column=x,
-                    width_field=width,
-                    height_field=height,
-                )
-            else:
-                msg = "mode is not set!"
-                raise ValueError(msg)
-
-            _be = rule[0]
-            _survives = rule[1]
-
-            # Apply rules for number of live cells nearby
-            if current_field[y][x] == 1:
-                if count_living in _survives:
-                    next_field[y][x] = 1
-                    result_for_drawing.append((x, y))
-                else:
-                    next_field[y][x] = 0
-            elif count_living in _be:
-                next_field[y][x] = 1
+            mask = neighbors_mask(
+                field=current_field,
+                row=y,
+                column=x,
+                width_field=width,
+                height_field=height,
+                moore=moore,
+            )
+
+            # One lookup instead of the rules for the number of live cells nearby
+            state = rule[current_field[y][x], mask]
+            next_field[y][x] = state
+            if state == 1:
                 result_for_drawing.append((x, y))
-            else:
-                next_field[y][x] = 0
 
     return next_field, result_for_drawing
+
+
+SIGNATURES: dict[Any, Signature] = {
+    count_neighbors_Moore: COUNT_SIGNATURE,
+    count_neighbors_Neumann: COUNT_SIGNATURE,
+    neighbors_mask: MASK_SIGNATURE,
+    check_cells: CHECK_CELLS_SIGNATURE,
+}
+
+
+def compile_kernels(*kernels: Any, signatures: dict[Any, Signature] | None = None) -> None:
+    """Compiles the kernels (all of them by default) for their signatures, or loads them from the cache on disk.
+
+    Args:
+        kernels: The kernels to compile, all the kernels of `signatures` if none.
+        signatures: The kernels with their signatures, `SIGNATURES` by default.
+    """
+    signatures = SIGNATURES if signatures is None else signatures
+    for kernel in kernels or tuple(signatures):
+        kernel.compile(signatures[kernel])
@@ -0,0 +1,118 @@
+from collections import deque
+from typing import NamedTuple
+
+import numpy as np
+
+from src.misc.type_aliases import ResultToDrawing
+
+CYCLE_WINDOW = 256  # Generations whose hashes are kept, the longest period that is found
+
+
+class Frame(NamedTuple):
+    """A generation of a cycle, as `GameEngine.process` leaves it.
+
+    Attributes:
+        area: Copy of `GameEngine.current_area`.
+        cells: The living cells returned by `process`.
+        births: The cells born since the previous generation.
+        deaths: The cells died since the previous generation.
+
+    """
+
+    area: np.ndarray
+    cells: ResultToDrawing
+    births: np.ndarray
+    deaths: np.ndarray
+
+
+def _contributions(keys: np.ndarray, states: np.ndarray) -> int:
+    """XOR of the keys of the cells rotated by their states, the dead cells (state 0) give nothing."""
+    shift = states.astype(np.uint64)
+    rotated = (keys << shift) | (keys >> (np.uint64(64) - shift))
+    return int(np.bitwise_xor.reduce(np.where(states != 0, rotated, np.uint64(0)), axis=None))
+
+
+class CycleDetector:
+    """Finds out that the field has become periodic, by the hashes of its generations.
+
+    The hash of the field is the XOR of a random 64-bit key of every cell
+    that is not dead, rotated by the state of the cell (Zobrist hashing), so
+    it is updated only by the cells changed in a generation. The hashes of the
+    last `window` generations are kept; the generation with the hash of an
+    earlier one gives the period. The field is periodic for sure (`confirmed`)
+    when all the generations of a whole period repeated the previous ones.
+
+    Attributes:
+        window: Number of the generations whose hashes are kept.
+        hash: Hash of the current field.
+        period: Generations between the repeating fields, None if the field does not repeat.
+        start: The generation since which the field has been repeating.
+
+    """
+
+    window: int
+    hash: int
+    period: int | None
+    start: int | None
+
+    def __init__(self, width: int, height: int, window: int = CYCLE_WINDOW, seed: int = 0) -> None:
+        self.window = window
+        rng = np.random.default_rng(seed)
+        self._keys = rng.integers(0, np.iinfo(np.uint64).max, size=(height, width), dtype=np.uint64, endpoint=True)
+        self.hash = 0
+        self.period = None
+        self.start = None
+        self._repeats = 0
+        self._seen: dict[int, int] = {}  # Hash -> the last generation with it
+        self._history: deque[tuple[int, int]] = deque()  # (generation, hash) in the order of the generations
+
+    @property
+    def confirmed(self) -> bool:
+        """Whether every generation of a whole period repeated the generation one period before it."""
+        return self.period is not None and self._repeats >= self.period
+
+    def reset(self, field: np.ndarray, generation: int) -> None:
+        """Forgets the history, the hash is calculated from the whole field."""
+        self.hash = _contributions(self._keys, field)
+        self._seen.clear()
+        self._history.clear()
+        self.period = self.start = None
+        self._repeats = 0
+        self._remember(generation)
+
+    def update(self, previous: np.ndarray, field: np.ndarray, changes: np.ndarray) -> None:
+        """Updates the hash by the changed cells.
+
+        Args:
+            previous: Matrix (height x width) with the states of the previous generation.
+            field: Matrix (height x width) with the states of the current generation.
+            changes: Array (N, 2) of (x, y) pairs of all the cells that differ between them.
+        """
+        xs, ys = changes[:, 0], changes[:, 1]
+        keys = self._keys[ys, xs]
+        self.hash ^= _contributions(keys, previous[ys, xs]) ^ _contributions(keys, field[ys, xs])
+
+    def observe(self, generation: int) -> int | None:
+        """Remembers the hash of the generation and finds the period.
+
+        Returns:
+            The period of the field, None if the hash is new.
+        """
+        seen = self._seen.get(self.hash)
+        if seen is None or (self.period is not None and generation - seen != self.period):
+            self.period = self.start = None
+            self._repeats = 0
+        if seen is not None:
+            if self.period is None:
+                self.period, self.start = generation - seen, seen
+            self._repeats += 1
+        self._remember(generation)
+        return self.period
+
+    def _remember(self, generation: int) -> None:
+        self._seen[self.hash] = generation
+        self._history.append((generation, self.hash))
+        if len(self._history) > self.window:
+            old_generation, old_hash = self._history.popleft()
+            if self._seen.get(old_hash) == old_generation:
+                del self._seen[old_hash]
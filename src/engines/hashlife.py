@@ -0,0 +1,343 @@
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+import numpy as np
+
+from src.engines.rules import NEIGHBORHOODS
+from src.engines.vectorized import NEIGHBOR_OFFSETS
+from src.misc.type_aliases import CheckCells
+
+MAX_NODES = 1 << 20
+BASE_LEVEL = 2  # 4x4 nodes, their result is calculated cell by cell
+MIN_LEVEL = 3
+
+
+@dataclass(eq=False, slots=True)
+class Node:
+    """Node of the quadtree, a square of 2^level x 2^level cells.
+
+    Nodes are canonical (see `HashLife.join`): two nodes with the same
+    content are the same object, so they are compared and hashed by identity.
+    """
+
+    level: int
+    population: int
+    nw: Optional["Node"] = None
+    ne: Optional["Node"] = None
+    sw: Optional["Node"] = None
+    se: Optional["Node"] = None
+
+
+_DEAD = Node(level=0, population=0)
+_ALIVE = Node(level=0, population=1)
+
+
+class HashLife:
+    """HashLife algorithm: the field is a canonical quadtree with memoized results.
+
+    The result of a node (its centre advanced by 2^j generations) is computed
+    once and then reused for every copy of this node, so repetitive patterns
+    can be advanced by billions of generations at once. The field is an
+    unbounded plane: cells are not clipped at the borders of the window.
+
+    Attributes:
+        root: The quadtree with all the living cells.
+        x: Coordinate of the left column of `root`.
+        y: Coordinate of the top row of `root`.
+        generation: Number of generations calculated since `load`.
+        max_nodes: Limit of canonical nodes, when it is exceeded the nodes not
+            reachable from `root` are dropped together with all memoized results.
+
+    """
+
+    root: Node
+    x: int
+    y: int
+    generation: int
+    max_nodes: int
+
+    def __init__(self, max_nodes: int = MAX_NODES) -> None:
+        self.max_nodes = max_nodes
+
+        self._nodes: dict[tuple[Node, Node, Node, Node], Node] = {}
+        self._zeros: list[Node] = [_DEAD]
+        self._results: dict[tuple[Node, int], Node] = {}
+        self._rule: tuple[bytes, bool] = (bytes(2 * NEIGHBORHOODS), True)
+
+        self.root = self.zero(MIN_LEVEL)
+        self.x = self.y = self.generation = 0
+
+    def set_rule(
+        self,
+        rule: np.ndarray,
+        mode: Literal["Moore", "Neumann"] = "Moore",
+    ) -> None:
+        """Sets the rule of the game, the memoized results are dropped if it has changed.
+
+        Args:
+            rule: The transition table of the rule (`RuleTable.table`).
+            mode: Mod defining the principle of counting cell neighbors.
+
+        Raises:
+            ValueError: If the rule gives birth with 0 neighbors (B0), an
+                unbounded plane would be filled entirely, has more than two
+                states, or `mode` is unknown.
+        """
+        if len(rule) != 2:  # noqa: PLR2004
+            msg = "only two-state rules are supported by HashLife"
+            raise ValueError(msg)
+        if rule[0, 0]:
+            msg = "B0 rules are not supported by HashLife"
+            raise ValueError(msg)
+        if mode not in {"Moore", "Neumann"}:
+            msg = "mode is not set!"
+            raise ValueError(msg)
+
+        new_rule = (rule.tobytes(), mode == "Moore")
+        if new_rule != self._rule:
+            self._rule = new_rule
+            self._results.clear()
+
+    @property
+    def node_count(self) -> int:
+        """Number of canonical nodes in the cache."""
+        return len(self._nodes)
+
+    def join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        """Returns the canonical node made of four quadrants."""
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = Node(level=nw.level + 1, population=population, nw=nw, ne=ne, sw=sw, se=se)
+            self._nodes[key] = node
+        return node
+
+    def zero(self, level: int) -> Node:
+        """Returns the empty node of the level."""
+        while len(self._zeros) <= level:
+            zero = self._zeros[-1]
+            self._zeros.append(self.join(zero, zero, zero, zero))
+        return self._zeros[level]
+
+    def load(self, field: np.ndarray, x: int = 0, y: int = 0) -> None:
+        """Replaces the whole plane with the cells of the matrix placed at (x, y)."""
+        height, width = field.shape
+        level = max(MIN_LEVEL, int(max(width, height, 1) - 1).bit_length())
+        side = 1 << level
+
+        square = np.zeros((side, side), dtype=np.bool_)
+        square[:height, :width] = field != 0
+
+        self.root = self._build(square, level)
+        self.x, self.y = x, y
+        self.generation = 0
+        if len(self._nodes) > self.max_nodes:  # The nodes of the previous plane are not reachable any more
+            self.collect()
+
+    def _build(self, square: np.ndarray, level: int) -> Node:
+        if level == 0:
+            return _ALIVE if square[0, 0] else _DEAD
+        if not square.any():
+            return self.zero(level)
+
+        half = 1 << (level - 1)
+        return self.join(
+            self._build(square[:half, :half], level - 1),
+            self._build(square[:half, half:], level - 1),
+            self._build(square[half:, :half], level - 1),
+            self._build(square[half:, half:], level - 1),
+        )
+
+    def _centre(self, node: Node) -> Node:
+        """Surrounds the node with empty space, the level grows by one."""
+        zero = self.zero(node.level - 1)
+        return self.join(
+            self.join(zero, zero, zero, node.nw),  # type: ignore
+            self.join(zero, zero, node.ne, zero),  # type: ignore
+            self.join(zero, node.sw, zero, zero),  # type: ignore
+            self.join(node.se, zero, zero, zero),  # type: ignore
+        )
+
+    def _inner(self, node: Node) -> Node:
+        """Central part of the node, the level decreases by one."""
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)  # type: ignore
+
+    def _life_4x4(self, node: Node) -> Node:
+        """Calculates one generation of the central 2x2 cells of a 4x4 node."""
+        cells = [[0] * 4 for _ in range(4)]
+        for top, left, quadrant in ((0, 0, node.nw), (0, 2, node.ne), (2, 0, node.sw), (2, 2, node.se)):
+            cells[top][left] = quadrant.nw.population  # type: ignore
+            cells[top][left + 1] = quadrant.ne.population  # type: ignore
+            cells[top + 1][left] = quadrant.sw.population  # type: ignore
+            cells[top + 1][left + 1] = quadrant.se.population  # type: ignore
+
+        table, moore = self._rule
+        result = []
+        for y, x in ((1, 1), (1, 2), (2, 1), (2, 2)):
+            mask = 0
+            for bit, (row, column) in enumerate(NEIGHBOR_OFFSETS):
+                if moore or not row or not column:
+                    mask |= cells[y + row][x + column] << bit
+            result.append(_ALIVE if table[cells[y][x] * NEIGHBORHOODS + mask] else _DEAD)
+
+        return self.join(*result)
+
+    def _successor(self, node: Node, j: int) -> Node:
+        """Central half of the node advanced by 2^j generations (j <= level - 2)."""
+        if node.population == 0:
+            return node.nw  # type: ignore
+        key = (node, j)
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        if node.level == BASE_LEVEL:
+            result = self._life_4x4(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            sub_j = min(j, node.level - 3)
+            # Nine overlapping subnodes of the half size
+            c1 = self._successor(nw, sub_j)  # type: ignore
+            c2 = self._successor(self.join(nw.ne, ne.nw, nw.se, ne.sw), sub_j)  # type: ignore
+            c3 = self._successor(ne, sub_j)  # type: ignore
+            c4 = self._successor(self.join(nw.sw, nw.se, sw.nw, sw.ne), sub_j)  # type: ignore
+            c5 = self._successor(self._inner(node), sub_j)
+            c6 = self._successor(self.join(ne.sw, ne.se, se.nw, se.ne), sub_j)  # type: ignore
+            c7 = self._successor(sw, sub_j)  # type: ignore
+            c8 = self._successor(self.join(sw.ne, se.nw, sw.se, se.sw), sub_j)  # type: ignore
+            c9 = self._successor(se, sub_j)  # type: ignore
+
+            if j < node.level - 2:
+                # The subnodes are already advanced by 2^j generations, only their centres are needed
+                result = self.join(
+                    self.join(c1.se, c2.sw, c4.ne, c5.nw),  # type: ignore
+                    self.join(c2.se, c3.sw, c5.ne, c6.nw),  # type: ignore
+                    self.join(c4.se, c5.sw, c7.ne, c8.nw),  # type: ignore
+                    self.join(c5.se, c6.sw, c8.ne, c9.nw),  # type: ignore
+                )
+            else:
+                # The subnodes are advanced by the first half of 2^j generations, here is the second one
+                result = self.join(
+                    self._successor(self.join(c1, c2, c4, c5), sub_j),
+                    self._successor(self.join(c2, c3, c5, c6), sub_j),
+                    self._successor(self.join(c4, c5, c7, c8), sub_j),
+                    self._successor(self.join(c5, c6, c8, c9), sub_j),
+                )
+
+        self._results[key] = result
+        return result
+
+    def _advance(self, j: int) -> None:
+        """Advances the whole plane by 2^j generations."""
+        while self.root.level < j + 2 or self._inner(self._inner(self.root)).population != self.root.population:
+            self._expand()
+        self._expand()
+
+        shift = 1 << (self.root.level - 2)
+        self.root = self._successor(self.root, j)
+        self.x += shift
+        self.y += shift
+        self.generation += 1 << j
+
+    def _expand(self) -> None:
+        shift = 1 << (self.root.level - 1)
+        self.root = self._centre(self.root)
+        self.x -= shift
+        self.y -= shift
+
+    def _shrink(self) -> None:
+        """Removes the empty space around the pattern."""
+        while self.root.level > MIN_LEVEL and self._inner(self.root).population == self.root.population:
+            shift = 1 << (self.root.level - 2)
+            self.root = self._inner(self.root)
+            self.x += shift
+            self.y += shift
+
+    def step(self, generations: int = 1) -> None:
+        """Advances the plane by any number of generations, by jumps of 2^j generations."""
+        j = 0
+        while generations:
+            if generations & 1:
+                self._advance(j)
+            generations >>= 1
+            j += 1
+
+        self._shrink()
+        if len(self._nodes) > self.max_nodes:
+            self.collect()
+
+    def collect(self) -> None:
+        """Garbage collection: keeps only the nodes reachable from `root` and drops the memoized results."""
+        reachable: dict[tuple[Node, Node, Node, Node], Node] = {}
+        stack = [self.root, *self._zeros[1:]]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key not in reachable:
+                reachable[key] = node  # type: ignore
+                stack.extend(key)  # type: ignore
+
+        self._nodes = reachable
+        self._results.clear()
+
+    def cells(self, left: int, top: int, width: int, height: int) -> np.ndarray:
+        """Extracts the living cells of the region of the plane.
+
+        Returns:
+            Array (N, 2) of (x, y) pairs of living cells relative to (left, top).
+        """
+        result: list[tuple[int, int]] = []
+        stack = [(self.root, self.x - left, self.y - top)]
+        while stack:
+            node, x, y = stack.pop()
+            size = 1 << node.level
+            if node.population == 0 or x >= width or y >= height or x + size <= 0 or y + size <= 0:
+                continue
+            if node.level == 0:
+                result.append((x, y))
+                continue
+
+            half = size >> 1
+            stack.append((node.nw, x, y))  # type: ignore
+            stack.append((node.ne, x + half, y))  # type: ignore
+            stack.append((node.sw, x, y + half))  # type: ignore
+            stack.append((node.se, x + half, y + half))  # type: ignore
+        return np.array(result, dtype=np.int64).reshape(-1, 2)
+
+    def region(self, field: np.ndarray, left: int = 0, top: int = 0) -> np.ndarray:
+        """Copies the cells of the plane from (left, top) into the field.
+
+        Returns:
+            Array (N, 2) of (x, y) pairs of living cells of the region relative
+            to (left, top), column by column as from `check_cells`.
+        """
+        height, width = field.shape
+        cells = self.cells(left, top, width, height)
+        field[:] = 0
+        field[cells[:, 1], cells[:, 0]] = 1
+        return np.argwhere(field.T == 1)
+
+    def check_cells(
+        self,
+        current_field: np.ndarray,  # noqa: ARG002
+        next_field: np.ndarray,
+        width: int,
+        height: int,
+        rule: np.ndarray,
+        mode: Literal["Moore", "Neumann"] = "Moore",
+    ) -> CheckCells:
+        """Alternative to `check_cells` which advances the plane by one generation.
+
+        The plane itself is kept in `root`, `current_field` is not read, and
+        `next_field` receives the visible region [0, width) x [0, height).
+
+        Returns:
+            The visible region of the next state, and an array of live cells
+            that will be drawn.
+        """
+        self.set_rule(rule, mode)
+        self.step(1)
+        return next_field, self.region(next_field[:height, :width])
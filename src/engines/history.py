@@ -0,0 +1,304 @@
+"""History of a run: the changes of every generation and keyframes of the whole field, for seeking.
+
+A log is `MAGIC`, the length of the header (uint32, little endian), the
+header (JSON, the `SnapshotInfo` of the first recorded generation) and the
+records. A record is its kind, its generation and the length of its payload
+(`_RECORD`), then the payload:
+
+- a keyframe is the whole field, bit-packed if it has only the states 0
+  and 1, compressed by zlib;
+- a delta is the number of the born and of the died cells (`_COUNTS`), their
+  flat indices (uint32, the born cells first) and, if some cells die into
+  the dying states of the Generations rules, the states of the died cells.
+
+The generations and offsets of the keyframes are appended to the index next
+to the log (`index_path`, int64 pairs), so seeking to a generation decodes
+the keyframe before it and the deltas after it only. Both files are only
+appended to, through buffers of a bounded size: a run that breaks off loses
+the buffered records, the reader ignores a record cut in the middle.
+"""
+
+import json
+import mmap
+import struct
+import zlib
+from collections.abc import Iterator
+from enum import IntEnum
+from pathlib import Path
+from typing import BinaryIO, assert_never
+
+import numpy as np
+
+from src.engines.snapshots import SnapshotInfo
+
+MAGIC = b"LIFEHIST"
+VERSION = 1
+KEYFRAME_EVERY = 256  # Generations between the keyframes
+BUFFER = 1 << 20  # Bytes of the records buffered before they are written
+
+_LENGTH = struct.Struct("<I")
+_RECORD = struct.Struct("<BqI")  # Kind, generation, length of the payload
+_COUNTS = struct.Struct("<II")  # Born and died cells of a delta
+_INDEX = struct.Struct("<qq")  # Generation and offset of a keyframe
+_MAX_CELLS = 1 << 32  # The flat indices are uint32
+
+
+class Record(IntEnum):
+    """Kinds of the records of a history log."""
+
+    KEYFRAME = 0  # The field, a byte per cell
+    PACKED = 1  # The field, a bit per cell
+    DELTA = 2  # The born and the died cells, the died cells are 0
+    DYING = 3  # The born and the died cells with the states of the died cells
+
+
+def index_path(path: Path) -> Path:
+    """The index of the keyframes of the log."""
+    return path.with_name(f"{path.name}.idx")
+
+
+class HistoryRecorder:
+    """Appends the generations of a run to a history log, `GameEngine.process` feeds it.
+
+    A delta is only the changes the engine finds anyway, turned into flat
+    indices, so it costs a few whole-array operations on the changed cells.
+
+    Attributes:
+        path: The log.
+        keyframe_every: Generations between the keyframes, the most deltas a seek decodes.
+        level: Compression level of zlib for the keyframes, 0-9.
+        generation: The last recorded generation, None before the first record.
+        records: Number of the written records.
+        keyframes: Number of the written keyframes.
+        size: Bytes of the log.
+
+    """
+
+    path: Path
+    keyframe_every: int
+    level: int
+    generation: int | None
+    records: int
+    keyframes: int
+    size: int
+
+    def __init__(
+        self,
+        path: Path,
+        info: SnapshotInfo,
+        keyframe_every: int = KEYFRAME_EVERY,
+        level: int = 1,
+        buffer: int = BUFFER,
+    ) -> None:
+        """Creates the log and its index, an existing log is replaced.
+
+        Raises:
+            ValueError: If the field has more cells than the flat indices can address.
+            OSError: If the files cannot be created.
+        """
+        if info.width * info.height > _MAX_CELLS:
+            msg = f"the field {info.width}x{info.height} is too large for a history, the most is {_MAX_CELLS} cells"
+            raise ValueError(msg)
+
+        self.path = path
+        self.keyframe_every = keyframe_every
+        self.level = level
+        self.generation = None
+        self.records = self.keyframes = 0
+        self._width = info.width
+        self._keyframe: int | None = None  # Generation of the last keyframe
+
+        header = json.dumps({"version": VERSION, **info.as_header(), "keyframe_every": keyframe_every}).encode()
+        self._log: BinaryIO = path.open("wb", buffering=buffer)
+        self._index: BinaryIO = index_path(path).open("wb", buffering=_INDEX.size * 256)
+        self._log.write(MAGIC + _LENGTH.pack(len(header)) + header)
+        self.size = len(MAGIC) + _LENGTH.size + len(header)
+
+    def keyframe_due(self, generation: int) -> bool:
+        """Whether the generation is recorded as a keyframe."""
+        return self._keyframe is None or generation - self._keyframe >= self.keyframe_every
+
+    def keyframe(self, generation: int, field: np.ndarray) -> None:
+        """Appends the whole field of the generation.
+
+        Raises:
+            ValueError: If the generation is before the last recorded one.
+        """
+        self._check(generation)
+        packed = field.max(initial=0) <= 1
+        cells = np.packbits(field, axis=1) if packed else field
+        payload = zlib.compress(cells.tobytes(), self.level)
+        self._index.write(_INDEX.pack(generation, self.size))
+        self._write(Record.PACKED if packed else Record.KEYFRAME, generation, payload)
+        self._keyframe = generation
+        self.keyframes += 1
+
+    def delta(self, generation: int, births: np.ndarray, deaths: np.ndarray, dying: np.ndarray | None = None) -> None:
+        """Appends the changes since the last recorded generation.
+
+        Args:
+            generation: Number of the generation.
+            births: Array (N, 2) of (x, y) pairs of the born cells.
+            deaths: Array (N, 2) of (x, y) pairs of the died cells.
+            dying: States of the died cells, None if they are all 0.
+
+        Raises:
+            ValueError: If the generation is before the last recorded one.
+        """
+        self._check(generation)
+        changes = np.concatenate((births, deaths))
+        cells = (changes[:, 1] * self._width + changes[:, 0]).astype("<u4")
+        payload = _COUNTS.pack(len(births), len(deaths)) + cells.tobytes()
+        kind = Record.DELTA
+        if dying is not None and dying.any():
+            kind = Record.DYING
+            payload += dying.astype(np.uint8).tobytes()
+        self._write(kind, generation, payload)
+
+    def close(self) -> None:
+        """Writes the buffered records and closes the files."""
+        self._log.close()
+        self._index.close()
+
+    def _check(self, generation: int) -> None:
+        if self.generation is not None and generation < self.generation:
+            msg = f"the history is at the generation {self.generation}, it cannot go back to {generation}"
+            raise ValueError(msg)
+
+    def _write(self, kind: Record, generation: int, payload: bytes) -> None:
+        self._log.write(_RECORD.pack(kind, generation, len(payload)))
+        self._log.write(payload)
+        self.size += _RECORD.size + len(payload)
+        self.records += 1
+        self.generation = generation
+
+
+class HistoryReader:
+    """Seeks the generations of a history log, the log is mapped into memory.
+
+    Attributes:
+        path: The log.
+        info: The game at the first recorded generation.
+        keyframes: Array (N, 2) of the generations and the offsets of the keyframes.
+
+    """
+
+    path: Path
+    info: SnapshotInfo
+    keyframes: np.ndarray
+
+    def __init__(self, path: Path) -> None:
+        """Reads the header and the index of the log, the index is rebuilt from the records if it is missing.
+
+        Raises:
+            ValueError: If the file is not a history log of this version.
+        """
+        self.path = path
+        start = len(MAGIC) + _LENGTH.size
+        with path.open("rb") as stream:
+            if path.stat().st_size < start or stream.read(len(MAGIC)) != MAGIC:
+                msg = "the file is not a history log"
+                raise ValueError(msg)
+            self._view = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (length,) = _LENGTH.unpack(self._view[len(MAGIC) : start])
+        header = json.loads(self._view[start : start + length])
+        if header["version"] != VERSION:
+            self._view.close()
+            msg = f"the history has the version {header['version']}, expected {VERSION}"
+            raise ValueError(msg)
+        self.info = SnapshotInfo.from_header(header)
+        self._start = start + length
+        self.keyframes = self._read_index()
+
+    def _read_index(self) -> np.ndarray:
+        """The keyframes from the index, without those the log lost when the run broke off."""
+        index = index_path(self.path)
+        if not index.exists():
+            found = [
+                (generation, offset)
+                for kind, generation, offset, _payload in self._records(self._start, payloads=False)
+                if kind in {Record.KEYFRAME, Record.PACKED}
+            ]
+            return np.array(found, dtype=np.int64).reshape(-1, 2)
+
+        entries = np.fromfile(index, dtype="<i8")
+        keyframes = entries[: len(entries) // 2 * 2].reshape(-1, 2)
+        return keyframes[keyframes[:, 1] + _RECORD.size <= len(self._view)]
+
+    def _records(self, offset: int, payloads: bool = True) -> Iterator[tuple[Record, int, int, bytes]]:
+        """The kinds, generations, offsets and payloads of the records from the offset to the end of the log."""
+        end = len(self._view)
+        while offset + _RECORD.size <= end:
+            kind, generation, length = _RECORD.unpack_from(self._view, offset)
+            start = offset + _RECORD.size
+            if start + length > end:
+                return  # The run broke off in the middle of the record
+            try:
+                record = Record(kind)
+            except ValueError as exc:
+                msg = f"the history is damaged at the offset {offset}"
+                raise ValueError(msg) from exc
+            yield record, generation, offset, self._view[start : start + length] if payloads else b""
+            offset = start + length
+
+    def _apply(self, kind: Record, payload: bytes, field: np.ndarray) -> None:
+        """Writes the keyframe into the field or changes it by the delta."""
+        height, width = field.shape
+        match kind:
+            case Record.KEYFRAME:
+                field[:] = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(height, width)
+            case Record.PACKED:
+                packed = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(height, -1)
+                field[:] = np.unpackbits(packed, axis=1, count=width)
+            case Record.DELTA | Record.DYING:
+                born, died = _COUNTS.unpack_from(payload)
+                indices = np.frombuffer(payload, dtype="<u4", count=born + died, offset=_COUNTS.size)
+                cells = field.reshape(-1)
+                cells[indices[:born]] = 1
+                if kind is Record.DYING:
+                    offset = _COUNTS.size + indices.nbytes
+                    cells[indices[born:]] = np.frombuffer(payload, dtype=np.uint8, count=died, offset=offset)
+                else:
+                    cells[indices[born:]] = 0
+            case _ as unreachable:
+                assert_never(unreachable)
+
+    def seek(self, generation: int) -> tuple[int, np.ndarray]:
+        """The field of the generation: the keyframe before it and the deltas after the keyframe are decoded.
+
+        Returns:
+            The last recorded generation up to the given one (the turbo mode
+            records every K-th generation only) and its field.
+
+        Raises:
+            ValueError: If the history starts after the generation.
+        """
+        position = int(np.searchsorted(self.keyframes[:, 0], generation, side="right")) - 1
+        if position < 0:
+            msg = f"the history starts at the generation {self.info.generation}, not before {generation}"
+            raise ValueError(msg)
+
+        field = np.zeros((self.info.height, self.info.width), dtype=np.uint8)
+        found = int(self.keyframes[position, 0])
+        for kind, number, _offset, payload in self._records(int(self.keyframes[position, 1])):
+            if number > generation:
+                break
+            self._apply(kind, payload, field)
+            found = number
+        return found, field
+
+    def frames(self) -> Iterator[tuple[int, np.ndarray]]:
+        """Every recorded generation from the first one and its field.
+
+        The same field is changed in place by every delta, a frame that is
+        kept needs a copy.
+        """
+        field = np.zeros((self.info.height, self.info.width), dtype=np.uint8)
+        for kind, generation, _offset, payload in self._records(self._start):
+            self._apply(kind, payload, field)
+            yield generation, field
+
+    def close(self) -> None:
+        """Unmaps the log."""
+        self._view.close()
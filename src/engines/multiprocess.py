@@ -0,0 +1,271 @@
+import atexit
+import multiprocessing as mp
+import os
+import threading
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.synchronize import Barrier
+from typing import Literal
+
+import numpy as np
+from numba import njit  # type: ignore
+
+from src.engines.core import neighbors_mask
+from src.engines.rules import MAX_STATES, NEIGHBORHOODS
+from src.misc.type_aliases import CheckCells
+
+# Layout of the control block shared with the workers, the numbers of living cells of the stripes follow it.
+# The transition table and the living cells have their own blocks
+_COMMAND, _PARITY, _STATES, _MOORE = range(4)
+_CONTROL_SIZE = 4
+_STEP, _STOP = 0, 1
+STEP_TIMEOUT = 60.0  # Seconds the workers may take for a generation, a worker which died is noticed by then
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def _step_rows(
+    current_field: np.ndarray,
+    next_field: np.ndarray,
+    start: int,
+    stop: int,
+    rule: np.ndarray,
+    moore: bool,
+) -> None:
+    """Calculates rows [start, stop) of the next state of the field.
+
+    The rows directly above and below the stripe (halo rows) are read from
+    the shared field, so they do not need to be copied between the workers.
+    """
+    height, width = current_field.shape
+    for y in range(start, stop):
+        for x in range(width):
+            next_field[y, x] = rule[current_field[y, x], neighbors_mask(current_field, y, x, width, height, moore)]
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def _collect_rows(field: np.ndarray, start: int, stop: int, cells: np.ndarray) -> int:
+    """Writes the (x, y) pairs of the living cells of rows [start, stop) into `cells`.
+
+    Returns:
+        The number of the living cells.
+    """
+    count = 0
+    for y in range(start, stop):
+        for x in range(field.shape[1]):
+            if field[y, x] == 1:
+                cells[count, 0] = x
+                cells[count, 1] = y
+                count += 1
+    return count
+
+
+def _stripe_rows(height: int, stripes: int, index: int) -> tuple[int, int]:
+    """Rows [start, stop) of the stripe `index` of the field cut into `stripes` nearly equal stripes."""
+    return height * index // stripes, height * (index + 1) // stripes
+
+
+def _worker(
+    names: tuple[str, ...],
+    shape: tuple[int, int],
+    index: int,
+    stripes: int,
+    barrier: Barrier,
+) -> None:
+    """Main loop of the worker process that owns one stripe of the field.
+
+    Every generation the worker waits on the barrier for the main process to
+    publish the command, calculates its stripe, collects the living cells of
+    it and waits on the barrier again.
+    """
+    height, width = shape
+    blocks = [SharedMemory(name=name) for name in names]
+    areas = [np.ndarray(shape, dtype=np.uint8, buffer=block.buf) for block in blocks[:2]]
+    control = np.ndarray((_CONTROL_SIZE + stripes,), dtype=np.int64, buffer=blocks[2].buf)
+    table = np.ndarray((MAX_STATES, NEIGHBORHOODS), dtype=np.uint8, buffer=blocks[3].buf)
+    cells = np.ndarray((height * width, 2), dtype=np.int32, buffer=blocks[4].buf)
+    start, stop = _stripe_rows(height, stripes, index)
+
+    try:
+        while True:
+            barrier.wait()
+            if control[_COMMAND] == _STOP:
+                break
+
+            parity = int(control[_PARITY])
+            _step_rows(areas[parity], areas[1 - parity], start, stop, table[: control[_STATES]], bool(control[_MOORE]))
+            # Every stripe has room for all of its cells in the block, from its first row on
+            control[_CONTROL_SIZE + index] = _collect_rows(areas[1 - parity], start, stop, cells[start * width :])
+            barrier.wait()
+    except threading.BrokenBarrierError:  # The main process gave up on the pool
+        pass
+
+    del areas, control, table, cells
+    for block in blocks:
+        block.close()
+
+
+class StripePool:
+    """Pool of worker processes, each of them calculates its own stripe of rows.
+
+    Both states of the field (current and next) live in shared memory, the
+    workers read and write them directly, and per generation only the parity
+    of the current buffer and the transition table of the rule are passed
+    through small shared blocks, so nothing is pickled per step. Every worker
+    also collects the living cells of its stripe into a shared block, the
+    main process only joins them.
+
+    Attributes:
+        areas: Two views of the shared buffers used as the current and the
+            next state of the field in turn.
+        stripes: Rows [start, stop) owned by each worker.
+        timeout: Seconds a generation may take before the pool is given up.
+
+    """
+
+    areas: tuple[np.ndarray, np.ndarray]
+    stripes: list[tuple[int, int]]
+    timeout: float
+
+    def __init__(self, width: int, height: int, workers: int = 0, timeout: float = STEP_TIMEOUT) -> None:
+        self.timeout = timeout
+        workers = min(workers or os.cpu_count() or 1, height)
+        self.stripes = [_stripe_rows(height, workers, index) for index in range(workers)]
+
+        self._blocks = [
+            SharedMemory(create=True, size=width * height),
+            SharedMemory(create=True, size=width * height),
+            SharedMemory(create=True, size=(_CONTROL_SIZE + workers) * np.dtype(np.int64).itemsize),
+            SharedMemory(create=True, size=MAX_STATES * NEIGHBORHOODS),
+            SharedMemory(create=True, size=width * height * 2 * np.dtype(np.int32).itemsize),  # (x, y) of any cell
+        ]
+        self.areas = (
+            np.ndarray((height, width), dtype=np.uint8, buffer=self._blocks[0].buf),
+            np.ndarray((height, width), dtype=np.uint8, buffer=self._blocks[1].buf),
+        )
+        self.areas[0][:] = 0
+        self.areas[1][:] = 0
+        self._control = np.ndarray((_CONTROL_SIZE + workers,), dtype=np.int64, buffer=self._blocks[2].buf)
+        self._control[:] = 0
+        self._table = np.ndarray((MAX_STATES, NEIGHBORHOODS), dtype=np.uint8, buffer=self._blocks[3].buf)
+        self._cells = np.ndarray((height * width, 2), dtype=np.int32, buffer=self._blocks[4].buf)
+
+        names = tuple(block.name for block in self._blocks)
+        self._barrier = mp.Barrier(workers + 1)
+        self._processes = [
+            mp.Process(target=_worker, args=(names, (height, width), index, workers, self._barrier), daemon=True)
+            for index in range(workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+        self._closed = False
+        atexit.register(self.close)
+
+    def check_cells(
+        self,
+        current_field: np.ndarray,
+        next_field: np.ndarray,
+        width: int,
+        height: int,
+        rule: np.ndarray,
+        mode: Literal["Moore", "Neumann"] = "Moore",
+    ) -> CheckCells:
+        """Alternative to `check_cells` which calculates the stripes in the worker processes.
+
+        Args:
+            current_field: One of `areas` with the current state of the playing field.
+            next_field: The other one of `areas`, it will be filled with the new state.
+            width: Number indicating the width of the playing field.
+            height: Number indicating the height of the playing field.
+            rule: The transition table of the rule (`RuleTable.table`).
+            mode: Mod defining the principle of counting cell neighbors.
+
+        Raises:
+            ValueError: If `mode` argument is unknown, the fields are not shared
+                or their size is not `width` x `height`.
+            RuntimeError: If a worker has died or the generation took longer
+                than `timeout`, the pool is closed then.
+
+        Returns:
+            Calculated state for the next step, and an array of live cells that
+            will be drawn.
+        """
+        if mode not in {"Moore", "Neumann"}:
+            msg = "mode is not set!"
+            raise ValueError(msg)
+        if current_field is self.areas[0] and next_field is self.areas[1]:
+            parity = 0
+        elif current_field is self.areas[1] and next_field is self.areas[0]:
+            parity = 1
+        else:
+            msg = "fields must be the shared areas of the pool"
+            raise ValueError(msg)
+        if self.areas[0].shape != (height, width):
+            msg = f"the pool calculates fields {self.areas[0].shape[1]}x{self.areas[0].shape[0]}, not {width}x{height}"
+            raise ValueError(msg)
+
+        self._control[_COMMAND] = _STEP
+        self._control[_PARITY] = parity
+        self._control[_STATES] = len(rule)
+        self._table[: len(rule)] = rule
+        self._control[_MOORE] = mode == "Moore"
+
+        self._wait()  # start of the generation
+        self._wait()  # all stripes are calculated and their cells collected
+
+        # The cells come row by row, stripe after stripe, and are copied out of the block the next generation reuses
+        counts = self._control[_CONTROL_SIZE:]
+        return next_field, np.concatenate(
+            [
+                self._cells[start * width : start * width + count]
+                for (start, _), count in zip(self.stripes, counts, strict=True)
+            ],
+        )
+
+    def _wait(self) -> None:
+        """Waits on the barrier with the workers.
+
+        Raises:
+            RuntimeError: If a worker has died or they did not come in `timeout`
+                seconds, the pool is closed then.
+        """
+        dead = [process.pid for process in self._processes if not process.is_alive()]
+        if dead:
+            reason = f"the workers {dead} died"
+        else:
+            try:
+                self._barrier.wait(self.timeout)
+            except threading.BrokenBarrierError:  # The other workers leave the broken barrier and stop
+                reason = f"the workers did not finish a generation in {self.timeout} s"
+            else:
+                return
+
+        self.close()
+        msg = f"the multiprocess backend has stopped: {reason}"
+        raise RuntimeError(msg)
+
+    def close(self) -> None:
+        """Stops the workers and frees the shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+
+        self._control[_COMMAND] = _STOP
+        # With a dead worker the barrier is not touched: waking a worker which died asleep in it would hang
+        stopping = all(process.is_alive() for process in self._processes) and not self._barrier.broken
+        if stopping:
+            try:
+                self._barrier.wait(self.timeout)
+            except threading.BrokenBarrierError:
+                stopping = False
+        for process in self._processes:
+            if stopping:
+                process.join(timeout=1)
+            if process.is_alive():  # A stranded, hung or stopped worker is killed, it does not hold the exit up
+                process.kill()
+            process.join()
+
+        del self.areas, self._control, self._table, self._cells
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        atexit.unregister(self.close)
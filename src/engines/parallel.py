@@ -0,0 +1,160 @@
+import time
+from typing import Literal
+
+import numba
+import numpy as np
+from numba import njit, prange  # type: ignore
+
+from src.engines.core import neighbors_mask
+from src.engines.rules import compile_rule
+from src.misc.type_aliases import CheckCells
+
+BAND_HEIGHT = 16
+MAX_THREADS: int = numba.config.NUMBA_NUM_THREADS  # type: ignore
+
+
+@njit(parallel=True, fastmath=True, cache=True, nogil=True)  # type: ignore
+def _step_bands(
+    current_field: np.ndarray,
+    next_field: np.ndarray,
+    rule: np.ndarray,
+    moore: bool,
+    band_height: int,
+) -> np.ndarray:
+    """Calculates the next state of the field band by band on all threads.
+
+    Every band of `band_height` rows is processed by one thread, which only
+    writes to its own rows of `next_field`, so no locks are needed.
+
+    Returns:
+        The number of living cells in each band.
+    """
+    height, width = current_field.shape
+    n_bands = (height + band_height - 1) // band_height
+    population = np.zeros(n_bands, dtype=np.int64)
+
+    for band in prange(n_bands):
+        living = 0
+        for y in range(band * band_height, min((band + 1) * band_height, height)):
+            for x in range(width):
+                mask = neighbors_mask(current_field, y, x, width, height, moore)
+                state = rule[current_field[y, x], mask]
+                next_field[y, x] = state
+                if state == 1:
+                    living += 1
+        population[band] = living
+
+    return population
+
+
+@njit(parallel=True, cache=True, nogil=True)  # type: ignore
+def _collect_bands(field: np.ndarray, population: np.ndarray, band_height: int) -> np.ndarray:
+    """Merges the living cells of all bands into one array.
+
+    The offset of each band is the prefix sum of the populations of the bands
+    above it, so every thread fills its own slice of the result.
+
+    Returns:
+        Array with shape (N, 2) of (x, y) pairs of living cells.
+    """
+    height, width = field.shape
+    offsets = np.zeros(population.size + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(population)
+    result = np.empty((offsets[-1], 2), dtype=np.int64)
+
+    for band in prange(population.size):
+        index = offsets[band]
+        for y in range(band * band_height, min((band + 1) * band_height, height)):
+            for x in range(width):
+                if field[y, x] == 1:
+                    result[index, 0] = x
+                    result[index, 1] = y
+                    index += 1
+
+    return result
+
+
+def set_threads(threads: int) -> int:
+    """Sets the number of threads for the parallel kernels (0 means all cores).
+
+    Returns:
+        The number of threads that will be used.
+    """
+    threads = threads or MAX_THREADS
+    numba.set_num_threads(min(threads, MAX_THREADS))
+    return int(numba.get_num_threads())
+
+
+def check_cells_parallel(
+    current_field: np.ndarray,
+    next_field: np.ndarray,
+    width: int,
+    height: int,
+    rule: np.ndarray,
+    mode: Literal["Moore", "Neumann"] = "Moore",
+) -> CheckCells:
+    """Multithreaded alternative to `check_cells`.
+
+    The field is split into bands of `BAND_HEIGHT` rows, which are processed
+    in parallel with `prange`, then the live cells of every band are merged
+    into one list.
+
+    Args:
+        current_field: The current state of the playing field.
+        next_field: The field that will be filled with the new state of the cells.
+        width: Number indicating the width of the playing field.
+        height: Number indicating the height of the playing field.
+        rule: The transition table of the rule (`RuleTable.table`).
+        mode: Mod defining the principle of counting cell neighbors.
+
+    Raises:
+        ValueError: If `mode` argument is unknown.
+
+    Returns:
+        Calculated state for the next step, and an array of live cells that
+        will be drawn.
+    """
+    if mode not in {"Moore", "Neumann"}:
+        msg = "mode is not set!"
+        raise ValueError(msg)
+
+    current, following = current_field[:height, :width], next_field[:height, :width]
+
+    population = _step_bands(current, following, rule, mode == "Moore", BAND_HEIGHT)
+    return next_field, _collect_bands(following, population, BAND_HEIGHT)
+
+
+def scaling_report(
+    size: int = 1024,
+    generations: int = 20,
+    rule: str = "b3/s23",
+) -> list[tuple[int, float]]:
+    """Measures generations per second of `check_cells_parallel` for each number of threads.
+
+    Args:
+        size: Width and height of the random field.
+        generations: Number of generations measured for each number of threads.
+        rule: The rule string, see `compile_rule`.
+
+    Returns:
+        Pairs of (threads, generations per second).
+    """
+    table = compile_rule(rule).table
+    # A uint8 field like the ones of `GameEngine`, so the same specialization of the kernel is measured
+    current = np.random.default_rng(0).integers(0, 2, size=(size, size), dtype=np.uint8)
+    following = np.zeros_like(current)
+    check_cells_parallel(current, following, size, size, table)  # compilation
+
+    report = []
+    threads_before = numba.get_num_threads()
+    try:
+        for threads in range(1, MAX_THREADS + 1):
+            numba.set_num_threads(threads)
+            start = time.perf_counter()
+            for _ in range(generations):
+                following, _cells = check_cells_parallel(current, following, size, size, table)
+                current, following = following, current
+            report.append((threads, generations / (time.perf_counter() - start)))
+    finally:
+        numba.set_num_threads(threads_before)  # The number set by `set_threads` stays
+    return report
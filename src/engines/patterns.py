@@ -0,0 +1,400 @@
+"""Readers of the pattern files: RLE, Life 1.06, plaintext and macrocell.
+
+The files are read in chunks and every chunk is decoded by whole-array
+operations: the runs of RLE are expanded by `numpy.repeat`, the numbers of
+Life 1.06 are parsed from the bytes and the quadtree of macrocell is
+expanded level by level. A pattern takes the memory of its living cells and
+never a Python object per cell.
+"""
+
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, assert_never
+
+import numpy as np
+
+from src.engines.rules import MAX_STATES
+from src.misc.states import PATTERN_SUFFIXES, PatternFormat
+
+CHUNK_SIZE = 1 << 24  # Bytes of a file decoded at once
+
+_RLE_HEADER = re.compile(rb"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*([^\s,]+))?", re.IGNORECASE)
+
+
+def _byte_set(chars: bytes) -> np.ndarray:
+    """Lookup table of the bytes, `table[raw]` tells which bytes of `raw` are in `chars`."""
+    table = np.zeros(256, dtype=np.bool_)
+    table[np.frombuffer(chars, dtype=np.uint8)] = True
+    return table
+
+
+_WHITESPACE = _byte_set(b" \t\r\n")
+_RLE_TAGS = _byte_set(b"bo.$ABCDEFGHIJKLMNOPQRSTUVWXpqrstuvwxy")
+_LIFE_106_CHARS = _byte_set(b"0123456789- \t\r\n")
+_PLAINTEXT_CHARS = _byte_set(b".O* \t\r\n")
+
+
+class DecodedPattern(NamedTuple):
+    """The living cells of a pattern file.
+
+    Attributes:
+        xs: Columns of the cells, the leftmost column of the pattern is 0.
+        ys: Rows of the cells, the top row of the pattern is 0.
+        states: States of the cells, 1 in the rules with two states.
+        width: Width of the pattern.
+        height: Height of the pattern.
+        rule: The rule given by the file, None if it has none.
+
+    """
+
+    xs: np.ndarray
+    ys: np.ndarray
+    states: np.ndarray
+    width: int
+    height: int
+    rule: str | None = None
+
+
+def _chunks(stream: BinaryIO, chunk_size: int, split: bytes, first: bytes = b"") -> Iterator[bytes]:
+    """Pieces of the stream which end after the last `split` byte of a chunk, the rest goes to the next piece."""
+    rest = first
+    while chunk := stream.read(chunk_size):
+        data = rest + chunk
+        end = data.rfind(split) + 1
+        if end:
+            yield data[:end]
+            rest = data[end:]
+        else:
+            rest = data
+    if rest:
+        yield rest
+
+
+def _numbers(raw: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Values of the runs of decimal digits in the bytes, the index of the first digit and after the last one."""
+    digit = (raw >= ord("0")) & (raw <= ord("9"))
+    before = np.concatenate(([False], digit[:-1]))
+    after = np.concatenate((digit[1:], [False]))
+    starts = np.flatnonzero(digit & ~before)
+    ends = np.flatnonzero(digit & ~after) + 1
+
+    indices = np.flatnonzero(digit)
+    run = np.repeat(np.arange(len(starts)), ends - starts)
+    weights = (raw[indices] - ord("0")) * 10.0 ** (ends[run] - indices - 1)
+    values = np.rint(np.bincount(run, weights=weights, minlength=len(starts))).astype(np.int64)
+    return values, starts, ends
+
+
+def _expand(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """`starts[i], starts[i] + 1, ..., starts[i] + counts[i] - 1` of every run, one after another."""
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(int(counts.sum()))
+
+
+def _empty() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+
+
+def _decode_rle(data: bytes, top: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Cells of a piece of RLE which starts a row, the row is `top`.
+
+    Returns:
+        The columns, the rows and the states of the cells, and the number of the rows the piece moves down.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    raw = raw[~_WHITESPACE[raw]]
+    values, _starts, ends = _numbers(raw)
+
+    # Every tag repeats `count` times, the count is the number in front of it, 1 without a number
+    repeat = np.ones(len(raw) + 1, dtype=np.int64)
+    repeat[ends] = values
+    tag_indices = np.flatnonzero((raw < ord("0")) | (raw > ord("9")))
+    tags, counts = raw[tag_indices], repeat[tag_indices]
+    if not _RLE_TAGS[tags].all():
+        bad = tags[~_RLE_TAGS[tags]][0]
+        msg = f"unexpected {chr(bad)!r} in the RLE"
+        raise ValueError(msg)
+
+    # The states above 24 are two letters: `p`..`y` for the multiples of 24 and `A`..`X`
+    states = np.where((tags >= ord("A")) & (tags <= ord("X")), tags.astype(np.int64) - ord("A") + 1, 0)
+    states[tags == ord("o")] = 1
+    prefixes = np.flatnonzero(tags >= ord("p"))
+    if len(prefixes) and (prefixes[-1] + 1 == len(tags) or not (states[prefixes + 1] > 0).all()):
+        msg = "a prefix of a state in the RLE is not followed by a state"
+        raise ValueError(msg)
+    states[prefixes + 1] += 24 * (tags[prefixes].astype(np.int64) - ord("p") + 1)
+    counts[prefixes + 1] = counts[prefixes]
+    keep = tags < ord("p")
+    tags, counts, states = tags[keep], counts[keep], states[keep]
+    if len(states) and states.max() >= MAX_STATES:
+        msg = f"the RLE has the state {states.max()}, the maximum is {MAX_STATES - 1}"
+        raise ValueError(msg)
+
+    # `$` moves `count` rows down to the start of the row, the other tags move `count` columns right
+    newline = tags == ord("$")
+    down = np.where(newline, counts, 0)
+    rows = top + np.cumsum(down) - down
+    right = np.where(newline, 0, counts)
+    moved = np.cumsum(right)
+    columns = moved - right - np.maximum.accumulate(np.where(newline, moved, 0))
+
+    alive = states > 0
+    counts = counts[alive]
+    xs = _expand(columns[alive], counts)
+    ys = np.repeat(rows[alive], counts)
+    return xs, ys, np.repeat(states[alive], counts).astype(np.uint8), int(down.sum())
+
+
+def _read_rle(stream: BinaryIO, chunk_size: int) -> DecodedPattern:
+    width = height = 0
+    rule = None
+    first = b""
+    while line := stream.readline():
+        stripped = line.strip()
+        if not stripped or stripped.startswith(b"#"):
+            continue
+        header = _RLE_HEADER.match(stripped)
+        if header is None:  # No header, the line is the first one of the cells
+            first = line
+        else:
+            width, height = int(header[1]), int(header[2])
+            rule = header[3].decode() if header[3] else None
+        break
+
+    pieces = []
+    top = 0
+    for data in _chunks(stream, chunk_size, split=b"$", first=first):
+        end = data.find(b"!")
+        xs, ys, states, rows = _decode_rle(data if end < 0 else data[:end], top)
+        pieces.append((xs, ys, states))
+        top += rows
+        if end >= 0:
+            break
+    return _pattern(pieces, width, height, rule)
+
+
+def _read_life_106(stream: BinaryIO, chunk_size: int) -> DecodedPattern:
+    header = stream.readline().strip()
+    if not header.startswith(b"#Life 1.06"):
+        msg = f"expected the header #Life 1.06, got {header[:20].decode(errors='replace')!r}"
+        raise ValueError(msg)
+
+    first = b""
+    while line := stream.readline():
+        if not line.startswith(b"#"):
+            first = line
+            break
+
+    pieces = []
+    for data in _chunks(stream, chunk_size, split=b"\n", first=first):
+        raw = np.frombuffer(data, dtype=np.uint8)
+        values, starts, _ends = _numbers(raw)
+        if not _LIFE_106_CHARS[raw].all() or len(values) % 2:
+            msg = "a line of Life 1.06 is not a pair of numbers"
+            raise ValueError(msg)
+        negative = np.concatenate(([False], raw[:-1] == ord("-")))[starts]
+        coordinates = np.where(negative, -values, values).reshape(-1, 2)
+        pieces.append((coordinates[:, 0], coordinates[:, 1], np.ones(len(coordinates), dtype=np.uint8)))
+
+    xs, ys, states = _concatenate(pieces)
+    if len(xs):
+        xs, ys = xs - xs.min(), ys - ys.min()
+    return _pattern([(xs, ys, states)], 0, 0, rule=None)
+
+
+def _read_plaintext(stream: BinaryIO, chunk_size: int) -> DecodedPattern:
+    first = b""
+    while line := stream.readline():
+        if not line.startswith(b"!"):
+            first = line
+            break
+
+    pieces = []
+    top = width = 0
+    for data in _chunks(stream, chunk_size, split=b"\n", first=first):
+        raw = np.frombuffer(data, dtype=np.uint8)
+        if not _PLAINTEXT_CHARS[raw].all():
+            bad = raw[~_PLAINTEXT_CHARS[raw]][0]
+            msg = f"unexpected {chr(bad)!r} in the plaintext"
+            raise ValueError(msg)
+
+        indices = np.arange(len(raw))
+        newline = raw == ord("\n")
+        rows = top + np.cumsum(newline) - newline
+        columns = indices - np.maximum.accumulate(np.where(newline, indices + 1, 0))
+        cells = (raw == ord("O")) | (raw == ord("*"))
+        pieces.append((columns[cells], rows[cells], np.ones(int(cells.sum()), dtype=np.uint8)))
+
+        width = max(width, int(columns[raw == ord(".")].max(initial=-1)) + 1)
+        top += int(newline.sum()) + (not data.endswith(b"\n"))  # The last line may have no line break
+    return _pattern(pieces, width, top, rule=None)
+
+
+def _read_macrocell(stream: BinaryIO) -> DecodedPattern:
+    header = stream.readline().strip()
+    if not header.startswith(b"[M2]"):
+        msg = f"expected the header [M2], got {header[:20].decode(errors='replace')!r}"
+        raise ValueError(msg)
+
+    # Node 0 is the empty node of any level, the others are numbered by their lines
+    levels: list[int] = [0]
+    children: list[tuple[int, ...]] = [(0, 0, 0, 0)]
+    leaves: dict[int, tuple[list[int], list[int]]] = {}
+    rule = None
+    while line := stream.readline():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(b"#"):
+            rule = line[2:].strip().decode() if line.startswith(b"#R") else rule
+            continue
+        if line[:1] in b".*$":  # A bitmap 8x8 leaf, its rows end with `$`
+            rows = line.split(b"$")
+            xs = [x for row in rows for x, char in enumerate(row) if char == ord("*")]
+            ys = [y for y, row in enumerate(rows) for char in row if char == ord("*")]
+            leaves[len(levels)] = (xs, ys)
+            levels.append(3)
+            children.append((0, 0, 0, 0))
+        else:
+            level, *nodes = map(int, line.split())
+            if len(nodes) != 4:  # noqa: PLR2004
+                msg = f"a node of macrocell has {len(nodes)} children instead of 4"
+                raise ValueError(msg)
+            levels.append(level)
+            children.append(tuple(nodes))  # The states of the cells for the level 1
+
+    if len(levels) == 1:
+        return DecodedPattern(*_empty(), width=0, height=0, rule=rule)
+    return _expand_quadtree(np.array(levels), np.array(children, dtype=np.int64), leaves, rule)
+
+
+def _expand_quadtree(
+    levels: np.ndarray,
+    children: np.ndarray,
+    leaves: dict[int, tuple[list[int], list[int]]],
+    rule: str | None,
+) -> DecodedPattern:
+    """Cells of the last node of the quadtree, the nodes of a level are expanded all at once."""
+    ids = np.array([len(levels) - 1])
+    xs = ys = np.zeros(1, dtype=np.int64)
+    level = int(levels[-1])
+    bottom = 3 if leaves else 1
+    while level > bottom and len(ids):
+        half = 1 << (level - 1)
+        quadrants = children[ids]
+        if (levels[quadrants[quadrants != 0]] != level - 1).any():
+            msg = f"a node of the level {level} has children of another level than {level - 1}"
+            raise ValueError(msg)
+        xs = (xs[:, None] + np.array([0, half, 0, half])).ravel()
+        ys = (ys[:, None] + np.array([0, 0, half, half])).ravel()
+        ids = quadrants.ravel()
+        present = ids != 0
+        ids, xs, ys = ids[present], xs[present], ys[present]
+        level -= 1
+
+    if bottom == 1:  # The quadrants of a node of the level 1 are the states of its cells
+        states = children[ids].ravel()
+        xs = (xs[:, None] + np.array([0, 1, 0, 1])).ravel()
+        ys = (ys[:, None] + np.array([0, 0, 1, 1])).ravel()
+        alive = states != 0
+        xs, ys, states = xs[alive], ys[alive], states[alive].astype(np.uint8)
+    else:
+        table = sorted(leaves)
+        index = np.zeros(len(levels), dtype=np.int64)
+        index[table] = np.arange(len(table))
+        counts = np.array([len(leaves[node][0]) for node in table], dtype=np.int64)
+        first = np.cumsum(counts) - counts
+        leaf_xs = np.array([x for node in table for x in leaves[node][0]], dtype=np.int64)
+        leaf_ys = np.array([y for node in table for y in leaves[node][1]], dtype=np.int64)
+
+        leaf = index[ids]
+        cells = _expand(first[leaf], counts[leaf])
+        xs = np.repeat(xs, counts[leaf]) + leaf_xs[cells]
+        ys = np.repeat(ys, counts[leaf]) + leaf_ys[cells]
+        states = np.ones(len(xs), dtype=np.uint8)
+
+    if len(xs):
+        xs, ys = xs - xs.min(), ys - ys.min()
+    return _pattern([(xs, ys, states)], 0, 0, rule)
+
+
+def _concatenate(pieces: list[tuple[np.ndarray, np.ndarray, np.ndarray]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if not pieces:
+        return _empty()
+    xs, ys, states = zip(*pieces, strict=True)
+    return np.concatenate(xs), np.concatenate(ys), np.concatenate(states)
+
+
+def _pattern(
+    pieces: list[tuple[np.ndarray, np.ndarray, np.ndarray]],
+    width: int,
+    height: int,
+    rule: str | None,
+) -> DecodedPattern:
+    """The pattern of the decoded pieces, it is at least as large as the bounding box of its cells."""
+    xs, ys, states = _concatenate(pieces)
+    if len(xs):
+        width, height = max(width, int(xs.max()) + 1), max(height, int(ys.max()) + 1)
+    return DecodedPattern(xs=xs, ys=ys, states=states, width=width, height=height, rule=rule)
+
+
+def pattern_format(path: Path) -> PatternFormat:
+    """The format of the pattern file by its suffix.
+
+    Raises:
+        ValueError: If the suffix is not one of `PATTERN_SUFFIXES`.
+    """
+    try:
+        return PATTERN_SUFFIXES[path.suffix.lower()]
+    except KeyError:
+        msg = f"unknown format of {path.name}, expected one of {', '.join(PATTERN_SUFFIXES)}"
+        raise ValueError(msg) from None
+
+
+def read_pattern(path: Path, chunk_size: int = CHUNK_SIZE) -> DecodedPattern:
+    """Reads the living cells of the pattern file, its format is found by the suffix.
+
+    Args:
+        path: RLE (`.rle`), Life 1.06 (`.lif`, `.life`), plaintext (`.cells`) or macrocell (`.mc`) file.
+        chunk_size: Bytes decoded at once, they are not read into memory all at once.
+
+    Returns:
+        The cells and the size of the pattern, and the rule given by the file.
+
+    Raises:
+        ValueError: If the suffix is unknown or the file is not a pattern of its format.
+    """
+    with path.open("rb") as stream:
+        match pattern_format(path):
+            case PatternFormat.RLE:
+                return _read_rle(stream, chunk_size)
+            case PatternFormat.LIFE_106:
+                return _read_life_106(stream, chunk_size)
+            case PatternFormat.PLAINTEXT:
+                return _read_plaintext(stream, chunk_size)
+            case PatternFormat.MACROCELL:
+                return _read_macrocell(stream)
+            case _ as unreachable:
+                assert_never(unreachable)
+
+
+def place_pattern(pattern: DecodedPattern, field: np.ndarray, offset: tuple[int, int] | None = None) -> None:
+    """Clears the field and writes the pattern into it.
+
+    Args:
+        pattern: The cells of the pattern.
+        field: Matrix (height x width) with the states of the cells, it is changed in place.
+        offset: (x, y) of the top left corner of the pattern, None - the pattern is in the center.
+
+    Raises:
+        ValueError: If the pattern does not fit into the field, the field is not changed then.
+    """
+    height, width = field.shape
+    left, top = offset if offset is not None else ((width - pattern.width) // 2, (height - pattern.height) // 2)
+    if left < 0 or top < 0 or left + pattern.width > width or top + pattern.height > height:
+        msg = f"the pattern ({pattern.width}x{pattern.height}) at ({left}, {top}) does not fit into {width}x{height}"
+        raise ValueError(msg)
+
+    field[:] = 0
+    field[pattern.ys + top, pattern.xs + left] = pattern.states
@@ -0,0 +1,231 @@
+import re
+from enum import Enum
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+NEIGHBORS = 8  # Cells around a cell in the Moore neighborhood
+NEIGHBORHOODS = 256  # All the states of the 8 neighbors
+MAX_STATES = 256  # The fields are stored as uint8
+
+# Bits of the neighbors in the mask, the cells of the 3x3 square row by row without the centre
+NW, N, NE, W, E, SW, S, SE = (1 << bit for bit in range(8))
+VON_NEUMANN = N | W | E | S
+
+# Representative neighborhoods of the Hensel letters (isotropic non-totalistic rules), rows of the 3x3 square
+# without the centre. The other neighborhoods of a letter are their rotations and reflections, the letters of
+# 5-7 neighbors are the ones of the complement neighborhood.
+_HENSEL = {
+    1: {"c": "100 0 0 000", "e": "010 0 0 000"},
+    2: {
+        "a": "110 0 0 000",
+        "c": "101 0 0 000",
+        "e": "010 1 0 000",
+        "i": "000 1 1 000",
+        "k": "001 1 0 000",
+        "n": "001 0 0 100",
+    },
+    3: {
+        "a": "110 1 0 000",
+        "c": "101 0 0 100",
+        "e": "010 1 1 000",
+        "i": "111 0 0 000",
+        "j": "011 1 0 000",
+        "k": "010 0 1 100",
+        "n": "101 1 0 000",
+        "q": "011 0 0 100",
+        "r": "100 1 1 000",
+        "y": "100 0 1 100",
+    },
+    4: {
+        "a": "111 1 0 000",
+        "c": "101 0 0 101",
+        "e": "010 1 1 010",
+        "i": "101 1 1 000",
+        "j": "010 1 1 100",
+        "k": "110 0 1 100",
+        "n": "111 0 0 100",
+        "q": "011 0 1 100",
+        "r": "110 1 1 000",
+        "t": "100 1 1 100",
+        "w": "011 1 0 100",
+        "y": "101 0 1 100",
+        "z": "001 1 1 100",
+    },
+}
+
+
+class RuleFamily(Enum):
+    """Kind of the rule, it defines the notation of the rule string."""
+
+    TOTALISTIC = "totalistic"  # Outer-totalistic B/S rule, like b3/s23
+    ISOTROPIC = "isotropic"  # B/S rule with Hensel letters, like B2-a/S12
+    GENERATIONS = "generations"  # B/S rule with more than two states, like B2/S/C3
+
+
+class RuleTable(NamedTuple):
+    """Compiled rule: the next state of a cell is one lookup in `table`.
+
+    Attributes:
+        rule: The rule string it was compiled from.
+        family: Kind of the rule.
+        states: Number of states of a cell (2 for the B/S rules), 0 is dead, 1
+            is alive, the others are dying in the Generations rules.
+        table: Matrix (uint8) states x 256, the next state of a cell by its
+            current state and the mask of its living neighbors (see `neighbors_mask`).
+
+    """
+
+    rule: str
+    family: RuleFamily
+    states: int
+    table: np.ndarray
+
+
+@lru_cache(maxsize=1)
+def hensel_letters() -> dict[int, tuple[int, str]]:
+    """Number of the living neighbors and the Hensel letter of every neighbor mask."""
+
+    def mask_of(cells: np.ndarray) -> int:
+        flat = np.delete(cells.ravel(), 4)
+        return int(sum(int(bit) << i for i, bit in enumerate(flat)))
+
+    result = {0: (0, ""), NEIGHBORHOODS - 1: (8, "")}
+    for count, letters in _HENSEL.items():
+        for letter, rows in letters.items():
+            digits = rows.replace(" ", "")
+            cells = np.array([int(d) for d in digits[:4] + "0" + digits[4:]]).reshape(3, 3)
+            for square in (cells, cells.T):
+                for turn in range(4):
+                    mask = mask_of(np.rot90(square, turn))
+                    result[mask] = (count, letter)
+                    if count < 4:  # noqa: PLR2004
+                        result[~mask & (NEIGHBORHOODS - 1)] = (8 - count, letter)
+    return result
+
+
+def _parse_transitions(part: str, rule: str) -> dict[int, set[str] | None]:
+    """Parses the counts of B or S with optional Hensel letters, like "2-a3" or "23".
+
+    Returns:
+        For every count, its letters or None for all of them.
+    """
+    transitions: dict[int, set[str] | None] = {}
+    for digit, negative, letters in re.findall(r"(\d)(-?)([a-z]*)", part):
+        count = int(digit)
+        valid = set(_HENSEL.get(min(count, NEIGHBORS - count), {}))
+        if not set(letters) <= valid or (negative and not letters) or count > NEIGHBORS or count in transitions:
+            msg = f"invalid transitions {digit}{negative}{letters} in rule {rule!r}"
+            raise ValueError(msg)
+        if not letters:
+            transitions[count] = None
+        else:
+            transitions[count] = valid - set(letters) if negative else set(letters)
+    if re.sub(r"(\d)(-?)([a-z]*)", "", part):
+        msg = f"invalid rule {rule!r}"
+        raise ValueError(msg)
+    return transitions
+
+
+def _split_rule(rule: str) -> tuple[str, str, int]:
+    """Splits the rule into the born and survive parts and the number of states.
+
+    Supported forms: B3/S23, S23/B3, B2/S/C3 (or B2/S/3), and the numeric
+    S/B and S/B/C forms like 23/3 and /2/3.
+    """
+    # The number of states is a part of its own, a capital C or G with digits after B or S is not a Hensel letter
+    if re.search(r"(?:^|/)[BbSs][^/]*[CG]\d", rule.replace(" ", "")):
+        msg = f"invalid rule {rule!r}, the number of states goes in a part of its own like B2/S/C3"
+        raise ValueError(msg)
+    parts = rule.replace(" ", "").lower().split("/")
+    if any(part[:1] in {"b", "s", "c", "g"} for part in parts):
+        named = {part[:1]: part[1:] for part in parts if part[:1] in {"b", "s", "c", "g"}}
+        other = [part for part in parts if part[:1] not in {"b", "s", "c", "g"}]
+        if len(other) == 1 and other[0].isdigit():
+            named["c"] = other[0]
+        elif other or "b" not in named or "s" not in named:
+            msg = f"invalid rule {rule!r}"
+            raise ValueError(msg)
+        born, survives, states = named["b"], named["s"], named.get("c") or named.get("g") or "2"
+    elif len(parts) in {2, 3}:
+        survives, born, states = parts[0], parts[1], parts[2] if len(parts) == 3 else "2"  # noqa: PLR2004
+    else:
+        msg = f"invalid rule {rule!r}"
+        raise ValueError(msg)
+
+    if not states.isdigit() or not 2 <= int(states) <= MAX_STATES:  # noqa: PLR2004
+        msg = f"invalid number of states in rule {rule!r}"
+        raise ValueError(msg)
+    return born, survives, int(states)
+
+
+@lru_cache(maxsize=64)
+def compile_rule(rule: str) -> RuleTable:
+    """Parses the rule string once and builds its transition table.
+
+    Args:
+        rule: Outer-totalistic (b3/s23), isotropic non-totalistic (B2-a/S12)
+            or Generations (B2/S/C3) rule.
+
+    Raises:
+        ValueError: If the rule can not be parsed.
+
+    Returns:
+        The compiled rule, it is memoized per rule string.
+    """
+    born_part, survives_part, states = _split_rule(rule)
+    born = _parse_transitions(born_part, rule)
+    survives = _parse_transitions(survives_part, rule)
+
+    letters = hensel_letters()
+    table = np.zeros((states, NEIGHBORHOODS), dtype=np.uint8)
+    for mask in range(NEIGHBORHOODS):
+        count, letter = letters[mask]
+        for state, transitions, otherwise in ((0, born, 0), (1, survives, 2 % states)):
+            if count in transitions and (transitions[count] is None or letter in transitions[count]):  # type: ignore
+                table[state, mask] = 1
+            else:
+                table[state, mask] = otherwise
+    for state in range(2, states):
+        table[state] = (state + 1) % states
+    table.flags.writeable = False
+
+    family = RuleFamily.TOTALISTIC
+    if states > 2:  # noqa: PLR2004
+        family = RuleFamily.GENERATIONS
+    elif any(letters is not None for letters in (*born.values(), *survives.values())):
+        family = RuleFamily.ISOTROPIC
+    return RuleTable(rule=rule, family=family, states=states, table=table)
+
+
+def totalistic_masks(table: np.ndarray) -> tuple[int, int]:
+    """Converts the table of an outer-totalistic two-state rule to bitmasks of the counts.
+
+    Raises:
+        ValueError: If the rule is not outer-totalistic or has more than two states.
+
+    Returns:
+        Bitmasks of the birth and survival counts: bit N is set if the cell is
+        born (survives) with N living neighbors.
+    """
+    if table.shape != (2, NEIGHBORHOODS):
+        msg = "only two-state rules are supported"
+        raise ValueError(msg)
+    return _totalistic_masks(table.tobytes())
+
+
+@lru_cache(maxsize=64)
+def _totalistic_masks(table: bytes) -> tuple[int, int]:
+    counts = np.array([mask.bit_count() for mask in range(NEIGHBORHOODS)])
+    bitmasks = []
+    for values in np.frombuffer(table, dtype=np.uint8).reshape(2, NEIGHBORHOODS):
+        bitmask = 0
+        for count in range(9):
+            transitions = values[counts == count]
+            if transitions.min() != transitions.max():
+                msg = "only outer-totalistic rules are supported"
+                raise ValueError(msg)
+            bitmask |= int(transitions[0]) << count
+        bitmasks.append(bitmask)
+    return bitmasks[0], bitmasks[1]
@@ -0,0 +1,264 @@
+"""Snapshots of a long run: the compressed field with its rule, mode, generation and seed.
+
+A file is `MAGIC`, the length of the header (uint32, little endian), the
+header (JSON) and the blocks of the field. Every block is `block_rows` rows,
+bit-packed by `numpy.packbits` in the rules with two states, compressed by
+zlib on its own. The loader maps the file into memory and decompresses the
+blocks one by one straight into the field, so a field of 100M cells is never
+held twice, nor as Python objects.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from loguru import logger
+
+from src.misc.states import Mode
+
+MAGIC = b"LIFESNAP"
+VERSION = 1
+BLOCK_ROWS = 256  # Rows of the field compressed together
+PACKED_STATES = 2  # The fields of the rules with this number of states are bit-packed
+
+_LENGTH = struct.Struct("<I")
+
+
+class SnapshotInfo(NamedTuple):
+    """Everything of the game a snapshot keeps, except the field.
+
+    Attributes:
+        width: Width of the field.
+        height: Height of the field.
+        rule: The rule of the game (`GameEngine.preset`).
+        mode: Neighborhood of the cells.
+        generation: Number of the generation of the field.
+        seed: Seed of the random initial field, None if it was not set.
+        states: Number of states of a cell in the rule.
+
+    """
+
+    width: int
+    height: int
+    rule: str
+    mode: Mode
+    generation: int
+    seed: int | None
+    states: int
+
+    def as_header(self) -> dict:
+        """The fields for a JSON header, the mode by its value."""
+        return {**self._asdict(), "mode": self.mode.value}
+
+    @classmethod
+    def from_header(cls, header: dict) -> "SnapshotInfo":
+        """The info from a JSON header written with `as_header`, other keys of the header are ignored."""
+        return cls(**{**{name: header[name] for name in cls._fields}, "mode": Mode(header["mode"])})
+
+
+class Snapshot(NamedTuple):
+    """The game ready to be written, it does not share memory with the engine.
+
+    Attributes:
+        info: The rule, the mode, the generation and the size of the field.
+        cells: Rows of the field, bit-packed along the rows if the rule has two states.
+
+    """
+
+    info: SnapshotInfo
+    cells: np.ndarray
+
+    @property
+    def packed(self) -> bool:
+        """Whether the rows of the cells are bit-packed."""
+        return self.info.states == PACKED_STATES
+
+
+def capture(field: np.ndarray, info: SnapshotInfo) -> Snapshot:
+    """Copies the field for the snapshot, bit-packed if the rule has two states (eight times less to copy)."""
+    cells = np.packbits(field, axis=1) if info.states == PACKED_STATES else field.copy()
+    return Snapshot(info=info, cells=cells)
+
+
+def write_snapshot(path: Path, snapshot: Snapshot, level: int = 6, block_rows: int = BLOCK_ROWS) -> None:
+    """Writes the snapshot atomically: the file appears at the path only when it is complete.
+
+    It is written into a temporary file next to the path, synced to the
+    disk and renamed over the path, so a crash leaves the previous snapshot.
+
+    Args:
+        path: The file of the snapshot.
+        snapshot: The captured game (`capture`).
+        level: Compression level of zlib, 0-9.
+        block_rows: Rows of the field compressed together.
+
+    Raises:
+        OSError: If the file cannot be written, the previous snapshot stays then.
+    """
+    blocks = [
+        zlib.compress(snapshot.cells[top : top + block_rows].tobytes(), level)
+        for top in range(0, snapshot.info.height, block_rows)
+    ]
+    header = {
+        "version": VERSION,
+        **snapshot.info.as_header(),
+        "packed": snapshot.packed,
+        "block_rows": block_rows,
+        "blocks": [len(block) for block in blocks],
+    }
+    encoded = json.dumps(header).encode()
+
+    temporary = path.with_name(f".{path.name}.tmp")
+    try:
+        with temporary.open("wb") as stream:
+            stream.write(MAGIC + _LENGTH.pack(len(encoded)) + encoded)
+            for block in blocks:
+                stream.write(block)
+            stream.flush()
+            os.fsync(stream.fileno())
+        temporary.replace(path)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+
+def _header(view: mmap.mmap | bytes) -> tuple[dict, int]:
+    """The header of the snapshot and the offset of its first block.
+
+    Raises:
+        ValueError: If the file is not a snapshot of this version.
+    """
+    start = len(MAGIC) + _LENGTH.size
+    if len(view) < start or view[: len(MAGIC)] != MAGIC:
+        msg = "the file is not a snapshot"
+        raise ValueError(msg)
+    (length,) = _LENGTH.unpack(view[len(MAGIC) : start])
+    header = json.loads(bytes(view[start : start + length]))
+    if header["version"] != VERSION:
+        msg = f"the snapshot has the version {header['version']}, expected {VERSION}"
+        raise ValueError(msg)
+    return header, start + length
+
+
+def read_info(path: Path) -> SnapshotInfo:
+    """The rule, the mode, the generation and the size of the field of the snapshot, the field is not read.
+
+    Raises:
+        ValueError: If the file is not a snapshot.
+    """
+    with path.open("rb") as stream:
+        start = stream.read(len(MAGIC) + _LENGTH.size)
+        if len(start) < len(MAGIC) + _LENGTH.size:
+            msg = "the file is not a snapshot"
+            raise ValueError(msg)
+        (length,) = _LENGTH.unpack(start[len(MAGIC) :])
+        header, _offset = _header(start + stream.read(length))
+    return SnapshotInfo.from_header(header)
+
+
+def read_snapshot(path: Path, field: np.ndarray | None = None) -> tuple[SnapshotInfo, np.ndarray]:
+    """Decompresses the field of the snapshot block by block from a memory map of the file.
+
+    Args:
+        path: The file of the snapshot.
+        field: Matrix (height x width) the field is written into, a new one if None.
+
+    Returns:
+        The rule, the mode and the generation of the snapshot, and its field.
+
+    Raises:
+        ValueError: If the file is not a snapshot, it is damaged or the field has another size.
+    """
+    with path.open("rb") as stream, mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        header, offset = _header(view)
+        info = SnapshotInfo.from_header(header)
+        if field is None:
+            field = np.empty((info.height, info.width), dtype=np.uint8)
+        elif field.shape != (info.height, info.width):
+            msg = f"the snapshot is {info.width}x{info.height}, the field is {field.shape[1]}x{field.shape[0]}"
+            raise ValueError(msg)
+
+        rows = header["block_rows"]
+        for top, length in zip(range(0, info.height, rows), header["blocks"], strict=True):
+            try:
+                block = zlib.decompress(view[offset : offset + length])
+            except zlib.error as exc:
+                msg = f"the snapshot is damaged at the row {top}: {exc}"
+                raise ValueError(msg) from exc
+            cells = np.frombuffer(block, dtype=np.uint8).reshape(min(rows, info.height - top), -1)
+            field[top : top + rows] = np.unpackbits(cells, axis=1, count=info.width) if header["packed"] else cells
+            offset += length
+    return info, field
+
+
+class SnapshotWriter:
+    """Writes the snapshots in a thread of its own, the caller only captures the field.
+
+    zlib and the disk release the GIL, so the render loop (or the batch)
+    goes on while a snapshot is compressed and written. At most one snapshot
+    waits while another one is written: a newer one replaces it, the older
+    one would be outdated anyway.
+
+    Attributes:
+        level: Compression level of zlib, 0-9.
+        written: Number of the written snapshots.
+        error: The error of the last failed write, None if there was none.
+
+    """
+
+    level: int
+    written: int
+    error: OSError | None
+
+    def __init__(self, level: int = 6) -> None:
+        self.level = level
+        self.written = 0
+        self.error = None
+        self._pending: tuple[Path, Snapshot] | None = None
+        self._busy = False
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def save(self, path: Path, snapshot: Snapshot) -> None:
+        """Queues the snapshot to be written to the path, the thread is started by the first call."""
+        with self._condition:
+            if self._pending is not None:
+                logger.debug(f"the snapshot of the generation {self._pending[1].info.generation} is skipped")
+            self._pending = (path, snapshot)
+            self._condition.notify_all()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="snapshots", daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Waits until the queued snapshot is written.
+
+        Returns:
+            False if the timeout expired before that.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None)
+                assert self._pending is not None
+                (path, snapshot), self._pending = self._pending, None
+                self._busy = True
+            try:
+                write_snapshot(path, snapshot, level=self.level)
+            except OSError as exc:
+                logger.exception(f"the snapshot is not saved to {path}")
+                self.error = exc
+            else:
+                logger.info(f"the snapshot of the generation {snapshot.info.generation} is saved to {path}")
+                self.written += 1
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
@@ -0,0 +1,199 @@
+from typing import Literal
+
+import numpy as np
+from numba import njit  # type: ignore
+
+from src.engines.core import check_cells, neighbors_mask
+from src.misc.type_aliases import CheckCells
+
+
+@njit(fastmath=True, cache=True, nogil=True)  # type: ignore
+def _step_active(
+    current_field: np.ndarray,
+    next_field: np.ndarray,
+    changed: np.ndarray,
+    n_changed: int,
+    new_changed: np.ndarray,
+    stamp: np.ndarray,
+    generation: int,
+    index: np.ndarray,
+    live: np.ndarray,
+    population: int,
+    rule: np.ndarray,
+    moore: bool,
+) -> tuple[int, int]:
+    """Calculates the next state only around the cells that changed in the last generation.
+
+    Other cells can not change: nothing changed around them. `next_field`
+    holds the state of two generations ago, which differs from `current_field`
+    exactly in the changed cells, so they are copied first.
+
+    Returns:
+        The number of cells changed in this generation (written to
+        `new_changed`) and the new population (`live` is updated).
+    """
+    height, width = current_field.shape
+    for k in range(n_changed):
+        x, y = changed[k, 0], changed[k, 1]
+        next_field[y, x] = current_field[y, x]
+
+    n_new = 0
+    for k in range(n_changed):
+        for y in range(max(changed[k, 1] - 1, 0), min(changed[k, 1] + 2, height)):
+            for x in range(max(changed[k, 0] - 1, 0), min(changed[k, 0] + 2, width)):
+                if stamp[y, x] == generation:
+                    continue
+                stamp[y, x] = generation
+
+                state = rule[current_field[y, x], neighbors_mask(current_field, y, x, width, height, moore)]
+                if state != current_field[y, x]:
+                    next_field[y, x] = state
+                    new_changed[n_new, 0] = x
+                    new_changed[n_new, 1] = y
+                    n_new += 1
+
+    # The living cells are kept in `live[:population]`, `index` gives the position of a cell in it
+    for k in range(n_new):
+        x, y = new_changed[k, 0], new_changed[k, 1]
+        if current_field[y, x] != 1 and next_field[y, x] != 1:
+            continue  # A dying cell of the Generations rules
+        if next_field[y, x] == 1:
+            index[y, x] = population
+            live[population, 0] = x
+            live[population, 1] = y
+            population += 1
+        else:
+            population -= 1
+            position = index[y, x]
+            live[position, 0] = live[population, 0]
+            live[position, 1] = live[population, 1]
+            index[live[position, 1], live[position, 0]] = position
+            index[y, x] = -1
+
+    return n_new, population
+
+
+class SparseEngine:
+    """Switches between the dense `check_cells` and the calculation of the active cells only.
+
+    While the density of the field is below `threshold` only the neighborhoods
+    of the cells changed in the last generation are calculated, so the cost of
+    a generation depends on the activity and not on the area of the field.
+    When the density grows above twice the threshold, it goes back to the
+    dense kernel.
+
+    Attributes:
+        threshold: Density of living cells below which the sparse mode is used.
+        sparse: Whether the last generation was calculated in the sparse mode.
+        population: Number of living cells.
+
+    """
+
+    threshold: float
+    sparse: bool
+    population: int
+
+    def __init__(self, width: int, height: int, threshold: float = 0.05) -> None:
+        self.threshold = threshold
+        self.sparse = False
+        self.population = 0
+
+        self._area = width * height
+        self._stamp = np.zeros((height, width), dtype=np.int64)
+        self._index = np.full((height, width), -1, dtype=np.int32)
+        self._live = np.empty((0, 2), dtype=np.int32)
+        self._changed = np.empty((0, 2), dtype=np.int32)
+        self._new_changed = np.empty((0, 2), dtype=np.int32)
+        self._n_changed = 0
+        self._generation = 0
+        self._rule: tuple[np.ndarray, str] | None = None
+
+    @staticmethod
+    def _reserve(buffer: np.ndarray, size: int) -> np.ndarray:
+        """Grows the buffer (twice, to rarely reallocate) if it holds less than `size` cells."""
+        if len(buffer) >= size:
+            return buffer
+        grown = np.empty((max(size, 2 * len(buffer)), 2), dtype=buffer.dtype)
+        grown[: len(buffer)] = buffer
+        return grown
+
+    def _to_sparse(self, current_field: np.ndarray, next_field: np.ndarray) -> None:
+        """Builds the list of living cells and the list of changed cells after a dense generation."""
+        ys, xs = np.nonzero(next_field == 1)
+        self._live = self._reserve(self._live, len(xs))
+        self._live[: len(xs), 0] = xs
+        self._live[: len(xs), 1] = ys
+        self._index[:] = -1
+        self._index[ys, xs] = np.arange(len(xs), dtype=np.int32)
+
+        ys, xs = np.nonzero(next_field != current_field)
+        self._changed = self._reserve(self._changed, len(xs))
+        self._changed[: len(xs), 0] = xs
+        self._changed[: len(xs), 1] = ys
+        self._n_changed = len(xs)
+        self.sparse = True
+
+    def check_cells(
+        self,
+        current_field: np.ndarray,
+        next_field: np.ndarray,
+        width: int,
+        height: int,
+        rule: np.ndarray,
+        mode: Literal["Moore", "Neumann"] = "Moore",
+    ) -> CheckCells:
+        """Alternative to `check_cells` which chooses between the sparse and the dense calculation.
+
+        `next_field` must be the field returned by the previous call (the state
+        of two generations ago), as `GameEngine` does by swapping the areas.
+
+        Raises:
+            ValueError: If `mode` argument is unknown.
+
+        Returns:
+            Calculated state for the next step, and an array of live cells that
+            will be drawn. While the field is sparse it is an array (N, 2), a
+            view of a buffer which is valid until the next call.
+        """
+        if mode not in {"Moore", "Neumann"}:
+            msg = "mode is not set!"
+            raise ValueError(msg)
+
+        if self._rule is None or rule is not self._rule[0] or mode != self._rule[1]:
+            # With another rule any cell can change, the changed cells are not enough
+            self._rule = (rule, mode)
+            self.sparse = False
+
+        if not self.sparse:
+            next_field, cells = check_cells(current_field, next_field, width, height, rule, mode)
+            self.population = len(cells)
+            if self.population < self.threshold * self._area:
+                self._to_sparse(current_field, next_field)
+            return next_field, cells
+
+        self._generation += 1
+        bound = min(9 * self._n_changed, self._area)
+        self._new_changed = self._reserve(self._new_changed, bound)
+        self._live = self._reserve(self._live, min(self.population + bound, self._area))
+
+        n_new, self.population = _step_active(
+            current_field,
+            next_field,
+            self._changed,
+            self._n_changed,
+            self._new_changed,
+            self._stamp,
+            self._generation,
+            self._index,
+            self._live,
+            self.population,
+            rule,
+            mode == "Moore",
+        )
+        self._changed, self._new_changed = self._new_changed, self._changed
+        self._n_changed = n_new
+
+        if self.population > 2 * self.threshold * self._area:
+            self.sparse = False
+
+        return next_field, self._live[: self.population]
@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import NamedTuple
+
+import numpy as np
+from loguru import logger
+
+from src.engines import GameEngine
+from src.engines.snapshots import SnapshotInfo
+from src.misc.type_aliases import ResultToDrawing
+
+
+class Generation(NamedTuple):
+    """A calculated generation, copied out of the engine for the render loop.
+
+    Attributes:
+        number: Number of the generation (`GameEngine.generation`).
+        field: States of the cells.
+        cells: The living cells, as `GameEngine.process` returns them.
+        changes: Array (N, 2) of (x, y) pairs of the cells changed since the
+            previous generation given to the render loop.
+        states: Number of states of a cell in the rule of the generation.
+        info: What a snapshot of the generation keeps besides the field, taken
+            together with it.
+
+    """
+
+    number: int
+    field: np.ndarray
+    cells: ResultToDrawing
+    changes: np.ndarray
+    states: int
+    info: SnapshotInfo
+
+
+def merge(older: Generation, newer: Generation) -> Generation:
+    """The newer generation with the changes of both, as if the older one was never drawn."""
+    return newer._replace(changes=np.concatenate((older.changes, newer.changes)))
+
+
+class FrameQueue:
+    """Bounded queue of the generations between the simulation thread and the render loop.
+
+    `put` never blocks: when the queue is full, the oldest generation is
+    dropped, its changes go to the next one. `take` gives the newest
+    generation with the changes of all the queued ones, so the renderer that
+    falls behind skips the stale generations.
+
+    Attributes:
+        maxsize: The maximum number of the queued generations.
+        dropped: Number of the generations that were never drawn.
+
+    """
+
+    maxsize: int
+    dropped: int
+
+    def __init__(self, maxsize: int = 2) -> None:
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items: deque[Generation] = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Generation) -> None:
+        """Queues the generation, dropping the oldest one if the queue is full."""
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                stale = self._items.popleft()
+                if self._items:
+                    self._items[0] = merge(stale, self._items[0])
+                else:
+                    item = merge(stale, item)
+                self.dropped += 1
+            self._items.append(item)
+
+    def take(self) -> Generation | None:
+        """The newest generation with the changes of all the queued ones, None if there are none."""
+        with self._lock:
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            while self._items:
+                item = merge(item, self._items.popleft())
+                self.dropped += 1
+            return item
+
+
+class Simulation:
+    """Calculates the generations in a thread of its own and puts them into a `FrameQueue`.
+
+    The numba kernels release the GIL, so the render loop draws while the
+    next generation is calculated. The generations are calculated at most
+    `rate` per second, a slow frame does not slow them down and a slow
+    generation does not hold the frames. Only the thread touches the engine:
+    the other threads `submit` their changes (the rule, the mode, the field)
+    and it applies them between generations, even while paused.
+
+    Attributes:
+        engine: The game engine, only the thread calls its `process`.
+        queue: Generations for the render loop.
+        rate: The maximum number of generations per second, 0 - no limit.
+        error: The exception that stopped the thread, None while it runs.
+
+    """
+
+    engine: GameEngine
+    queue: FrameQueue
+    rate: int
+    error: Exception | None
+
+    def __init__(
+        self,
+        engine: GameEngine,
+        paused: Callable[[], bool],
+        rate: int = 0,
+        queue_size: int = 2,
+    ) -> None:
+        self.engine = engine
+        self.queue = FrameQueue(maxsize=queue_size)
+        self.rate = rate
+        self.error = None
+        self._changes: deque[Callable[[GameEngine], object]] = deque()
+        self._paused = paused
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the thread is calculating the generations."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Starts the thread, if it has not been started yet."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stops the thread after the current generation."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def take(self) -> Generation | None:
+        """The newest calculated generation (see `FrameQueue.take`).
+
+        Raises:
+            Exception: The exception that stopped the thread.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.queue.take()
+
+    def submit(self, change: Callable[[GameEngine], object]) -> None:
+        """Queues a change of the engine, the thread applies it before its next generation."""
+        self._changes.append(change)
+
+    def _apply_changes(self) -> None:
+        while self._changes:
+            self._changes.popleft()(self.engine)
+
+    def _step(self) -> Generation:
+        states = self.engine.rule.states
+        cells = self.engine.process()
+        return Generation(
+            number=self.engine.generation,
+            field=self.engine.field.copy(),
+            # The numba backend returns a view of its buffer, it is overwritten by the next generation
+            cells=cells.copy() if isinstance(cells, np.ndarray) else cells,
+            changes=np.concatenate((self.engine.births, self.engine.deaths)),
+            states=states,
+            info=self.engine.snapshot_info(),
+        )
+
+    def _run(self) -> None:
+        period = 1 / self.rate if self.rate else 0.0
+        deadline = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                self._apply_changes()
+                if self._paused():
+                    self._stop.wait(period or 0.01)
+                    deadline = time.perf_counter()
+                    continue
+
+                self.queue.put(self._step())
+
+                deadline = max(deadline + period, time.perf_counter())  # No catching up after slow generations
+                self._stop.wait(max(deadline - time.perf_counter(), 0))
+        except Exception as exc:  # noqa: BLE001  # It is raised in the render loop by `take`
+            logger.exception("the simulation thread has stopped")
+            self.error = exc
@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+from src.engines.core import check_cells
+from src.misc.type_aliases import CheckCells, Kernel
+
+TILE_SIZE = 32
+
+
+@dataclass(slots=True)
+class TileStats:
+    """Activity of the tiles, for the last generation and since the start.
+
+    Attributes:
+        tiles: Number of tiles of the field.
+        computed: Tiles calculated in the last generation.
+        changed: Tiles that changed in the last generation.
+        generations: Number of calculated generations.
+        computed_total: Tiles calculated in all generations.
+
+    """
+
+    tiles: int = 0
+    computed: int = 0
+    changed: int = 0
+    generations: int = 0
+    computed_total: int = 0
+
+    @property
+    def skipped(self) -> int:
+        """Tiles skipped in the last generation."""
+        return self.tiles - self.computed
+
+    @property
+    def skipped_ratio(self) -> float:
+        """Share of the tiles skipped since the start."""
+        total = self.tiles * self.generations
+        return 1 - self.computed_total / total if total else 0.0
+
+
+class TileMap:
+    """Calculates only the tiles of the field which can change, the kernel is called for each of them.
+
+    A tile can change only if it or one of its 8 neighbor tiles changed in the
+    last generation. The other (frozen) tiles are the same in both buffers of
+    the field, so they keep their previous state and their previous draw list.
+
+    Attributes:
+        tile: Width and height of a tile in cells.
+        changed: Bitmap of the tiles changed in the last generation.
+        stats: Activity of the tiles.
+        kernel: Function with the signature of `check_cells` which calculates a tile.
+
+    """
+
+    tile: int
+    changed: np.ndarray
+    stats: TileStats
+    kernel: Kernel
+
+    def __init__(self, width: int, height: int, tile: int = TILE_SIZE, kernel: Kernel = check_cells) -> None:
+        self.tile = tile
+        self.kernel = kernel
+
+        rows, columns = -(-height // tile), -(-width // tile)
+        self.changed = np.ones((rows, columns), dtype=np.bool_)
+        self.stats = TileStats(tiles=rows * columns)
+
+        self._cells = [np.empty((0, 2), dtype=np.intp)] * (rows * columns)
+        self._scratch: np.ndarray | None = None
+        self._rule: tuple[np.ndarray, str] | None = None
+
+    def active(self) -> np.ndarray:
+        """Bitmap of the tiles which changed or border a changed tile."""
+        padded = np.pad(self.changed, 1)
+        rows = padded[:-2] | padded[1:-1] | padded[2:]
+        return rows[:, :-2] | rows[:, 1:-1] | rows[:, 2:]  # type: ignore
+
+    def _compute(
+        self,
+        current_field: np.ndarray,
+        next_field: np.ndarray,
+        row: int,
+        column: int,
+        width: int,
+        height: int,
+        rule: np.ndarray,
+        mode: Literal["Moore", "Neumann"],
+    ) -> bool:
+        """Calculates one tile with a halo of one cell around it.
+
+        Returns:
+            Whether the tile has changed.
+        """
+        top, left = row * self.tile, column * self.tile
+        bottom, right = min(top + self.tile, height), min(left + self.tile, width)
+        halo_top, halo_left = max(top - 1, 0), max(left - 1, 0)
+        halo_bottom, halo_right = min(bottom + 1, height), min(right + 1, width)
+
+        if self._scratch is None or self._scratch.dtype != next_field.dtype:
+            self._scratch = np.zeros((self.tile + 2, self.tile + 2), dtype=next_field.dtype)
+        # Cells of the halo are calculated with the wrong neighbors, only the tile itself is kept
+        self.kernel(
+            current_field=current_field[halo_top:halo_bottom, halo_left:halo_right],
+            next_field=self._scratch,
+            width=halo_right - halo_left,
+            height=halo_bottom - halo_top,
+            rule=rule,
+            mode=mode,
+        )
+
+        region = self._scratch[top - halo_top : bottom - halo_top, left - halo_left : right - halo_left]
+        next_field[top:bottom, left:right] = region
+        self._cells[row * self.changed.shape[1] + column] = np.argwhere(region.T == 1) + np.array([left, top])
+        return not np.array_equal(region, current_field[top:bottom, left:right])
+
+    def check_cells(
+        self,
+        current_field: np.ndarray,
+        next_field: np.ndarray,
+        width: int,
+        height: int,
+        rule: np.ndarray,
+        mode: Literal["Moore", "Neumann"] = "Moore",
+    ) -> CheckCells:
+        """Alternative to `check_cells` which skips the tiles that can not change.
+
+        `next_field` must be the field returned by the previous call (the state
+        of two generations ago), as `GameEngine` does by swapping the areas.
+
+        Raises:
+            ValueError: If `mode` argument is unknown.
+
+        Returns:
+            Calculated state for the next step, and an array of live cells that
+            will be drawn.
+        """
+        if mode not in {"Moore", "Neumann"}:
+            msg = "mode is not set!"
+            raise ValueError(msg)
+        if self._rule is None or rule is not self._rule[0] or mode != self._rule[1]:
+            # With another rule any tile can change
+            self._rule = (rule, mode)
+            self.changed[:] = True
+
+        active = self.active()
+        for row, column in zip(*np.nonzero(active), strict=True):
+            self.changed[row, column] = self._compute(current_field, next_field, row, column, width, height, rule, mode)
+
+        self.stats.computed = int(np.count_nonzero(active))
+        self.stats.changed = int(np.count_nonzero(self.changed))
+        self.stats.generations += 1
+        self.stats.computed_total += self.stats.computed
+
+        return next_field, np.concatenate(self._cells)
@@ -0,0 +1,146 @@
+import threading
+import time
+from typing import assert_never
+
+import numpy as np
+from loguru import logger
+
+from src.engines.rules import compile_rule
+from src.misc.states import Backend, Mode
+from src.misc.type_aliases import Kernel
+
+WARM_UP_SIZE = 16  # Width and height of the field the kernels are compiled on
+WARM_UP_RULE = "B2/S34/C4"  # All the rules have the same type of the table, this one has dying cells too
+
+
+def _backend_kernel(  # noqa: PLR0911
+    backend: Backend,
+    width: int,
+    height: int,
+) -> tuple[Kernel, np.ndarray, np.ndarray] | None:
+    """The kernel of the backend with the fields for it, as `GameEngine` creates them.
+
+    Returns:
+        The kernel with the current and the next field, or None if there is no
+        kernel to run (nothing to compile, or it is already compiled here).
+    """
+    field = np.random.default_rng(0).integers(0, 2, size=(height, width), dtype=np.uint8)
+    empty = np.zeros_like(field)
+
+    match backend:
+        case Backend.NUMBA | Backend.NUMPY | Backend.HASHLIFE:  # The numba kernels are compiled by their signatures
+            return None
+        case Backend.BITPACKED:
+            from src.engines.bitpacked import check_cells_bitpacked, pack_field  # noqa: PLC0415
+
+            return check_cells_bitpacked, pack_field(field), pack_field(empty)
+        case Backend.PARALLEL:
+            from src.engines.parallel import check_cells_parallel  # noqa: PLC0415
+
+            return check_cells_parallel, field, empty
+        case Backend.MULTIPROCESS:
+            # The workers compile their kernel themselves, here it only gets into the cache on disk for them
+            from src.engines.multiprocess import _collect_rows, _step_rows  # noqa: PLC0415
+
+            table = np.array(compile_rule(WARM_UP_RULE).table)  # The workers get a writable copy of the table
+            for moore in (True, False):
+                _step_rows(field, empty, 0, height, table, moore)
+            _collect_rows(field, 0, height, np.empty((height * width, 2), dtype=np.int32))
+            return None
+        case Backend.SPARSE:
+            from src.engines.sparse import SparseEngine  # noqa: PLC0415
+
+            # With the threshold of 1 the first generation is dense and the others are sparse
+            return SparseEngine(width, height, threshold=1.0).check_cells, field, empty
+        case Backend.TILED:
+            from src.engines.tiles import TileMap  # noqa: PLC0415
+
+            return TileMap(width, height, tile=WARM_UP_SIZE // 2).check_cells, field, empty
+        case Backend.CHUNKED:
+            from src.engines.chunks import ChunkWorld  # noqa: PLC0415
+
+            world = ChunkWorld(chunk=WARM_UP_SIZE // 2)
+            world.load(field)
+            return world.check_cells, field, empty
+        case _ as unreachable:
+            assert_never(unreachable)
+
+
+def warm_up(backend: Backend) -> float:
+    """Compiles the kernels of the backend for all the modes, or loads them from the cache on disk.
+
+    The kernels make a few generations on a small field, so exactly the
+    specializations the engine needs are compiled.
+
+    Returns:
+        Seconds it took.
+    """
+    start = time.perf_counter()
+    if backend is Backend.NUMBA:
+        from src.engines.buffered import SIGNATURES  # noqa: PLC0415
+        from src.engines.core import compile_kernels  # noqa: PLC0415
+
+        # Both the kernel of a generation and the one of the turbo mode (`GameEngine.turbo`)
+        compile_kernels(signatures=SIGNATURES)
+    elif backend not in {Backend.NUMPY, Backend.HASHLIFE, Backend.BITPACKED, Backend.CHUNKED}:
+        from src.engines.core import check_cells, compile_kernels, neighbors_mask  # noqa: PLC0415
+
+        # Only the sparse backend calls `check_cells` with the fields of the engine, the others use `neighbors_mask`
+        if backend is Backend.SPARSE:
+            compile_kernels(neighbors_mask, check_cells)
+        else:
+            compile_kernels(neighbors_mask)
+
+    prepared = _backend_kernel(backend, WARM_UP_SIZE, WARM_UP_SIZE)
+    if prepared is not None:
+        kernel, current_field, next_field = prepared
+        rule = compile_rule(WARM_UP_RULE if backend is not Backend.BITPACKED else "b3/s23").table
+        for mode in Mode:
+            for _ in range(2):
+                next_field, _cells = kernel(
+                    current_field=current_field,
+                    next_field=next_field,
+                    width=WARM_UP_SIZE,
+                    height=WARM_UP_SIZE,
+                    rule=rule,
+                    mode=mode.get_name(),
+                )
+                current_field, next_field = next_field, current_field
+    return time.perf_counter() - start
+
+
+class WarmUp:
+    """Runs `warm_up` in a background thread, so the window is drawn while the kernels are compiled.
+
+    Attributes:
+        backend: The backend whose kernels are compiled.
+        seconds: Seconds the compilation took, None until it is done.
+
+    """
+
+    backend: Backend
+    seconds: float | None
+
+    def __init__(self, backend: Backend) -> None:
+        self.backend = backend
+        self.seconds = None
+        self._thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self.seconds = warm_up(self.backend)
+        except Exception:  # noqa: BLE001  # The kernels are compiled on the first call then
+            logger.exception(f"warm-up of the {self.backend.value} backend failed")
+        else:
+            logger.info(f"the {self.backend.value} backend is compiled in {self.seconds:.2f} s")
+
+    @property
+    def done(self) -> bool:
+        """Whether the compilation has finished (or failed)."""
+        return not self._thread.is_alive()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits for the compilation, returns `done`."""
+        self._thread.join(timeout)
+        return self.done
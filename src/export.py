@@ -0,0 +1,462 @@
+"""Offline export of a run: PNG frames or an animated GIF, encoded by a pool of processes.
+
+The engine is stepped with no window, every frame is rasterized straight
+from the field with the palette and the cell size of `GUI.draw_cells`. Only
+the field (a byte per cell) is sent to the encoding processes, they turn it
+into pixels and encode them while the simulation goes on, so the speed of
+the export is the speed of the encoding.
+"""
+
+import multiprocessing as mp
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, assert_never
+
+import click
+import numpy as np
+from numba import njit  # type: ignore
+
+import src.misc.logs as lg
+from src import config
+from src.cli import check_topology, validate_pattern, validate_rule
+from src.engines import GameEngine
+from src.engines.snapshots import read_info
+from src.headless import prepare
+from src.interfaces.renderer import build_palette
+from src.misc.states import Backend, ExportFormat, Mode, Topology
+from src.misc.type_aliases import Size
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+GIF_MAX_SIZE = 0xFFFF  # Width and height of a GIF are uint16
+_GIF_MAX_CODE = 4096  # Codes of the LZW of GIF are at most 12 bits
+_HASH_SIZE = 5003  # Prime above `_GIF_MAX_CODE`, the table of the LZW strings
+_SUB_BLOCK = 255  # The most bytes of a data sub-block of GIF
+
+
+class ExportResult(NamedTuple):
+    """Result of `export_frames`.
+
+    Attributes:
+        frames: Number of the exported frames.
+        seconds: Seconds from the first generation to the last written frame.
+        files: The PNG files, or the GIF file.
+        size: Bytes of the written files.
+
+    """
+
+    frames: int
+    seconds: float
+    files: list[Path]
+    size: int
+
+    @property
+    def rate(self) -> float:
+        """Frames per second."""
+        return self.frames / self.seconds if self.seconds else 0.0
+
+
+def export_format(path: Path) -> ExportFormat:
+    """The format of the output: a `.gif` file is an animation, anything else a folder of PNG frames."""
+    return ExportFormat.GIF if path.suffix.lower() == ".gif" else ExportFormat.PNG
+
+
+def rasterize(field: np.ndarray, cell: int) -> np.ndarray:
+    """The pixels of the field as `CellRenderer.render` draws it: `cell` x `cell` pixels with a 1-px grid gap.
+
+    Args:
+        field: Matrix (height x width) with the states of the cells.
+        cell: Size of a cell in pixels.
+
+    Returns:
+        Matrix (height * cell x width * cell) with the states of the pixels, the gap is the dead state.
+    """
+    height, width = field.shape
+    pixels = np.empty((height, cell, width, cell), dtype=np.uint8)
+    pixels[:] = field[:, None, :, None]
+    if cell > 1:
+        pixels[:, -1] = 0
+        pixels[:, :, :, -1] = 0
+    return pixels.reshape(height * cell, width * cell)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(pixels: np.ndarray, palette: np.ndarray, level: int = 6) -> bytes:
+    """An indexed PNG of the pixels.
+
+    Args:
+        pixels: Matrix (height x width) with the indices of the colors.
+        palette: Matrix (colors x 3) with RGB colors (`build_palette`).
+        level: Compression level of zlib, 0-9.
+
+    Returns:
+        The PNG file.
+    """
+    height, width = pixels.shape
+    rows = np.zeros((height, width + 1), dtype=np.uint8)  # Every row starts with its filter, 0 - none
+    rows[:, 1:] = pixels
+    header = struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)  # 8 bits of a palette index per pixel
+    return (
+        PNG_SIGNATURE
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"PLTE", palette.astype(np.uint8).tobytes())
+        + _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), level))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def _emit(output: np.ndarray, state: np.ndarray, code: int | np.integer, bits: int) -> None:
+    """Appends the code of `bits` bits to the output, least significant bits first.
+
+    `state` is the bits not written yet, their number and the length of the output.
+    """
+    state[0] |= code << state[1]
+    state[1] += bits
+    while state[1] >= 8:  # noqa: PLR2004
+        output[state[2]] = state[0] & 0xFF
+        state[0] >>= 8
+        state[1] -= 8
+        state[2] += 1
+
+
+@njit(cache=True, nogil=True)  # type: ignore
+def lzw_encode(pixels: np.ndarray, min_size: int) -> np.ndarray:
+    """Compresses the pixels by the variable-length LZW of GIF.
+
+    The strings are kept in a hash table of `_HASH_SIZE` slots keyed by
+    (prefix code, pixel); when all the 4096 codes are taken, a clear code
+    starts a new table.
+
+    Args:
+        pixels: Flat array (uint8) with the indices of the colors, below `1 << min_size`.
+        min_size: The minimum code size of GIF, 2-8.
+
+    Returns:
+        The compressed bytes, not split into sub-blocks yet.
+    """
+    clear = 1 << min_size
+    keys = np.full(_HASH_SIZE, -1, dtype=np.int64)
+    codes = np.zeros(_HASH_SIZE, dtype=np.int64)
+    output = np.zeros(2 * len(pixels) + 64, dtype=np.uint8)  # A code of 12 bits per pixel at most
+    state = np.zeros(3, dtype=np.int64)
+
+    size = min_size + 1
+    next_code = clear + 2
+    _emit(output, state, clear, size)
+    prefix = np.int64(pixels[0])
+    for index in range(1, len(pixels)):
+        pixel = np.int64(pixels[index])
+        key = (prefix << 8) | pixel
+        slot = key % _HASH_SIZE
+        while keys[slot] != -1 and keys[slot] != key:
+            slot = (slot + 1) % _HASH_SIZE
+        if keys[slot] == key:
+            prefix = codes[slot]
+            continue
+
+        # The decoder adds its string one code later, so the size grows after the code `1 << size` is taken
+        if next_code > (1 << size) and size < 12:  # noqa: PLR2004
+            size += 1
+        _emit(output, state, prefix, size)
+        if next_code < _GIF_MAX_CODE:
+            keys[slot] = key
+            codes[slot] = next_code
+            next_code += 1
+        else:
+            _emit(output, state, clear, size)
+            keys[:] = -1
+            size = min_size + 1
+            next_code = clear + 2
+        prefix = pixel
+
+    if next_code > (1 << size) and size < 12:  # noqa: PLR2004
+        size += 1
+    _emit(output, state, prefix, size)
+    if next_code >= (1 << size) and size < 12:  # noqa: PLR2004  # The decoder adds the string of the last code
+        size += 1
+    _emit(output, state, clear + 1, size)  # End of the information
+    if state[1]:
+        _emit(output, state, 0, 8 - state[1])
+    return output[: state[2]]
+
+
+def _gif_bits(colors: int) -> int:
+    """Bits of an index of the color table of GIF, its size is a power of two."""
+    return max(1, (colors - 1).bit_length())
+
+
+def gif_header(width: int, height: int, palette: np.ndarray) -> bytes:
+    """The header of an animated GIF which loops forever: the screen, the color table and the loop.
+
+    Raises:
+        ValueError: If the image is larger than GIF allows.
+    """
+    if max(width, height) > GIF_MAX_SIZE:
+        msg = f"the image {width}x{height} is too large for GIF, the most is {GIF_MAX_SIZE}x{GIF_MAX_SIZE}"
+        raise ValueError(msg)
+    bits = _gif_bits(len(palette))
+    table = np.zeros((1 << bits, 3), dtype=np.uint8)
+    table[: len(palette)] = palette
+    screen = struct.pack("<HHBBB", width, height, 0x80 | (bits - 1) << 4 | (bits - 1), 0, 0)
+    loop = b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00"
+    return b"GIF89a" + screen + table.tobytes() + loop
+
+
+def encode_gif_frame(pixels: np.ndarray, colors: int, delay: int) -> bytes:
+    """A frame of an animated GIF over the whole screen, with the color table of `gif_header`.
+
+    Args:
+        pixels: Matrix (height x width) with the indices of the colors.
+        colors: Number of the colors of the palette.
+        delay: Time the frame is shown, in hundredths of a second.
+
+    Returns:
+        The graphic control extension, the image descriptor and the data of the frame.
+    """
+    height, width = pixels.shape
+    min_size = max(2, _gif_bits(colors))
+    data = lzw_encode(pixels.reshape(-1), min_size).tobytes()
+    blocks = b"".join(
+        bytes((len(data[start : start + _SUB_BLOCK]),)) + data[start : start + _SUB_BLOCK]
+        for start in range(0, len(data), _SUB_BLOCK)
+    )
+    control = b"\x21\xf9\x04\x04" + struct.pack("<H", delay) + b"\x00\x00"  # Not disposed, no transparent color
+    descriptor = b"\x2c" + struct.pack("<HHHHB", 0, 0, width, height, 0)
+    return control + descriptor + bytes((min_size,)) + blocks + b"\x00"
+
+
+def _png_task(path: Path, field: np.ndarray, cell: int, palette: np.ndarray, level: int) -> int:
+    """Rasterizes and writes a PNG frame in an encoding process, returns its bytes."""
+    data = encode_png(rasterize(field, cell), palette, level)
+    path.write_bytes(data)
+    return len(data)
+
+
+def _gif_task(field: np.ndarray, cell: int, colors: int, delay: int) -> bytes:
+    """Rasterizes and encodes a GIF frame in an encoding process, the frames are written in order by the caller."""
+    return encode_gif_frame(rasterize(field, cell), colors, delay)
+
+
+def _written(future: Future, stream: BinaryIO | None) -> int:
+    """Waits for the encoded frame, appends it to the GIF, returns its bytes."""
+    result = future.result()
+    if stream is None:
+        return int(result)  # The PNG frame is written by the encoding process
+    stream.write(result)
+    return len(result)
+
+
+def export_frames(
+    engine: GameEngine,
+    frames: int,
+    output: Path,
+    cell: int = config.GameSettings.Sizes.cell,
+    workers: int = 0,
+    fps: int = config.GameSettings.export_fps,
+) -> ExportResult:
+    """Steps the engine and exports every field as a frame, the first frame is the current field.
+
+    The encoding processes get at most `export_queue` frames each, the
+    simulation waits for the oldest one when they are all busy.
+
+    Args:
+        engine: The game engine with the initial field, rule and mode, `turbo` generations make a frame.
+        frames: Number of the frames.
+        output: A `.gif` file, or a folder for `frame_NNNNNN.png` files (it is created if needed).
+        cell: Size of a cell in pixels.
+        workers: Number of the encoding processes, 0 - all cores.
+        fps: Frame rate of the GIF animation.
+
+    Returns:
+        The number of the frames, the time of the export and the written files.
+
+    Raises:
+        ValueError: If the frames are too large for GIF.
+        OSError: If the files cannot be written.
+    """
+    states = engine.rule.states
+    palette = build_palette(config.GameSettings.GUIColors.cell, config.GameSettings.GUIColors.back_ground, states)
+    height, width = engine.size_area.height * cell, engine.size_area.width * cell
+    delay = max(1, round(100 / fps))
+
+    fmt = export_format(output)
+    files: list[Path] = []
+    stream: BinaryIO | None = None
+    size = 0
+    match fmt:
+        case ExportFormat.PNG:
+            output.mkdir(parents=True, exist_ok=True)
+        case ExportFormat.GIF:
+            header = gif_header(width, height, palette)
+            output.parent.mkdir(parents=True, exist_ok=True)
+            stream = output.open("wb")
+            stream.write(header)
+            size += len(header)
+            files.append(output)
+        case _ as unreachable:
+            assert_never(unreachable)
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    try:
+        # Spawned, not forked: the threads of numba (the parallel backend) do not survive `fork`
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+            pending: deque[Future] = deque()
+            for index in range(frames):
+                if index:
+                    engine.process()
+                field = engine.field.copy()
+                if stream is None:
+                    path = output / f"frame_{index:06d}.png"
+                    pending.append(pool.submit(_png_task, path, field, cell, palette, config.GameSettings.export_level))
+                    files.append(path)
+                else:
+                    pending.append(pool.submit(_gif_task, field, cell, states, delay))
+                if len(pending) >= workers * config.GameSettings.export_queue:
+                    size += _written(pending.popleft(), stream)
+            while pending:
+                size += _written(pending.popleft(), stream)
+        if stream is not None:
+            stream.write(b"\x3b")  # The end of the GIF
+            size += 1
+    finally:
+        if stream is not None:
+            stream.close()
+
+    return ExportResult(frames=frames, seconds=time.perf_counter() - start, files=files, size=size)
+
+
+@click.command()
+@click.option(*config.CLI.Param.logging, is_flag=True, default=False, help=config.CLI.Docs.logging)
+@click.option(
+    *config.CLI.Param.Batch.width,
+    type=click.IntRange(min=1),
+    default=config.WindowConfig.resolution.width // config.GameSettings.Sizes.cell,
+    help=config.CLI.Docs.Batch.width,
+)
+@click.option(
+    *config.CLI.Param.Batch.height,
+    type=click.IntRange(min=1),
+    default=config.WindowConfig.resolution.height // config.GameSettings.Sizes.cell,
+    help=config.CLI.Docs.Batch.height,
+)
+@click.option(*config.CLI.Param.Batch.rule, default=None, callback=validate_rule, help=config.CLI.Docs.Batch.rule)
+@click.option(*config.CLI.Param.moore, flag_value=Mode.MOORE.value, default=True, help=config.CLI.Docs.Mode.moore)
+@click.option(*config.CLI.Param.neumann, flag_value=Mode.NEUMANN.value, help=config.CLI.Docs.Mode.neumann)
+@click.option(
+    *config.CLI.Param.topology,
+    type=click.Choice([topology.value for topology in Topology]),
+    default=Topology.DEAD.value,
+    help=config.CLI.Docs.topology,
+)
+@click.option(*config.CLI.Param.Batch.seed, type=int, default=None, help=config.CLI.Docs.Batch.seed)
+@click.option(
+    *config.CLI.Param.Export.frames,
+    type=click.IntRange(min=1),
+    default=100,
+    help=config.CLI.Docs.Export.frames,
+)
+@click.option(
+    *config.CLI.Param.Export.output,
+    type=click.Path(path_type=Path),
+    default=Path("frames"),
+    help=config.CLI.Docs.Export.output,
+)
+@click.option(*config.CLI.Param.turbo, type=click.IntRange(min=1), default=1, help=config.CLI.Docs.Export.turbo)
+@click.option(
+    *config.CLI.Param.Export.cell,
+    type=click.IntRange(min=1),
+    default=config.GameSettings.Sizes.cell,
+    help=config.CLI.Docs.Export.cell,
+)
+@click.option(
+    *config.CLI.Param.Export.fps,
+    type=click.IntRange(min=1, max=100),
+    default=config.GameSettings.export_fps,
+    help=config.CLI.Docs.Export.fps,
+)
+@click.option(*config.CLI.Param.workers, type=click.IntRange(min=0), default=0, help=config.CLI.Docs.Export.workers)
+@click.option(
+    *config.CLI.Param.backend,
+    type=click.Choice([backend.value for backend in Backend]),
+    default=Backend.NUMBA.value,
+    help=config.CLI.Docs.backend,
+)
+@click.option(
+    *config.CLI.Param.pattern,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    callback=validate_pattern,
+    help=config.CLI.Docs.pattern,
+)
+@click.option(*config.CLI.Param.offset, type=(int, int), default=None, help=config.CLI.Docs.offset)
+@click.option(
+    *config.CLI.Param.resume,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help=config.CLI.Docs.resume,
+)
+def export(
+    logging: bool,
+    width: int,
+    height: int,
+    rule: str | None,
+    mode: str,
+    topology: str,
+    seed: int | None,
+    frames: int,
+    output: Path,
+    turbo: int,
+    cell: int,
+    fps: int,
+    workers: int,
+    backend: str,
+    pattern: Path | None,
+    offset: tuple[int, int] | None,
+    resume: Path | None,
+) -> ExportResult:
+    """Exports the generations of the game of Life as PNG frames or an animated GIF."""
+    lg.init(log=logging)
+    check_topology(Backend(backend), Topology(topology))
+
+    if resume is not None:  # The field of the snapshot has its own size
+        try:
+            info = read_info(resume)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        width, height = info.width, info.height
+
+    engine = GameEngine(
+        size=Size(width=width, height=height),
+        backend=Backend(backend),
+        topology=Topology(topology),
+        seed=seed,
+        track_changes=False,
+    )
+    engine.mode = Mode(mode)
+    engine.turbo = turbo
+
+    try:
+        prepare(engine, rule=rule, pattern=pattern, offset=offset, resume=resume)
+        result = export_frames(engine, frames=frames, output=output, cell=cell, workers=workers, fps=fps)
+    except ValueError as exc:  # The pattern is broken or the frames are too large
+        raise click.ClickException(str(exc)) from exc
+
+    size = engine.size_area
+    click.echo(f"field: {size.width}x{size.height}, rule: {engine.preset}, mode: {engine.mode.value}")
+    click.echo(f"frames: {result.frames} of {size.width * cell}x{size.height * cell} px to {output}")
+    click.echo(f"frames/sec: {result.rate:.2f}")
+    click.echo(f"written: {result.size / 2**20:.1f} MiB")
+    return result
+
+
+if __name__ == "__main__":
+    export()
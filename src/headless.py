@@ -0,0 +1,302 @@
+"""Headless batch simulation: steps the engine with no window and no frame cap."""
+
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import click
+import numpy as np
+
+import src.misc.logs as lg
+from src import config
+from src.cli import check_topology, validate_pattern, validate_rule
+from src.engines import GameEngine
+from src.engines.patterns import read_pattern
+from src.engines.snapshots import SnapshotWriter, capture, read_info
+from src.misc.states import Backend, Mode, Topology
+from src.misc.type_aliases import Size
+
+
+class BatchResult(NamedTuple):
+    """Result of `simulate`.
+
+    Attributes:
+        generations: Number of the calculated generations.
+        first: Seconds of the first generation, it includes the compilation of the kernels.
+        seconds: Seconds of the other generations.
+        population: Number of the living cells after the last generation.
+        dumps: Files with the saved fields.
+        period: Period of the final field, None if it does not repeat or the cycles were not looked for.
+        snapshots: Number of the written snapshots.
+
+    """
+
+    generations: int
+    first: float
+    seconds: float
+    population: int
+    dumps: list[Path]
+    period: int | None = None
+    snapshots: int = 0
+
+    @property
+    def rate(self) -> float:
+        """Generations per second without the first generation."""
+        return (self.generations - 1) / self.seconds if self.seconds else 0.0
+
+
+def simulate(
+    engine: GameEngine,
+    generations: int,
+    dump_every: int = 0,
+    dump_dir: Path = Path("dumps"),
+    snapshot_every: int = 0,
+    snapshot: Path = config.WindowConfig.PathToFile.snapshot,
+) -> BatchResult:
+    """Calculates `generations` generations as fast as the backend can.
+
+    Args:
+        engine: The game engine with the initial field, rule and mode.
+        generations: Number of generations to calculate.
+        dump_every: Save the field (`numpy.save`) every N generations, 0 - never.
+        dump_dir: Folder for the saved fields, it is created if needed.
+        snapshot_every: Save a snapshot every N generations, 0 - never. The
+            snapshots are written in the background, the last one before the return.
+        snapshot: File of the snapshots, every snapshot replaces the previous one.
+
+    Returns:
+        Timings and the final population, the time of saving the fields is not counted.
+    """
+    dumps = []
+    if dump_every:
+        dump_dir.mkdir(parents=True, exist_ok=True)
+    writer = SnapshotWriter(level=config.GameSettings.snapshot_level)
+
+    first = seconds = 0.0
+    for generation in range(1, generations + 1):
+        start = time.perf_counter()
+        engine.process()
+        elapsed = time.perf_counter() - start
+        if generation == 1:
+            first = elapsed
+        else:
+            seconds += elapsed
+
+        if dump_every and generation % dump_every == 0:
+            path = dump_dir / f"generation_{generation:08d}.npy"
+            np.save(path, engine.field)
+            dumps.append(path)
+
+        if snapshot_every and generation % snapshot_every == 0:
+            writer.save(snapshot, capture(engine.field, engine.snapshot_info()))
+
+    writer.flush()
+    population = int(np.count_nonzero(engine.field == 1))
+    return BatchResult(
+        generations=generations,
+        first=first,
+        seconds=seconds,
+        population=population,
+        dumps=dumps,
+        period=engine.period,
+        snapshots=writer.written,
+    )
+
+
+def prepare(
+    engine: GameEngine,
+    rule: str | None,
+    pattern: Path | None,
+    offset: tuple[int, int] | None,
+    resume: Path | None,
+) -> None:
+    """Loads the snapshot or the pattern, the rule of the option wins over their rules, b3/s23 is the default one."""
+    decoded = None
+    if resume is not None:
+        engine.load_snapshot(resume)  # Its rule, mode and generation
+    elif pattern is not None:
+        decoded = read_pattern(pattern)
+        rule = rule or decoded.rule
+    if rule is not None:
+        engine.preset = rule
+    if decoded is not None:
+        engine.load_pattern(decoded, offset)
+
+
+@click.command()
+@click.option(*config.CLI.Param.logging, is_flag=True, default=False, help=config.CLI.Docs.logging)
+@click.option(
+    *config.CLI.Param.Batch.width,
+    type=click.IntRange(min=1),
+    default=config.WindowConfig.resolution.width // config.GameSettings.Sizes.cell,
+    help=config.CLI.Docs.Batch.width,
+)
+@click.option(
+    *config.CLI.Param.Batch.height,
+    type=click.IntRange(min=1),
+    default=config.WindowConfig.resolution.height // config.GameSettings.Sizes.cell,
+    help=config.CLI.Docs.Batch.height,
+)
+@click.option(*config.CLI.Param.Batch.rule, default=None, callback=validate_rule, help=config.CLI.Docs.Batch.rule)
+@click.option(*config.CLI.Param.moore, flag_value=Mode.MOORE.value, default=True, help=config.CLI.Docs.Mode.moore)
+@click.option(*config.CLI.Param.neumann, flag_value=Mode.NEUMANN.value, help=config.CLI.Docs.Mode.neumann)
+@click.option(
+    *config.CLI.Param.topology,
+    type=click.Choice([topology.value for topology in Topology]),
+    default=Topology.DEAD.value,
+    help=config.CLI.Docs.topology,
+)
+@click.option(*config.CLI.Param.Batch.seed, type=int, default=None, help=config.CLI.Docs.Batch.seed)
+@click.option(
+    *config.CLI.Param.Batch.generations,
+    type=click.IntRange(min=1),
+    default=1000,
+    help=config.CLI.Docs.Batch.generations,
+)
+@click.option(
+    *config.CLI.Param.Batch.dump_every,
+    type=click.IntRange(min=0),
+    default=0,
+    help=config.CLI.Docs.Batch.dump_every,
+)
+@click.option(
+    *config.CLI.Param.Batch.dump_dir,
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path("dumps"),
+    help=config.CLI.Docs.Batch.dump_dir,
+)
+@click.option(
+    *config.CLI.Param.backend,
+    type=click.Choice([backend.value for backend in Backend]),
+    default=Backend.NUMBA.value,
+    help=config.CLI.Docs.backend,
+)
+@click.option(
+    *config.CLI.Param.threads,
+    type=click.IntRange(min=0),
+    default=config.GameSettings.threads,
+    help=config.CLI.Docs.threads,
+)
+@click.option(
+    *config.CLI.Param.workers,
+    type=click.IntRange(min=0),
+    default=config.GameSettings.workers,
+    help=config.CLI.Docs.workers,
+)
+@click.option(*config.CLI.Param.auto_freeze, is_flag=True, default=False, help=config.CLI.Docs.auto_freeze)
+@click.option(
+    *config.CLI.Param.pattern,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    callback=validate_pattern,
+    help=config.CLI.Docs.pattern,
+)
+@click.option(*config.CLI.Param.offset, type=(int, int), default=None, help=config.CLI.Docs.offset)
+@click.option(
+    *config.CLI.Param.snapshot,
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=config.WindowConfig.PathToFile.snapshot,
+    help=config.CLI.Docs.snapshot,
+)
+@click.option(
+    *config.CLI.Param.snapshot_every,
+    type=click.IntRange(min=0),
+    default=config.GameSettings.snapshot_every,
+    help=config.CLI.Docs.snapshot_every,
+)
+@click.option(
+    *config.CLI.Param.resume,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help=config.CLI.Docs.resume,
+)
+@click.option(
+    *config.CLI.Param.history,
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=config.CLI.Docs.history,
+)
+def batch(
+    logging: bool,
+    width: int,
+    height: int,
+    rule: str | None,
+    mode: str,
+    topology: str,
+    seed: int | None,
+    generations: int,
+    dump_every: int,
+    dump_dir: Path,
+    backend: str,
+    threads: int,
+    workers: int,
+    auto_freeze: bool,
+    pattern: Path | None,
+    offset: tuple[int, int] | None,
+    snapshot: Path,
+    snapshot_every: int,
+    resume: Path | None,
+    history: Path | None,
+) -> BatchResult:
+    """Steps the game of Life without a window and prints its speed."""
+    lg.init(log=logging)
+    check_topology(Backend(backend), Topology(topology))
+
+    if resume is not None:  # The field of the snapshot has its own size
+        try:
+            info = read_info(resume)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        width, height = info.width, info.height
+
+    engine = GameEngine(
+        size=Size(width=width, height=height),
+        backend=Backend(backend),
+        topology=Topology(topology),
+        threads=threads,
+        workers=workers,
+        seed=seed,
+        track_changes=False,
+        auto_freeze=auto_freeze,
+    )
+    engine.mode = Mode(mode)
+
+    try:
+        prepare(engine, rule=rule, pattern=pattern, offset=offset, resume=resume)
+        if history is not None:
+            engine.record_history(history)
+        recorder = engine.recorder
+        result = simulate(
+            engine,
+            generations=generations,
+            dump_every=dump_every,
+            dump_dir=dump_dir,
+            snapshot_every=snapshot_every,
+            snapshot=snapshot,
+        )
+    except (ValueError, RuntimeError) as exc:  # The pattern is broken, the backend does not support the rule or failed
+        raise click.ClickException(str(exc)) from exc
+    finally:
+        engine.stop_recording()
+
+    click.echo(f"field: {width}x{height}, rule: {engine.preset}, mode: {engine.mode.value}, backend: {backend}")
+    click.echo(f"generations: {result.generations}")
+    if resume is not None:
+        click.echo(f"resumed from {resume}, last generation: {engine.generation}")
+    click.echo(f"first generation: {result.first:.3f} s (with compilation)")
+    click.echo(f"generations/sec: {result.rate:.2f}")
+    click.echo(f"final population: {result.population}")
+    if result.period is not None:
+        assert engine.cycles is not None
+        click.echo(f"period: {result.period} since generation {engine.cycles.start}")
+    if result.snapshots:
+        click.echo(f"snapshots: {result.snapshots} written to {snapshot}")
+    if result.dumps:
+        click.echo(f"dumps: {len(result.dumps)} in {dump_dir}")
+    if recorder is not None:
+        click.echo(f"history: {recorder.records} generations, {recorder.keyframes} keyframes, {recorder.size} bytes")
+    return result
+
+
+if __name__ == "__main__":
+    batch()
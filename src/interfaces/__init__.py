@@ -1,13 +1,15 @@
 from functools import partial
 from typing import cast
 
+import numpy as np
 import pygame as pg
 
 from src import config
 from src.bases import GUIBase
 from src.interfaces.elements import Button, GUIColors, Menu
-from src.misc.states import Mode
-from src.misc.type_aliases import Resolution, ResultToDrawing
+from src.interfaces.renderer import CellRenderer, build_palette, dirty_rects
+from src.misc.states import Mode, Phase, Renderer
+from src.misc.type_aliases import Resolution, ResultToDrawing, Size
 
 
 class GUI(GUIBase):
@@ -23,6 +25,12 @@ class GUI(GUIBase):
                     - hide menu
 
         hide_menu: The flag that determines whether the menu or the Internet is closed.
+        renderer: The way the cells are drawn, `Renderer.RECTS` is the old per-cell path.
+        field: States of the cells of the playing area, drawn by `cell_renderer`.
+        states: Number of states of a cell in the current rule.
+        cell_renderer: Draws the whole field at once for `Renderer.SURFARRAY`.
+        changes: Array (N, 2) of (x, y) pairs of the cells changed since the
+            last frame, None if they are unknown and the whole field is redrawn.
 
         __menu: Side-Menu object which include another buttons.
         __drawing_cells: Result to drawing cells on playing area.
@@ -32,9 +40,21 @@ class GUI(GUIBase):
     __menu: Menu
     __drawing_cells: ResultToDrawing
 
-    def __init__(self, screen: pg.SurfaceType, resolution: Resolution) -> None:
+    renderer: Renderer
+    field: np.ndarray | None
+    states: int
+    cell_renderer: CellRenderer
+    changes: np.ndarray | None
+
+    def __init__(
+        self,
+        screen: pg.SurfaceType,
+        resolution: Resolution,
+        renderer: Renderer = Renderer.SURFARRAY,
+    ) -> None:
         self.screen = screen
         self.resolution = resolution
+        self.renderer = renderer
 
         self.hide_menu = False
         self.__menu = Menu(
@@ -51,6 +71,22 @@ class GUI(GUIBase):
 
         self.__drawing_cells = []
 
+        self.field = None
+        self.states = 2
+        cell = config.GameSettings.Sizes.cell
+        self.cell_renderer = CellRenderer(
+            size=Size(width=self.resolution.width // cell, height=self.resolution.height // cell),
+            cell=cell,
+            palette=build_palette(config.GameSettings.GUIColors.cell, GUIColors.BG.rgb(), self.states),
+        )
+
+        # Parts of the screen to update: None is all of it, otherwise the repainted cells and the interface
+        self.changes = None
+        self._repaint = True
+        self._dirty: list[pg.Rect] | None = None
+        self._overlays: list[pg.Rect] = []
+        self._profile_font: pg.font.Font | None = None
+
     @property
     def drawing_cells(self) -> ResultToDrawing:
         """Property for `drawing_cells` attribute."""
@@ -60,6 +96,18 @@ class GUI(GUIBase):
     def drawing_cells(self, value: ResultToDrawing) -> None:
         self.__drawing_cells = value
 
+    def request_repaint(self) -> None:
+        """Makes the next frame redraw the whole screen, e.g. after the menu has been hidden."""
+        self._repaint = True
+
+    def _full_frame(self) -> bool:
+        """Whether the whole screen is drawn, otherwise only the cells of `changes` are repainted."""
+        if self._repaint or self.renderer is not Renderer.SURFARRAY or self.field is None or self.changes is None:
+            return True
+        if len(self.cell_renderer.palette) != self.states:
+            return True
+        return len(self.changes) > self.field.size * config.GameSettings.full_repaint_ratio
+
     def _init_buttons(self) -> None:
         """Initializes buttons."""
         self.buttons["hide_menu"] = Button(
@@ -95,18 +143,38 @@ class GUI(GUIBase):
         self.buttons["Neumann"].drawing_name("N")
 
     def draw_cells(self) -> None:
-        """Draws the cells in self.area on the monitor."""
+        """Draws the cells in self.area on the monitor.
+
+        With `Renderer.SURFARRAY` the whole `field` is drawn with one blit,
+        or, if only a few cells of it have changed, only those cells are
+        repainted and only their rectangles are blitted. Otherwise (or before
+        the first field) every cell of `drawing_cells` is drawn with its own
+        `pg.draw.rect`.
+        """
+        self._dirty = None
+        if self.renderer is Renderer.SURFARRAY and self.field is not None:
+            if not self._full_frame():
+                surface = self.cell_renderer.update(self.field, cast(np.ndarray, self.changes))
+                self._dirty = dirty_rects(
+                    cast(np.ndarray, self.changes),
+                    size=self.cell_renderer.size,
+                    cell=self.cell_renderer.cell,
+                    limit=config.GameSettings.dirty_rects,
+                )
+                for rect in self._dirty:
+                    self.screen.blit(surface, rect, rect)
+                return
+
+            if len(self.cell_renderer.palette) != self.states:
+                cell_color = config.GameSettings.GUIColors.cell
+                self.cell_renderer.palette = build_palette(cell_color, GUIColors.BG.rgb(), self.states)
+            self.screen.blit(self.cell_renderer.render(self.field), (0, 0))
+            return
+
+        color = config.GameSettings.GUIColors.cell.get_rgb()
+        size = config.GameSettings.Sizes.cell
         for x, y in self.drawing_cells:
-            pg.draw.rect(
-                surface=self.screen,
-                color=config.GameSettings.GUIColors.cell.get_rgb(),
-                rect=(
-                    x * config.GameSettings.Sizes.cell,
-                    y * config.GameSettings.Sizes.cell,
-                    config.GameSettings.Sizes.cell - 1,
-                    config.GameSettings.Sizes.cell - 1,
-                ),
-            )
+            pg.draw.rect(surface=self.screen, color=color, rect=(x * size, y * size, size - 1, size - 1))
 
     def draw_menu(self, mode: Mode) -> None:
         """Draws a menu containing buttons on the left.
@@ -126,6 +194,7 @@ class GUI(GUIBase):
             params = {"rect": self.__menu.rect, "border_radius": self.__menu.radius}
             self._draw_bg_rect_on_display(**params)
             self._draw_frame_rect_on_display(**params, width=2)
+            self._overlays.append(self.__menu.rect)
 
             font = pg.font.SysFont("arial", int(self.buttons["open_menu"].width / 2.8))
             img = font.render(f"Mode: {mode.name[0]}", True, GUIColors.WHITE.rgb())  # noqa: FBT003
@@ -161,6 +230,7 @@ class GUI(GUIBase):
             }
             self._draw_bg_rect_on_display(**params)
             self._draw_frame_rect_on_display(**params, width=2)
+            self._overlays.append(pg.Rect(self.buttons["open_menu"].coord).inflate(2, 2))
 
     def draw_buttons(self) -> None:
         """Renders all buttons located in `self.buttons` dictionary if `self.hide_menu` is False."""
@@ -170,6 +240,7 @@ class GUI(GUIBase):
 
                 self._draw_bg_rect_on_display(**params)
                 self._draw_frame_rect_on_display(**params, width=2)
+                self._overlays.append(pg.Rect(button.coord).inflate(2, 2))  # The coordinates are not integer
 
             font = pg.font.SysFont("arial", int(self.buttons["open_menu"].width))
 
@@ -185,12 +256,13 @@ class GUI(GUIBase):
                     ),
                 )
 
-    def draw_fps(self, frame_per_second: int) -> None:
+    def draw_fps(self, frame_per_second: int, turbo: int = 1) -> None:
         """Draws FPS on the screen in the upper right corner of the game.
 
         Args:
             frame_per_second: Just a number that will be displayed as fps
                 on the screen.
+            turbo: Generations per frame, shown after the fps if there are several.
 
         Returns:
             None
@@ -199,25 +271,75 @@ class GUI(GUIBase):
         radius = int(self.resolution.width * 0.04)
         height = int(self.resolution.height * 0.08)
 
-        width_point = int(self.resolution.width * 0.94)
+        font = pg.font.SysFont("arial", int(height / 3))
+
+        # Draw red fps if it's too low
+        color = GUIColors.RED.rgb() if frame_per_second <= config.GameSettings.low_fps else GUIColors.GREEN.rgb()
+
+        text = f"fps {frame_per_second}" if turbo == 1 else f"fps {frame_per_second} x{turbo}"
+        img = font.render(text, True, color)  # noqa: FBT003
+
+        # The box fits the longest label, so it is not cut by the edge of the window. Its place does not depend on the
+        # digits, a narrower box would leave the edge of the previous one, which is not repainted between full frames
+        widest = font.size(f"fps {config.GameSettings.fps} x{config.GameSettings.turbo_max}")[0]
+        margin = int(self.resolution.width * 0.008)
+        text_point = min(int(self.resolution.width * 0.952), self.resolution.width - widest - margin)
+        width_point = text_point - int(self.resolution.width * 0.012)
         height_point = -int(height / 2)
 
         params = {"rect": (width_point, height_point, 1000, height), "border_radius": radius}
         self._draw_bg_rect_on_display(**params)
         self._draw_frame_rect_on_display(**params, width=2)
+        self._overlays.append(pg.Rect(width_point, height_point, 1000, height))
 
-        font = pg.font.SysFont("arial", int(height / 3))
+        self.screen.blit(img, (text_point, self.resolution.height * 0.004))
 
-        # Draw red fps if it's too low
-        color = GUIColors.RED.rgb() if frame_per_second <= config.GameSettings.low_fps else GUIColors.GREEN.rgb()
+    def draw_profile(self, times: dict[Phase, list[float]]) -> None:
+        """Draws the times of the phases of a frame in the lower left corner of the game.
 
-        img = font.render(f"fps {frame_per_second}", True, color)  # noqa: FBT003
-        self.screen.blit(img, (self.resolution.width * 0.952, self.resolution.height * 0.004))
+        Args:
+            times: Seconds of the median (p50) and the 99th percentile (p99)
+                of every phase over the last frames.
+
+        Returns:
+            None
+
+        """
+        if self._profile_font is None:
+            self._profile_font = pg.font.SysFont("monospace", max(int(self.resolution.height * 0.018), 10))
+        font = self._profile_font
+
+        total = [sum(phase[index] for phase in times.values()) for index in range(2)]
+        lines = [f"{'ms':<13}{'p50':>7}{'p99':>7}"]
+        lines += [f"{phase.value:<13}{p50 * 1000:>7.2f}{p99 * 1000:>7.2f}" for phase, (p50, p99) in times.items()]
+        lines.append(f"{'frame':<13}{total[0] * 1000:>7.2f}{total[1] * 1000:>7.2f}")
+
+        margin = font.get_linesize() // 2
+        width = font.size(lines[0])[0] + margin * 2
+        height = font.get_linesize() * len(lines) + margin * 2
+        rect = pg.Rect(margin, self.resolution.height - height - margin, width, height)
+        self._draw_bg_rect_on_display(rect=rect, border_radius=margin)
+        self._draw_frame_rect_on_display(rect=rect, border_radius=margin, width=2)
+        self._overlays.append(rect)
+
+        # The frame is red when the slow frames do not fit into the frame rate
+        budget = 1 / config.GameSettings.fps if config.GameSettings.fps else float("inf")
+        for number, line in enumerate(lines):
+            color = GUIColors.RED.rgb() if number == len(lines) - 1 and total[1] > budget else GUIColors.GREEN.rgb()
+            img = font.render(line, True, color)  # noqa: FBT003
+            self.screen.blit(img, (rect.left + margin, rect.top + margin + font.get_linesize() * number))
 
     def fill_bg(self) -> None:
-        """Fill screen background color."""
-        self.screen.fill(GUIColors.BG.rgb())
+        """Fill screen background color, unless only the changed cells are repainted."""
+        if self._full_frame():
+            self.screen.fill(GUIColors.BG.rgb())
 
     def update_display(self) -> None:
-        """Update screen."""
-        pg.display.update()
+        """Update screen, only the repainted cells and the interface if the whole field was not drawn."""
+        if self._dirty is None:
+            pg.display.update()
+        else:
+            screen = self.screen.get_rect()
+            pg.display.update([*self._dirty, *(rect.clip(screen) for rect in self._overlays)])
+        self._overlays.clear()
+        self._repaint = False
@@ -0,0 +1,149 @@
+import numpy as np
+import pygame as pg
+
+from src.misc.type_aliases import ColorType, Size
+
+DIRTY_TILE = 16  # Width and height (in cells) of the squares the dirty rectangles are made of
+
+
+def build_palette(cell: ColorType, background: ColorType, states: int = 2) -> np.ndarray:
+    """Colors of the states of a cell: background for the dead, `cell` for the living.
+
+    The dying states of the Generations rules fade from `cell` to the background.
+
+    Returns:
+        Matrix (uint8) states x 3 with RGB colors.
+    """
+    alive = np.array(cell if isinstance(cell, tuple) else cell.get_rgb(), dtype=np.float64)
+    dead = np.array(background if isinstance(background, tuple) else background.get_rgb(), dtype=np.float64)
+
+    palette = np.empty((states, 3), dtype=np.uint8)
+    palette[0] = dead
+    for state in range(1, states):
+        fade = (state - 1) / (states - 1)
+        palette[state] = np.round(alive + (dead - alive) * fade)
+    return palette
+
+
+class CellRenderer:
+    """Draws the whole field at once: the states are turned into pixels by one vectorized operation.
+
+    Every cell takes `cell` x `cell` pixels, the last row and column of them
+    are the 1-px grid gap of the background color, as with `pg.draw.rect`.
+    The surface is 8-bit with the palette of the states, so the pixels are
+    the states themselves; they are kept in a preallocated buffer and copied
+    to `surface` with `pygame.surfarray.blit_array`. The surface persists
+    between the frames, `update` repaints only the changed cells on it.
+
+    Attributes:
+        size: Size of the field in cells.
+        cell: Size of a cell in pixels.
+        surface: The surface with the drawn field.
+
+    """
+
+    size: Size
+    cell: int
+    surface: pg.Surface
+
+    def __init__(self, size: Size, cell: int, palette: np.ndarray) -> None:
+        self.size = size
+        self.cell = cell
+        self.surface = pg.Surface((size.width * cell, size.height * cell), depth=8)
+        self.palette = palette
+
+        # Pixels in the order of `surfarray` (x, y), split into (column, x in cell, row, y in cell)
+        self._pixels = np.zeros((size.width * cell, size.height * cell), dtype=np.uint8)
+        self._cells = self._pixels.reshape(size.width, cell, size.height, cell)
+
+    @property
+    def palette(self) -> np.ndarray:
+        """Colors of the states (see `build_palette`)."""
+        return self._palette
+
+    @palette.setter
+    def palette(self, value: np.ndarray) -> None:
+        self._palette = value
+        self.surface.set_palette([tuple(color) for color in value.tolist()])
+
+    def render(self, field: np.ndarray) -> pg.Surface:
+        """Draws the states of the cells of the field.
+
+        Args:
+            field: Matrix (height x width) with the states of the cells.
+
+        Returns:
+            `surface` with the drawn field.
+        """
+        self._cells[:] = field[: self.size.height, : self.size.width].T[:, None, :, None]
+        if self.cell > 1:
+            self._cells[:, -1] = 0
+            self._cells[:, :, :, -1] = 0
+
+        pg.surfarray.blit_array(self.surface, self._pixels)
+        return self.surface
+
+    def update(self, field: np.ndarray, cells: np.ndarray) -> pg.Surface:
+        """Repaints only the given cells on `surface`, the other pixels are left as they are.
+
+        Args:
+            field: Matrix (height x width) with the states of the cells.
+            cells: Array (N, 2) of (x, y) pairs of the cells to repaint.
+
+        Returns:
+            `surface` with the repainted cells.
+        """
+        xs, ys = cells[:, 0], cells[:, 1]
+        offsets = np.arange(max(self.cell - 1, 1))
+        columns = (xs * self.cell)[:, None, None] + offsets[None, :, None]
+        rows = (ys * self.cell)[:, None, None] + offsets[None, None, :]
+
+        pixels = pg.surfarray.pixels2d(self.surface)  # Locks the surface until it is deleted
+        pixels[columns, rows] = field[ys, xs][:, None, None]
+        del pixels
+        return self.surface
+
+
+def dirty_rects(cells: np.ndarray, size: Size, cell: int, limit: int, tile: int = DIRTY_TILE) -> list[pg.Rect]:
+    """Merges the changed cells into at most `limit` rectangles for `pygame.display.update`.
+
+    The cells are gathered into `tile` x `tile` squares and the neighboring
+    squares of a row are joined. If there are still too many rectangles, every
+    row of squares becomes one rectangle, and then all of them one bounding box.
+
+    Args:
+        cells: Array (N, 2) of (x, y) pairs of the changed cells.
+        size: Size of the field in cells.
+        cell: Size of a cell in pixels.
+        limit: The maximum number of the rectangles.
+        tile: Width and height (in cells) of the squares.
+
+    Returns:
+        Rectangles in pixels covering all the changed cells.
+    """
+    if not len(cells):
+        return []
+
+    columns = -(-size.width // tile)
+    keys = np.unique(cells[:, 1] // tile * columns + cells[:, 0] // tile)
+    rows = keys // columns
+
+    # Runs of neighboring squares in a row
+    starts = np.flatnonzero((np.diff(keys, prepend=-2) != 1) | (np.diff(rows, prepend=-1) != 0))
+    if len(starts) > limit:
+        starts = np.flatnonzero(np.diff(rows, prepend=-1))
+    ends = np.append(starts[1:], len(keys)) - 1
+
+    runs = np.stack((rows[starts], keys[starts] % columns, keys[ends] % columns + 1), axis=1)
+    if len(runs) > limit:
+        runs = np.array([[runs[:, 0].min(), runs[:, 1].min(), runs[:, 2].max()]])
+        heights = [rows[-1] - rows[0] + 1]
+    else:
+        heights = [1] * len(runs)
+
+    bounds = pg.Rect(0, 0, size.width * cell, size.height * cell)
+    step = tile * cell
+    return [
+        pg.Rect(left * step, row * step, (right - left) * step, height * step).clip(bounds)
+        for (row, left, right), height in zip(runs.tolist(), heights, strict=True)
+    ]
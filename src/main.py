@@ -1,15 +1,26 @@
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
 import pygame as pg
 from loguru import logger
 from pydantic import PositiveInt
 from pygame.event import EventType
 
+import src.misc.logs as lg
 from src import config
-from src.bases import AppBase
+from src.bases import AppBase, GameEngineBase
 from src.engines import GameEngine
+from src.engines.patterns import read_pattern
+from src.engines.snapshots import SnapshotWriter, capture
+from src.engines.threaded import Generation, Simulation
+from src.engines.warmup import WarmUp
 from src.interfaces import GUI
 from src.misc.handlers import handle_event_for_key_event, handle_event_for_mouse_event
-from src.misc.states import ARGV
-from src.misc.type_aliases import Resolution
+from src.misc.profiler import FrameProfiler
+from src.misc.states import ARGV, Phase
+from src.misc.type_aliases import Resolution, Size
 from src.misc.utils import exit_from_app_with_code
 
 
@@ -26,21 +37,133 @@ class App(AppBase):
 
         engine: The game engine.
         gui: The GUI of all game.
+        warm_up: Compilation of the kernels in the background, the generations
+            start when it is done, the initial field is drawn meanwhile.
+        profiler: Times of the phases of the last frames.
+        show_profile: A flag that determines whether to show the times of the phases.
+        profile_export: File the times of the phases are saved to on exit, None - nowhere.
+        simulation: The thread which calculates the generations, None if they
+            are calculated by the render loop itself.
+        shown: The last generation taken from the simulation thread, None without it.
+        snapshots: Writes the snapshots in the background.
+        snapshot_path: File of the snapshots.
+        snapshot_every: Generations between the automatic snapshots, 0 - only by F5.
 
     """
 
     show_fps: PositiveInt
+    engine: GameEngine
+    gui: GUI
+    warm_up: WarmUp | None
+    profiler: FrameProfiler
+    show_profile: bool
+    profile_export: Path | None
+    simulation: Simulation | None
+    shown: Generation | None
+    snapshots: SnapshotWriter
+    snapshot_path: Path
+    snapshot_every: int
 
-    def __init__(self, resolution: Resolution) -> None:
+    def __init__(self, resolution: Resolution, argv: ARGV) -> None:
         super().__init__(res=resolution, pause=False)
 
-        self.gui = GUI(self.screen, self.resolution)
-        self.engine = GameEngine(app=self)
+        self.gui = GUI(self.screen, self.resolution, renderer=argv.renderer)
+        cell = config.GameSettings.Sizes.cell
+        self.engine = GameEngine(
+            size=Size(width=self.resolution.width // cell, height=self.resolution.height // cell),
+            backend=argv.backend,
+            topology=argv.topology,
+            threads=argv.threads,
+            workers=argv.workers,
+            detect_cycles=True,  # The period is logged, the hash is updated by the changes the window draws anyway
+            auto_freeze=argv.auto_freeze,
+        )
+        if argv.pattern is not None:
+            self._load_pattern(argv.pattern, argv.offset)
+        self.gui.field = self.engine.field
+        self.warm_up = WarmUp(argv.backend) if argv.warm_up else None
+        self.profiler = FrameProfiler(capacity=config.GameSettings.profiler_frames)
+        self.snapshots = SnapshotWriter(level=config.GameSettings.snapshot_level)
+        self.snapshot_path = argv.snapshot or config.WindowConfig.PathToFile.snapshot
+        self.snapshot_every = argv.snapshot_every
+        self._next_snapshot = 0
+        self.shown = None
+        self.simulation = None
+        if argv.threaded:
+            self.simulation = Simulation(
+                self.engine,
+                paused=lambda: self.pause,
+                rate=config.GameSettings.fps,
+                queue_size=config.GameSettings.frame_queue,
+            )
 
     def init(self, argv: ARGV) -> None:
         """Post initialization of class attributes from command line values."""
         self.show_fps = argv.show_fps
+        self.show_profile = argv.profile
+        self.profile_export = argv.profile_export
         self.engine.mode = argv.mode
+        self.engine.turbo = argv.turbo
+        if argv.resume is not None:
+            self._resume(argv.resume)
+        self._next_snapshot = self.engine.generation + self.snapshot_every
+        if argv.history is not None:
+            self._record(argv.history)
+
+    def _record(self, path: Path) -> None:
+        """Records the generations to the history log, the game goes on without it if it cannot be created."""
+        try:
+            self.engine.record_history(path)
+        except (OSError, ValueError):
+            logger.exception(f"the history is not recorded to {path}")
+        else:
+            logger.info(f"the history is recorded to {path} from the generation {self.engine.generation}")
+
+    def _resume(self, path: Path) -> None:
+        """Continues the game from the snapshot, the field stays if it cannot be loaded."""
+        try:
+            info = self.engine.load_snapshot(path)
+        except (OSError, ValueError):
+            logger.exception(f"the snapshot {path} is not loaded")
+        else:
+            logger.info(f"resumed from {path} at the generation {info.generation}")
+            self.gui.field = self.engine.field
+
+    def save_snapshot(self) -> None:
+        """Saves the shown generation to `snapshot_path`, it is compressed and written in the background."""
+        if self.simulation is None:
+            info, field = self.engine.snapshot_info(), self.engine.field
+        elif self.shown is not None:
+            # The thread changes the engine meanwhile, the shown generation has a copy of its own with its info
+            info, field = self.shown.info, self.shown.field
+        else:
+            return
+        self.snapshots.save(self.snapshot_path, capture(field, info))
+
+    def change_engine(self, change: Callable[[GameEngineBase], object]) -> None:
+        """Changes the engine between generations: the simulation thread applies it itself, without it at once."""
+        if self.simulation is None:
+            change(self.engine)
+        else:
+            self.simulation.submit(change)
+
+    def _autosave(self, generation: int) -> None:
+        """Saves a snapshot every `snapshot_every` generations, the turbo mode may step over the exact ones."""
+        if self.snapshot_every and generation >= self._next_snapshot:
+            self.save_snapshot()
+            self._next_snapshot = generation + self.snapshot_every
+
+    def _load_pattern(self, path: Path, offset: tuple[int, int] | None) -> None:
+        """Starts the game from the pattern file with its rule, the random field stays if it cannot be loaded."""
+        try:
+            pattern = read_pattern(path)
+            if pattern.rule is not None:
+                self.engine.preset = pattern.rule
+            self.engine.load_pattern(pattern, offset)
+        except (OSError, ValueError):
+            logger.exception(f"the pattern {path} is not loaded")
+        else:
+            logger.info(f"the pattern {path} ({pattern.width}x{pattern.height}) is loaded")
 
     def _match_type(self, event: EventType) -> None:
         """Compares events and, depending on its type, determines further actions.
@@ -71,26 +194,65 @@ class App(AppBase):
             None
         """
         for event in pg.event.get():
+            if event.type != pg.MOUSEMOTION:
+                # The event may change the interface or the field, the cheap partial update does not know it
+                self.gui.request_repaint()
             self._match_type(event)
 
     def _draw(self) -> None:
         """Draws a picture on the display."""
         self.gui.fill_bg()
         self.gui.draw_cells()
+        self.profiler.lap(Phase.DRAW_CELLS)
+
         self.gui.draw_menu(mode=self.engine.mode)
         self.gui.draw_buttons()
 
         if self.show_fps:
             current_fps = int(self.clock.get_fps())
-            self.gui.draw_fps(frame_per_second=current_fps)
+            self.gui.draw_fps(frame_per_second=current_fps, turbo=self.engine.turbo)
+        if self.show_profile:
+            self.gui.draw_profile(self.profiler.percentiles(50, 99))
+        self.profiler.lap(Phase.DRAW_UI)
 
         self.gui.update_display()
-        self.clock.tick(config.GameSettings.fps if not self.pause else config.GameSettings.chill_fps)
+        self.profiler.lap(Phase.DISPLAY_FLIP)
+        # Fewer frames while the kernels are compiled, the compilation needs the GIL too
+        idle = self.pause or self.warm_up is not None
+        self.clock.tick(config.GameSettings.fps if not idle else config.GameSettings.chill_fps)
 
     def _process(self) -> None:
         """Calculates necessary before trapping events."""
-        if not self.pause:
+        if self.warm_up is not None:
+            if not self.warm_up.done:
+                return
+            self.warm_up = None
+
+        if self.simulation is not None:
+            self._take_generation(self.simulation)
+        elif not self.pause:
             self.gui.drawing_cells = self.engine.process()
+            self.gui.field = self.engine.field
+            self.gui.states = self.engine.rule.states
+            self.gui.changes = np.concatenate((self.engine.births, self.engine.deaths))
+            self._autosave(self.engine.generation)
+        else:
+            self.gui.changes = self.engine.births[:0]
+
+    def _take_generation(self, simulation: Simulation) -> None:
+        """Shows the newest generation of the simulation thread, it is started by the first call."""
+        simulation.start()
+        generation = simulation.take()
+        if generation is None:
+            self.gui.changes = self.engine.births[:0]
+            return
+
+        self.gui.drawing_cells = generation.cells
+        self.gui.field = generation.field
+        self.gui.states = generation.states
+        self.gui.changes = generation.changes
+        self.shown = generation
+        self._autosave(generation.number)
 
     def _loop(self) -> None:
         """Endless* game loop.
@@ -105,8 +267,22 @@ class App(AppBase):
         """
         while True:
             self._handle_events()
+            self.profiler.begin()
             self._process()
+            self.profiler.lap(Phase.SIMULATE)
             self._draw()
+            self.profiler.end()
+
+    def _export_profile(self) -> None:
+        """Saves the times of the phases of the last frames to `profile_export`, if it is set."""
+        if self.profile_export is None:
+            return
+        try:
+            self.profiler.export(self.profile_export)
+        except OSError:
+            logger.exception(f"the times of the frames are not saved to {self.profile_export}")
+        else:
+            logger.info(f"the times of {min(self.profiler.frames, self.profiler.capacity)} frames are saved")
 
     def _run(self) -> None:
         """Gameplay handler and exception maintenance."""
@@ -115,6 +291,13 @@ class App(AppBase):
         except KeyboardInterrupt:
             logger.debug("A KeyboardInterrupt exception was caught")
             exit_from_app_with_code(0)
+        finally:
+            # `exit_from_app_with_code` leaves the loop with SystemExit
+            if self.simulation is not None:
+                self.simulation.stop(timeout=1)
+            self.engine.stop_recording()
+            self._export_profile()
+            self.snapshots.flush(timeout=10)
 
     def start(self) -> None:
         """Alias `run` for start a game."""
@@ -124,6 +307,37 @@ class App(AppBase):
 @logger.catch()
 def _init(argv: ARGV) -> App:
     """The main init function of GameOfLive."""
-    game = App(resolution=config.WindowConfig.resolution)
+    game = App(resolution=config.WindowConfig.resolution, argv=argv)
     game.init(argv)
     return game
+
+
+def resource_path(relative_path: Path) -> Path:
+    """Function for working paths inside an exe for python."""
+    base_path = Path(getattr(sys, "_MEIPASS", ".")).absolute()
+    return base_path.joinpath(relative_path)
+
+
+def launch(argv: ARGV) -> App:
+    """Opens the window and creates the game."""
+    pg.init()
+    lg.init(log=argv.logging)
+
+    logger.debug(argv)
+
+    icon_path = config.WindowConfig.PathToFile.icon
+    pg.display.set_caption(config.WindowConfig.caption)
+
+    try:
+        icon = pg.image.load(resource_path(icon_path))
+    except FileNotFoundError:
+        logger.error(f"{resource_path(icon_path)} is not found.")
+    else:
+        pg.display.set_icon(icon)
+
+    return _init(argv)
+
+
+def start(argv: ARGV) -> None:
+    """Opens the window and runs the game."""
+    launch(argv).start()
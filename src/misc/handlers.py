@@ -1,12 +1,32 @@
+from collections.abc import Callable
+from functools import partial
+
 import pygame as pg
 from loguru import logger
 from pygame.event import EventType
 
-from src.bases import AppBase
+from src import config
+from src.bases import AppBase, GameEngineBase
 from src.misc.states import Mode, Rules, StateInit
 from src.misc.utils import exit_from_app_with_code
 
 
+def _assign(**values: object) -> Callable[[GameEngineBase], None]:
+    """The change of the engine which sets its attributes, for `AppBase.change_engine`."""
+
+    def change(engine: GameEngineBase) -> None:
+        for name, value in values.items():
+            setattr(engine, name, value)
+
+    return change
+
+
+def _scale_turbo(engine: GameEngineBase, factor: float) -> None:
+    """Multiplies the generations per frame of the turbo mode, from 1 to `turbo_max`."""
+    engine.turbo = min(max(int(engine.turbo * factor), 1), config.GameSettings.turbo_max)
+    logger.info(f"{engine.turbo} generations per frame")
+
+
 def handle_event_for_key_event(event: EventType, app: AppBase) -> None:
     """Catches events from the keyboard.
 
@@ -29,23 +49,50 @@ def handle_event_for_key_event(event: EventType, app: AppBase) -> None:
         case pg.K_0:
             if pg.key.get_mods() & pg.KMOD_SHIFT:
                 logger.info("SHIFT+0 was pressed")
-                app.engine.init_area(state=StateInit.RANDOM)
+                app.change_engine(lambda engine: engine.init_area(state=StateInit.RANDOM))
             else:
                 logger.info("Button 0 was pressed")
-                app.engine.preset = Rules.b3_s23
+                app.change_engine(_assign(preset=Rules.b3_s23))
         case pg.K_1:
             if pg.key.get_mods() & pg.KMOD_SHIFT:
                 logger.info("SHIFT+1 was pressed")
-                app.engine.init_area(state=StateInit.DOT)
+                app.change_engine(lambda engine: engine.init_area(state=StateInit.DOT))
             else:
                 logger.info("Button 1 was pressed")
-                app.engine.preset = Rules.b1_s012345678
+                app.change_engine(_assign(preset=Rules.b1_s012345678))
         case pg.K_2:
             if pg.key.get_mods() & pg.KMOD_SHIFT:
                 logger.info("SHIFT+2 was pressed")
             else:
                 logger.info("Button 2 was pressed")
-                app.engine.preset = Rules.b5678_s45678
+                app.change_engine(_assign(preset=Rules.b5678_s45678))
+        case _:
+            handle_view_key(key, app)
+
+
+def handle_view_key(key: int, app: AppBase) -> None:
+    """Catches the keys which change how the game is shown and saved: the turbo mode, the profiler and snapshots.
+
+    Args:
+        key: The pressed key.
+        app: The game in which the event occurred.
+
+    Returns:
+        None
+    """
+    match key:
+        case pg.K_EQUALS | pg.K_PLUS | pg.K_KP_PLUS:
+            logger.info("+ was pressed")
+            app.change_engine(partial(_scale_turbo, factor=2))
+        case pg.K_MINUS | pg.K_KP_MINUS:
+            logger.info("- was pressed")
+            app.change_engine(partial(_scale_turbo, factor=0.5))
+        case pg.K_F3:
+            logger.info("F3 was pressed")
+            app.show_profile = not app.show_profile
+        case pg.K_F5:
+            logger.info("F5 was pressed")
+            app.save_snapshot()
 
 
 def handle_event_for_mouse_event(event: EventType, app: AppBase) -> None:
@@ -79,7 +126,7 @@ def handle_event_for_mouse_event(event: EventType, app: AppBase) -> None:
         if not app.gui.hide_menu:
             if app.gui.buttons["Neumann"].collidepoint(*position):
                 logger.info("Click on von Neumann neighborhood")
-                app.engine.mode = Mode.NEUMANN
+                app.change_engine(_assign(mode=Mode.NEUMANN))
             elif app.gui.buttons["Moore"].collidepoint(*position):
-                app.engine.mode = Mode.MOORE
+                app.change_engine(_assign(mode=Mode.MOORE))
                 logger.info("Click on Moore neighborhood")
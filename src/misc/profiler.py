@@ -0,0 +1,81 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.misc.states import PROFILE_FORMATS, Phase
+
+
+class FrameProfiler:
+    """Times the phases of every frame into a ring buffer of the last `capacity` frames.
+
+    The phases of a frame follow each other: `begin` starts the frame, every
+    `lap` records the time since the previous mark as the given phase, and
+    `end` moves to the next row of the ring. Phases that were not lapped in a
+    frame take 0 seconds.
+
+    Attributes:
+        capacity: Number of the frames kept.
+        frames: Number of the frames recorded since the start.
+
+    """
+
+    capacity: int
+    frames: int
+
+    def __init__(self, capacity: int = 600) -> None:
+        self.capacity = capacity
+        self.frames = 0
+        self._times = np.zeros((capacity, len(Phase)), dtype=np.float64)
+        self._columns = {phase: column for column, phase in enumerate(Phase)}
+        self._mark = time.perf_counter()
+
+    def begin(self) -> None:
+        """Starts a frame, its row of the ring is cleared."""
+        self._times[self.frames % self.capacity] = 0.0
+        self._mark = time.perf_counter()
+
+    def lap(self, phase: Phase) -> None:
+        """Adds the time since the previous mark to the phase of the current frame."""
+        now = time.perf_counter()
+        self._times[self.frames % self.capacity, self._columns[phase]] += now - self._mark
+        self._mark = now
+
+    def end(self) -> None:
+        """Finishes the current frame."""
+        self.frames += 1
+
+    def history(self) -> np.ndarray:
+        """Seconds of the phases (columns in the order of `Phase`) of the kept frames, from the oldest one."""
+        if self.frames <= self.capacity:
+            return self._times[: self.frames].copy()
+        return np.roll(self._times, -(self.frames % self.capacity), axis=0)
+
+    def percentiles(self, *quantiles: float) -> dict[Phase, list[float]]:
+        """Percentiles (0..100) of the seconds of every phase over the kept frames, zeros if there are none."""
+        history = self.history()
+        if not len(history):
+            return {phase: [0.0] * len(quantiles) for phase in Phase}
+        values = np.percentile(history, quantiles, axis=0)
+        return {phase: values[:, column].tolist() for phase, column in self._columns.items()}
+
+    def export(self, path: Path) -> None:
+        """Writes the kept frames as CSV or JSON Lines (by the suffix of the path), the times are in seconds.
+
+        Raises:
+            ValueError: If the suffix of the path is not one of `PROFILE_FORMATS`.
+        """
+        first = max(self.frames - self.capacity, 0)
+        header = ["frame", *(phase.value for phase in Phase)]
+        rows = [[first + index, *times] for index, times in enumerate(self.history().tolist())]
+
+        match path.suffix:
+            case ".csv":
+                lines = [",".join(header)] + [",".join(map(str, row)) for row in rows]
+            case ".jsonl":
+                lines = [json.dumps(dict(zip(header, row, strict=True))) for row in rows]
+            case _:
+                msg = f"unknown format of {path.name}, expected one of {', '.join(PROFILE_FORMATS)}"
+                raise ValueError(msg)
+        path.write_text("".join(f"{line}\n" for line in lines), encoding="UTF-8")
@@ -1,4 +1,5 @@
 from enum import Enum
+from pathlib import Path
 from typing import Literal, cast
 
 from pydantic import BaseModel
@@ -16,12 +17,95 @@ class Mode(Enum):
         return cast(Literal["Moore", "Neumann"], result)
 
 
+class Topology(Enum):
+    """How the edges of the playing field are joined."""
+
+    DEAD = "dead"  # The cells beyond the edges are always dead
+    TORUS = "torus"  # The opposite edges are joined
+    KLEIN = "klein"  # The left and right edges are joined, the top and bottom ones mirrored (a Klein bottle)
+
+
+class Backend(Enum):
+    """Algorithm that calculates the next state of the playing field."""
+
+    NUMBA = "numba"  # Per-cell compiled loop over preallocated buffers (`DoubleBuffer`)
+    NUMPY = "numpy"  # Whole-array operations (`check_cells_vectorized`)
+    BITPACKED = "bitpacked"  # 64 cells per uint64 word and bitwise adders (`check_cells_bitpacked`)
+    PARALLEL = "parallel"  # Per-cell compiled loop over row bands on all threads (`check_cells_parallel`)
+    MULTIPROCESS = "multiprocess"  # Stripes of rows in worker processes with shared memory (`StripePool`)
+    HASHLIFE = "hashlife"  # Memoized quadtree on an unbounded plane, B0 rules are not supported (`HashLife`)
+    SPARSE = "sparse"  # Only the cells around the changes while the field is sparse (`SparseEngine`)
+    TILED = "tiled"  # `check_cells` only for the tiles around the changed ones (`TileMap`)
+    CHUNKED = "chunked"  # Chunks of an unbounded plane allocated around the pattern (`ChunkWorld`)
+
+
+class Renderer(Enum):
+    """The way the cells are drawn on the screen."""
+
+    SURFARRAY = "surfarray"  # The whole field at once through a pixel buffer (`CellRenderer`)
+    RECTS = "rects"  # One `pg.draw.rect` per living cell
+
+
+PROFILE_FORMATS = (".csv", ".jsonl")  # Suffixes of the files `FrameProfiler.export` writes
+
+
+class PatternFormat(Enum):
+    """Format of a pattern file (`read_pattern`)."""
+
+    RLE = "rle"  # Runs of the states row by row, like `bo$2bo$3o!`
+    LIFE_106 = "life-1.06"  # A line with `x y` of every living cell
+    PLAINTEXT = "plaintext"  # Rows of `.` (dead) and `O` (alive)
+    MACROCELL = "macrocell"  # Quadtree of the cells with shared nodes, written by Golly
+
+
+PATTERN_SUFFIXES = {  # Suffixes of the pattern files and their formats
+    ".rle": PatternFormat.RLE,
+    ".lif": PatternFormat.LIFE_106,
+    ".life": PatternFormat.LIFE_106,
+    ".cells": PatternFormat.PLAINTEXT,
+    ".mc": PatternFormat.MACROCELL,
+}
+
+
+class ExportFormat(Enum):
+    """Format of the frames written by `export_frames`."""
+
+    PNG = "png"  # A folder with a PNG file per frame
+    GIF = "gif"  # One animated GIF file
+
+
+class Phase(Enum):
+    """A timed part of a frame of the game (`FrameProfiler`)."""
+
+    SIMULATE = "simulate"  # The next generation by the engine
+    DRAW_CELLS = "draw-cells"  # The background and the cells
+    DRAW_UI = "draw-ui"  # The menu, the buttons and the overlays
+    DISPLAY_FLIP = "display-flip"  # `pg.display.update`
+
+
 class ARGV(BaseModel):
     """Argument values typing model for CLI."""
 
     logging: bool
     show_fps: bool
     mode: Mode
+    topology: Topology = Topology.DEAD
+    backend: Backend = Backend.NUMBA
+    threads: int = 0
+    workers: int = 0
+    renderer: Renderer = Renderer.SURFARRAY
+    warm_up: bool = True
+    profile: bool = False
+    profile_export: Path | None = None
+    threaded: bool = False
+    turbo: int = 1
+    auto_freeze: bool = False
+    pattern: Path | None = None
+    offset: tuple[int, int] | None = None
+    snapshot: Path | None = None
+    snapshot_every: int = 0
+    resume: Path | None = None
+    history: Path | None = None
 
 
 class Rules(str, Enum):
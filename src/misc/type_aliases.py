@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from typing import TypeAlias
 
 import numpy as np
@@ -34,8 +35,9 @@ class Resolution(BaseModel):
         return self.width, self.height
 
 
-ResultToDrawing: TypeAlias = list[tuple[int, int]]
+ResultToDrawing: TypeAlias = list[tuple[int, int]] | np.ndarray  # (x, y) pairs, or an array (N, 2) of them
 CheckCells: TypeAlias = tuple[np.ndarray, ResultToDrawing]
+Kernel: TypeAlias = Callable[..., CheckCells]  # Has the same signature as `check_cells`
 
 NumberType: TypeAlias = int | float
 ColorType: TypeAlias = Color | tuple[int, int, int]
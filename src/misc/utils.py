@@ -3,7 +3,6 @@ from abc import ABCMeta
 from typing import Any, ClassVar, NoReturn
 
 import numpy as np
-import pygame as pg
 from pydantic import NonNegativeInt
 
 
@@ -28,6 +27,8 @@ def exit_from_app_with_code(code: int = 0) -> NoReturn:
         Nothing
 
     """
+    import pygame as pg  # noqa: PLC0415  # The engine uses this module without pygame
+
     pg.quit()
     sys.exit(code)
 
@@ -40,6 +41,27 @@ def get_empty_area(width: NonNegativeInt, height: NonNegativeInt) -> np.ndarray:
         height: A height a playing field.
 
     Returns:
-        The Matrix as a playing field.
+        The Matrix (uint8) as a playing field.
+    """
+    return np.zeros((height, width), dtype=np.uint8)
+
+
+def field_changes(previous: np.ndarray, field: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Finds the cells that were born and the cells that died between two generations.
+
+    A cell that leaves the living state (1) is counted as died, also when it
+    goes to a dying state of the Generations rules, as well as a dying cell
+    that changes its state.
+
+    Args:
+        previous: Matrix (height x width) with the states of the previous generation.
+        field: Matrix (height x width) with the states of the current generation.
+
+    Returns:
+        Arrays (N, 2) of (x, y) pairs of the born and the died cells.
     """
-    return np.array([[0 for _ in range(width)] for _ in range(height)])
+    changed = field != previous
+    alive = field == 1
+    births = np.argwhere(changed & alive)[:, ::-1]
+    deaths = np.argwhere(changed & ~alive)[:, ::-1]
+    return births, deaths
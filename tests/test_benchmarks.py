@@ -0,0 +1,108 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.engines import KERNEL, Case, close_engine, main, measure, new_engine
+from benchmarks.patterns import DIEHARD, GLIDER, GOSPER_GUN, LWSS, PATTERNS, PULSAR, parse_plaintext, place, soup
+from src.engines.core import check_cells
+from src.engines.rules import compile_rule
+from src.misc.states import Backend, Mode
+
+
+def run(field: np.ndarray, generations: int) -> np.ndarray:
+    height, width = field.shape
+    table = compile_rule("b3/s23").table
+    for _ in range(generations):
+        field, _ = check_cells(field, np.zeros_like(field), width, height, table, "Moore")
+    return field
+
+
+def test_parse_plaintext() -> None:
+    assert np.array_equal(parse_plaintext(GLIDER.cells), [[0, 1, 0], [0, 0, 1], [1, 1, 1]])
+    assert all(parse_plaintext(pattern.cells).any() for pattern in PATTERNS.values())
+
+
+def test_spaceships_move() -> None:
+    glider, lwss = place(GLIDER, 32, 32), place(LWSS, 32, 32)
+
+    assert np.array_equal(run(glider, 4), np.roll(glider, (1, 1), axis=(0, 1)))
+    assert np.array_equal(run(lwss, 4), np.roll(lwss, -2, axis=1))
+
+
+def test_pulsar_has_period_3() -> None:
+    pulsar = place(PULSAR, 32, 32)
+
+    assert not np.array_equal(run(pulsar, 1), pulsar)
+    assert np.array_equal(run(pulsar, 3), pulsar)
+
+
+def test_diehard_dies_at_130() -> None:
+    diehard = place(DIEHARD, 64, 64)
+
+    assert run(diehard, 129).any()
+    assert not run(diehard, 130).any()
+
+
+def test_gosper_gun_emits_gliders() -> None:
+    gun = place(GOSPER_GUN, 96, 96)
+
+    assert [np.count_nonzero(run(gun, generations)) for generations in (0, 30, 60)] == [36, 41, 46]
+
+
+def test_place_rejects_large_pattern() -> None:
+    with pytest.raises(ValueError, match="does not fit"):
+        place(GOSPER_GUN, 32, 32)
+
+
+def test_soup_density() -> None:
+    assert abs(soup(256, 256, density=0.25).mean() - 0.25) < 0.01
+
+
+@pytest.mark.parametrize("backend", [Backend.NUMBA, Backend.NUMPY, Backend.BITPACKED, Backend.SPARSE, Backend.TILED])
+def test_load_field_matches_check_cells(backend: Backend) -> None:
+    field = place(GOSPER_GUN, 64, 64)
+    engine = new_engine(Case(target=backend.value, size=64, start="gosper-gun", mode=Mode.MOORE, rule="b3/s23"), field)
+    try:
+        engine.process()
+        engine.load_field(field)
+        for _ in range(5):
+            engine.process()
+        assert engine.generation == 5
+        assert np.array_equal(engine.field, run(field, 5))
+    finally:
+        close_engine(engine)
+
+
+@pytest.mark.parametrize("target", [KERNEL, Backend.NUMBA.value])
+def test_measure_counts_cells(target: str) -> None:
+    case = Case(target=target, size=64, start="soup-0.5", mode=Mode.MOORE, rule="b3/s23")
+    measurement = measure(case, generations=3)
+
+    assert measurement.generations == 3
+    assert measurement.cells_per_second == pytest.approx(64 * 64 / measurement.seconds)
+    assert measurement.population == np.count_nonzero(run(soup(64, 64, density=0.5), 5))
+
+
+# noinspection PyTypeChecker
+def test_main_saves_and_compares(tmp_path: Path) -> None:
+    output = tmp_path / "results.json"
+    args = ["--size", "256", "--density", "0.1", "--pattern", "acorn", "--mode", "Moore", "--rule", "b3/s23"]
+    runner = CliRunner()
+    result = runner.invoke(main, [*args, "--generations", "2", "--output", str(output)])
+    assert result.exit_code == 0, result.output
+
+    results = json.loads(output.read_text())["results"]
+    assert sorted(results) == [
+        "check_cells/256/acorn/Moore/b3/s23",
+        "check_cells/256/soup-0.1/Moore/b3/s23",
+        "numba/256/acorn/Moore/b3/s23",
+        "numba/256/soup-0.1/Moore/b3/s23",
+    ]
+    assert all(result["cells_per_second"] > 0 for result in results.values())
+
+    result = runner.invoke(main, [*args, "--generations", "2", "--output", str(output), "--compare", str(output)])
+    assert result.exit_code == 0, result.output
+    assert "compared with" in result.output
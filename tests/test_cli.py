@@ -1,8 +1,10 @@
+from pathlib import Path
+
 from click.testing import CliRunner
 
 import src.cli as _cli
 from src import config
-from src.misc.states import ARGV, Mode
+from src.misc.states import ARGV, Backend, Mode, Renderer, Topology
 
 
 # noinspection PyTypeChecker
@@ -25,6 +27,11 @@ def test_cli_docs_help() -> None:
     assert config.CLI.Docs.hide_fps in result.output
     assert config.CLI.Docs.Mode.moore in result.output
     assert config.CLI.Docs.Mode.neumann in result.output
+    assert config.CLI.Docs.backend in result.output
+    assert config.CLI.Docs.threads in result.output
+    assert config.CLI.Docs.workers in result.output
+    assert config.CLI.Docs.renderer in result.output
+    assert config.CLI.Docs.topology in result.output
 
 
 # noinspection PyTypeChecker
@@ -162,3 +169,193 @@ def test_cli_return_log_show_fps_Moore() -> None:
 
     assert result.exit_code == 0
     assert result.return_value == ARGV(logging=True, show_fps=True, mode=Mode.MOORE)
+
+
+# noinspection PyTypeChecker
+def test_cli_return_backend_numpy() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["--backend", "numpy"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(logging=False, show_fps=True, mode=Mode.MOORE, backend=Backend.NUMPY)
+
+
+# noinspection PyTypeChecker
+def test_cli_return_backend_short() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-B", "numba", "-N"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(logging=False, show_fps=True, mode=Mode.NEUMANN, backend=Backend.NUMBA)
+
+
+# noinspection PyTypeChecker
+def test_cli_return_threads() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-B", "parallel", "--threads", "4"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(
+        logging=False,
+        show_fps=True,
+        mode=Mode.MOORE,
+        backend=Backend.PARALLEL,
+        threads=4,
+    )
+
+
+# noinspection PyTypeChecker
+def test_cli_return_workers() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-B", "multiprocess", "-W", "8"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(
+        logging=False,
+        show_fps=True,
+        mode=Mode.MOORE,
+        backend=Backend.MULTIPROCESS,
+        workers=8,
+    )
+
+
+# noinspection PyTypeChecker
+def test_cli_return_renderer_rects() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-R", "rects"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(logging=False, show_fps=True, mode=Mode.MOORE, renderer=Renderer.RECTS)
+
+
+# noinspection PyTypeChecker
+def test_cli_return_no_warm_up() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["--no-warm-up"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(logging=False, show_fps=True, mode=Mode.MOORE, warm_up=False)
+
+
+# noinspection PyTypeChecker
+def test_cli_return_profile() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-P", "-E", "frames.jsonl"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(
+        logging=False,
+        show_fps=True,
+        mode=Mode.MOORE,
+        profile=True,
+        profile_export=Path("frames.jsonl"),
+    )
+
+
+# noinspection PyTypeChecker
+def test_cli_rejects_profile_export_format() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["--profile-export", "frames.txt"])
+
+    assert result.exit_code == 2
+
+
+# noinspection PyTypeChecker
+def test_cli_return_threaded() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-D"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(logging=False, show_fps=True, mode=Mode.MOORE, threaded=True)
+
+
+# noinspection PyTypeChecker
+def test_cli_return_turbo() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-K", "16"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(logging=False, show_fps=True, mode=Mode.MOORE, turbo=16)
+
+
+# noinspection PyTypeChecker
+def test_cli_return_pattern(tmp_path: Path) -> None:
+    pattern = tmp_path / "glider.rle"
+    pattern.write_text("x = 3, y = 3\nbo$2bo$3o!\n")
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-I", str(pattern), "-A", "10", "20"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(logging=False, show_fps=True, mode=Mode.MOORE, pattern=pattern, offset=(10, 20))
+
+
+# noinspection PyTypeChecker
+def test_cli_rejects_unknown_pattern_format(tmp_path: Path) -> None:
+    pattern = tmp_path / "glider.txt"
+    pattern.write_text("bo$2bo$3o!\n")
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["--pattern", str(pattern)])
+
+    assert result.exit_code == 2
+    assert ".rle" in result.output
+
+
+# noinspection PyTypeChecker
+def test_cli_return_snapshots(tmp_path: Path) -> None:
+    snapshot = tmp_path / "game.snap"
+    snapshot.write_bytes(b"")
+    runner = CliRunner()
+    args = ["-V", str(snapshot), "-Z", "500", "-U", str(snapshot)]
+    result = runner.invoke(_cli.run, args, standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(
+        logging=False,
+        show_fps=True,
+        mode=Mode.MOORE,
+        snapshot=snapshot,
+        snapshot_every=500,
+        resume=snapshot,
+    )
+
+
+# noinspection PyTypeChecker
+def test_cli_rejects_missing_resume(tmp_path: Path) -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["--resume", str(tmp_path / "missing.snap")])
+
+    assert result.exit_code == 2
+
+
+# noinspection PyTypeChecker
+def test_cli_return_history(tmp_path: Path) -> None:
+    history = tmp_path / "run.hist"
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-H", str(history)], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(logging=False, show_fps=True, mode=Mode.MOORE, history=history)
+
+
+# noinspection PyTypeChecker
+def test_cli_return_topology() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["-J", "klein", "-B", "numpy"], standalone_mode=False)
+
+    assert result.exit_code == 0
+    assert result.return_value == ARGV(
+        logging=False,
+        show_fps=True,
+        mode=Mode.MOORE,
+        topology=Topology.KLEIN,
+        backend=Backend.NUMPY,
+    )
+
+
+# noinspection PyTypeChecker
+def test_cli_rejects_topology_of_dead_edges_backend() -> None:
+    runner = CliRunner()
+    result = runner.invoke(_cli.run, ["--topology", "torus", "--backend", "hashlife"])
+
+    assert result.exit_code == 2
+    assert "dead edges only" in result.output
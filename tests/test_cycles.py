@@ -0,0 +1,178 @@
+from typing import NoReturn
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.engines import close_engine
+from benchmarks.patterns import GLIDER, PULSAR, Pattern, place, soup
+from src.engines import GameEngine
+from src.engines.core import check_cells
+from src.engines.cycles import CycleDetector
+from src.engines.rules import compile_rule
+from src.headless import BatchResult, batch
+from src.misc.states import Backend, Mode
+from src.misc.type_aliases import Size
+from src.misc.utils import field_changes
+
+BLOCK = Pattern(name="block", kind="still life", cells="OO\nOO")
+BLINKER = Pattern(name="blinker", kind="oscillator", cells="OOO")
+
+
+def cycling_engine(field: np.ndarray, backend: Backend = Backend.NUMBA, auto_freeze: bool = False) -> GameEngine:
+    engine = GameEngine(
+        size=Size(width=field.shape[1], height=field.shape[0]),
+        backend=backend,
+        detect_cycles=True,
+        auto_freeze=auto_freeze,
+    )
+    engine.mode = Mode.MOORE
+    engine.load_field(field)
+    return engine
+
+
+def step(field: np.ndarray, rule: str = "b3/s23") -> np.ndarray:
+    height, width = field.shape
+    following, _ = check_cells(field, np.zeros_like(field), width, height, compile_rule(rule).table, "Moore")
+    return following
+
+
+def kernel_not_called(**_kwargs: object) -> NoReturn:
+    msg = "the frozen cycle is calculated"
+    raise AssertionError(msg)
+
+
+@pytest.mark.parametrize("rule", ["b3/s23", "B2/S/C3", "B2/S345/C4"])
+def test_hash_follows_changes(rule: str) -> None:
+    field = soup(40, 30, density=0.3, seed=5)
+    detector = CycleDetector(40, 30)
+    detector.reset(field, generation=0)
+
+    for _ in range(20):
+        following = step(field, rule)
+        births, deaths = field_changes(field, following)
+        detector.update(field, following, np.concatenate((births, deaths)))
+        field = following
+
+    fresh = CycleDetector(40, 30)
+    fresh.reset(field, generation=0)
+    assert detector.hash == fresh.hash
+
+
+@pytest.mark.parametrize(("pattern", "period"), [(BLOCK, 1), (BLINKER, 2), (PULSAR, 3)])
+def test_engine_reports_period(pattern: Pattern, period: int) -> None:
+    engine = cycling_engine(place(pattern, 32, 32))
+    try:
+        for _ in range(2 * period + 1):
+            engine.process()
+        assert engine.period == period
+        assert engine.cycles is not None
+        assert engine.cycles.start == 0
+        assert engine.cycles.confirmed
+        assert not engine.frozen
+    finally:
+        close_engine(engine)
+
+
+def test_moving_pattern_has_no_period() -> None:
+    engine = cycling_engine(place(GLIDER, 32, 32))
+    try:
+        for _ in range(12):
+            engine.process()
+            assert engine.period is None
+    finally:
+        close_engine(engine)
+
+
+def test_detector_forgets_beyond_window() -> None:
+    field = place(BLINKER, 8, 8)
+    detector = CycleDetector(8, 8, window=1)
+    detector.reset(field, generation=0)
+    for generation in range(1, 5):
+        following = step(field)
+        detector.update(field, following, np.concatenate(field_changes(field, following)))
+        field = following
+        assert detector.observe(generation) is None
+
+
+@pytest.mark.parametrize("backend", [Backend.NUMBA, Backend.NUMPY, Backend.BITPACKED, Backend.SPARSE, Backend.TILED])
+@pytest.mark.parametrize("turbo", [1, 2])
+def test_auto_freeze_replays_cycle(backend: Backend, turbo: int) -> None:
+    engine = cycling_engine(place(PULSAR, 24, 24), backend=backend, auto_freeze=True)
+    engine.turbo = turbo
+    try:
+        for _ in range(20):
+            engine.process()
+        assert engine.frozen
+
+        engine._kernel = kernel_not_called
+        field = engine.field.copy()
+        for _ in range(5):
+            previous, generation = field, engine.generation
+            for _ in range(turbo):
+                field = step(field)
+            cells = engine.process()
+
+            assert engine.generation == generation + turbo
+            assert np.array_equal(engine.field, field)
+            assert sorted(map(tuple, np.asarray(cells).tolist())) == sorted(zip(*np.nonzero(field.T), strict=True))
+            births, deaths = field_changes(previous, field)
+            assert np.array_equal(engine.births, births)
+            assert np.array_equal(engine.deaths, deaths)
+    finally:
+        close_engine(engine)
+
+
+def test_rule_change_unfreezes() -> None:
+    engine = cycling_engine(place(BLINKER, 16, 16), auto_freeze=True)
+    try:
+        for _ in range(6):
+            engine.process()
+        assert engine.frozen
+
+        field = engine.field.copy()
+        engine.preset = "b2/s"
+        engine.process()
+        assert not engine.frozen
+        assert np.array_equal(engine.field, step(field, "b2/s"))
+    finally:
+        close_engine(engine)
+
+
+def test_load_field_unfreezes() -> None:
+    engine = cycling_engine(place(BLOCK, 16, 16), auto_freeze=True)
+    try:
+        for _ in range(4):
+            engine.process()
+        assert engine.frozen
+
+        engine.load_field(place(BLINKER, 16, 16))
+        assert not engine.frozen
+        assert engine.period is None
+        engine.process()
+        assert np.array_equal(engine.field, step(place(BLINKER, 16, 16)))
+    finally:
+        close_engine(engine)
+
+
+def test_hashlife_is_not_frozen() -> None:
+    engine = cycling_engine(place(BLINKER, 16, 16), backend=Backend.HASHLIFE, auto_freeze=True)
+    try:
+        for _ in range(6):
+            engine.process()
+        assert engine.period == 2
+        assert not engine.frozen
+    finally:
+        close_engine(engine)
+
+
+# noinspection PyTypeChecker
+def test_batch_reports_period() -> None:
+    runner = CliRunner()
+    args = ["-X", "12", "-Y", "12", "-S", "3", "-G", "300", "--auto-freeze"]
+    result = runner.invoke(batch, args, standalone_mode=False)
+
+    assert result.exit_code == 0, result.output
+    summary: BatchResult = result.return_value
+    assert summary.period is not None
+    assert f"period: {summary.period} since generation" in result.output
@@ -0,0 +1,704 @@
+import tracemalloc
+from collections.abc import Callable
+
+import numba  # type: ignore
+import numpy as np
+import pytest
+
+from benchmarks.engines import Case, close_engine, new_engine
+from benchmarks.patterns import GLIDER, parse_plaintext, place
+from src.engines import GameEngine
+from src.engines.bitpacked import check_cells_bitpacked, get_empty_packed_area, pack_field, unpack_field
+from src.engines.buffered import SIGNATURES as BUFFERED_SIGNATURES
+from src.engines.buffered import TOPOLOGY_CODES, DoubleBuffer, fill_halo
+from src.engines.chunks import ChunkWorld
+from src.engines.core import SIGNATURES, check_cells, compile_kernels, neighbors_mask
+from src.engines.hashlife import HashLife
+from src.engines.multiprocess import StripePool
+from src.engines.parallel import MAX_THREADS, check_cells_parallel, scaling_report, set_threads
+from src.engines.rules import compile_rule
+from src.engines.sparse import SparseEngine
+from src.engines.tiles import TileMap
+from src.engines.vectorized import NEIGHBOR_OFFSETS, check_cells_vectorized, pad_field
+from src.engines.warmup import WarmUp
+from src.misc.states import Backend, Mode, Rules, Topology
+from src.misc.type_aliases import CheckCells, ResultToDrawing, Size
+from src.misc.utils import field_changes
+
+# Isotropic non-totalistic and Generations rules, besides the presets
+EXTRA_RULES = ["B2-ak/S12-i", "B2/S34/C4"]
+
+
+def parse_rule(rule: Rules | str) -> np.ndarray:
+    return compile_rule(rule.value if isinstance(rule, Rules) else rule).table
+
+
+def count_step(field: np.ndarray, rule: Rules, mode: Mode) -> np.ndarray:
+    """The next state by the numbers of living neighbors, as the rules of the presets are defined."""
+    b, s = rule.value.split("/")
+    height, width = field.shape
+    padded = np.pad(field, 1)
+    offsets = [(row, column) for row in (-1, 0, 1) for column in (-1, 0, 1) if row or column]
+    if mode is Mode.NEUMANN:
+        offsets = [(row, column) for row, column in offsets if not row or not column]
+    counts = sum(padded[1 + row : 1 + row + height, 1 + column : 1 + column + width] for row, column in offsets)
+    born = np.isin(counts, [int(i) for i in b[1:]])
+    survives = np.isin(counts, [int(i) for i in s[1:]])
+    return np.where(field == 1, survives, born).astype(field.dtype)
+
+
+def random_field(width: int, height: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 2, size=(height, width))
+
+
+def sorted_cells(cells: ResultToDrawing) -> list[tuple[int, int]]:
+    """The (x, y) pairs of a draw list or of an array (N, 2), sorted."""
+    return sorted((x, y) for x, y in np.asarray(cells).tolist())
+
+
+# Goes first: the workers are forked, which must happen before the threads of the parallel backend are started
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("rule", [Rules.b3_s23, "B2/S34/C4"])
+def test_stripe_pool_matches_check_cells(mode: Mode, rule: Rules | str) -> None:
+    width, height = 41, 29
+    expected_field = random_field(width, height, seed=2)
+
+    pool = StripePool(width, height, workers=3)
+    try:
+        current, following = pool.areas
+        current[:] = expected_field
+        for _ in range(4):
+            expected_field, expected_cells = check_cells(
+                current_field=expected_field,
+                next_field=np.zeros_like(expected_field),
+                width=width,
+                height=height,
+                rule=parse_rule(rule),
+                mode=mode.get_name(),
+            )
+            following, cells = pool.check_cells(
+                current_field=current,
+                next_field=following,
+                width=width,
+                height=height,
+                rule=parse_rule(rule),
+                mode=mode.get_name(),
+            )
+            current, following = following, current
+
+            assert np.array_equal(current, expected_field)
+            assert sorted_cells(cells) == sorted(expected_cells)
+    finally:
+        pool.close()
+
+
+def test_stripe_pool_stops_when_worker_dies() -> None:
+    pool = StripePool(16, 12, workers=2)
+    try:
+        current, following = pool.areas
+        pool.check_cells(current, following, 16, 12, parse_rule(Rules.b3_s23))
+        victim = pool._processes[0]  # noqa: SLF001
+        victim.kill()  # Asleep in the barrier, waiting for the next generation
+        victim.join()
+
+        with pytest.raises(RuntimeError, match=f"workers \\[{victim.pid}\\] died"):
+            pool.check_cells(current, following, 16, 12, parse_rule(Rules.b3_s23))
+        assert not any(process.is_alive() for process in pool._processes)  # noqa: SLF001
+    finally:
+        pool.close()
+
+
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("rule", list(Rules))
+def test_check_cells_matches_counting(mode: Mode, rule: Rules) -> None:
+    width, height = 37, 23
+    current = random_field(width, height)
+
+    field, cells = check_cells(
+        current_field=current,
+        next_field=np.zeros_like(current),
+        width=width,
+        height=height,
+        rule=parse_rule(rule),
+        mode=mode.get_name(),
+    )
+
+    expected_field = count_step(current, rule, mode)
+    assert np.array_equal(field, expected_field)
+    assert sorted_cells(cells) == sorted(zip(*np.nonzero(expected_field.T), strict=True))
+
+
+@pytest.mark.parametrize("kernel", [check_cells_vectorized, check_cells_parallel])
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("rule", [*Rules, *EXTRA_RULES])
+def test_kernel_matches_check_cells(kernel: Callable[..., CheckCells], mode: Mode, rule: Rules | str) -> None:
+    width, height = 37, 23
+    current = random_field(width, height)
+    for _ in range(3):
+        current, _cells = check_cells(current, np.zeros_like(current), width, height, parse_rule(rule), mode.get_name())
+
+    expected_field, expected_cells = check_cells(
+        current_field=current,
+        next_field=np.zeros_like(current),
+        width=width,
+        height=height,
+        rule=parse_rule(rule),
+        mode=mode.get_name(),
+    )
+    field, cells = kernel(
+        current_field=current,
+        next_field=np.zeros_like(current),
+        width=width,
+        height=height,
+        rule=parse_rule(rule),
+        mode=mode.get_name(),
+    )
+
+    assert np.array_equal(field, expected_field)
+    assert sorted_cells(cells) == sorted(expected_cells)
+
+
+@pytest.mark.parametrize(("width", "height"), [(37, 23), (64, 3), (130, 70)])
+def test_pack_field_roundtrip(width: int, height: int) -> None:
+    field = random_field(width, height)
+    packed = pack_field(field)
+
+    assert packed.dtype == np.uint64
+    assert packed.shape == (height, (width + 63) // 64)
+    assert np.array_equal(unpack_field(packed, width), field)
+
+
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("rule", list(Rules))
+def test_bitpacked_matches_check_cells(mode: Mode, rule: Rules) -> None:
+    width, height = 130, 45
+    current = random_field(width, height, seed=1)
+
+    expected_field, expected_cells = check_cells(
+        current_field=current,
+        next_field=np.zeros_like(current),
+        width=width,
+        height=height,
+        rule=parse_rule(rule),
+        mode=mode.get_name(),
+    )
+    field, cells = check_cells_bitpacked(
+        current_field=pack_field(current),
+        next_field=get_empty_packed_area(width, height),
+        width=width,
+        height=height,
+        rule=parse_rule(rule),
+        mode=mode.get_name(),
+    )
+
+    assert np.array_equal(unpack_field(field, width), expected_field)
+    assert sorted_cells(cells) == sorted(expected_cells)
+
+
+def test_scaling_report_keeps_threads() -> None:
+    set_threads(1)
+    try:
+        report = scaling_report(size=32, generations=1)
+        assert [threads for threads, _rate in report] == list(range(1, MAX_THREADS + 1))
+        assert numba.get_num_threads() == 1
+    finally:
+        set_threads(0)
+
+
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("generations", [1, 6, 13])
+@pytest.mark.parametrize("rule", [Rules.b3_s23, "B2-ak/S12-i"])
+def test_hashlife_matches_check_cells(mode: Mode, generations: int, rule: Rules | str) -> None:
+    # The hashlife plane is unbounded, so the reference field has a margin the pattern can not reach
+    margin = generations + 1
+    pattern = random_field(15, 12, seed=3)
+    expected_field = np.pad(pattern, margin)
+    height, width = expected_field.shape
+    for _ in range(generations):
+        expected_field, _cells = check_cells(
+            current_field=expected_field,
+            next_field=np.zeros_like(expected_field),
+            width=width,
+            height=height,
+            rule=parse_rule(rule),
+            mode=mode.get_name(),
+        )
+
+    hashlife = HashLife()
+    hashlife.set_rule(parse_rule(rule), mode=mode.get_name())
+    hashlife.load(pattern, x=margin, y=margin)
+    hashlife.step(generations)
+
+    field = np.zeros_like(expected_field)
+    cells = hashlife.cells(0, 0, width, height)
+    field[cells[:, 1], cells[:, 0]] = 1
+
+    assert hashlife.generation == generations
+    assert np.array_equal(field, expected_field)
+
+
+def test_hashlife_collect_keeps_pattern() -> None:
+    hashlife = HashLife()
+    hashlife.set_rule(parse_rule(Rules.b3_s23))
+    hashlife.load(random_field(32, 32, seed=4))
+    hashlife.step(100)
+    node_count = hashlife.node_count
+    cells = sorted_cells(hashlife.cells(-200, -200, 432, 432))
+
+    hashlife.collect()
+
+    assert hashlife.node_count < node_count
+    assert sorted_cells(hashlife.cells(-200, -200, 432, 432)) == cells
+
+
+def test_hashlife_load_drops_previous_plane() -> None:
+    hashlife = HashLife(max_nodes=100)
+    hashlife.load(random_field(64, 64, seed=1))
+    hashlife.load(random_field(64, 64, seed=2))
+
+    fresh = HashLife()
+    fresh.load(random_field(64, 64, seed=2))
+    assert hashlife.node_count == fresh.node_count
+
+
+def test_hashlife_turbo_jumps(monkeypatch: pytest.MonkeyPatch) -> None:
+    field = random_field(48, 48, seed=6).astype(np.uint8)
+    case = Case(target="hashlife", size=48, start="soup", mode=Mode.MOORE, rule="b3/s23")
+    engine, reference = new_engine(case, field), new_engine(case, field)
+    assert engine.hashlife is not None
+    steps: list[int] = []
+    step = engine.hashlife.step
+
+    def counted_step(generations: int = 1) -> None:
+        steps.append(generations)
+        step(generations)
+
+    monkeypatch.setattr(engine.hashlife, "step", counted_step)
+
+    engine.turbo = 100
+    cells = engine.process()
+    for _ in range(100):
+        reference_cells = reference.process()
+
+    assert steps == [99, 1]
+    assert engine.generation == reference.generation == 100
+    assert np.array_equal(engine.field, reference.field)
+    assert sorted_cells(cells) == sorted_cells(reference_cells)
+
+
+def test_hashlife_rejects_b0() -> None:
+    with pytest.raises(ValueError, match="B0"):
+        HashLife().set_rule(parse_rule("b03/s23"))
+    with pytest.raises(ValueError, match="two-state"):
+        HashLife().set_rule(parse_rule("B2/S/C3"))
+
+
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("rule", [Rules.b3_s23, *EXTRA_RULES])
+def test_chunk_world_matches_check_cells(mode: Mode, rule: Rules | str) -> None:
+    # The plane is unbounded, so the reference field has a margin the pattern can not reach
+    generations, margin = 40, 48
+    pattern = random_field(21, 14, seed=7).astype(np.uint8)
+    expected_field = np.pad(pattern, margin)
+    height, width = expected_field.shape
+
+    world = ChunkWorld(chunk=8, idle_generations=2)
+    world.load(pattern, x=-5, y=3)  # Across the chunks with negative and positive coordinates
+    field = np.empty_like(expected_field)
+    for _ in range(generations):
+        expected_field, _cells = check_cells(
+            current_field=expected_field,
+            next_field=np.zeros_like(expected_field),
+            width=width,
+            height=height,
+            rule=parse_rule(rule),
+            mode=mode.get_name(),
+        )
+        world.step(parse_rule(rule), moore=mode is Mode.MOORE)
+        world.region(field, left=-5 - margin, top=3 - margin)
+
+        assert np.array_equal(field, expected_field)
+        assert world.population == np.count_nonzero(expected_field == 1)
+
+
+def test_chunk_world_follows_glider() -> None:
+    world = ChunkWorld(chunk=16, idle_generations=4)
+    world.load(parse_plaintext(GLIDER.cells))
+
+    for _ in range(800):  # The glider moves by 200 cells, 12 chunks
+        world.step(parse_rule(Rules.b3_s23))
+
+    assert world.population == 5
+    assert world.stats.chunks <= 9
+    assert world.stats.allocated > 25
+    assert world.stats.freed == world.stats.allocated - world.stats.chunks
+    bounds = world.bounds()
+    assert bounds is not None
+    assert bounds[0] > 160
+    assert bounds[1] > 160
+
+
+def test_chunk_world_frees_dead_pattern() -> None:
+    world = ChunkWorld(chunk=8, idle_generations=3)
+    world.load(np.eye(3, dtype=np.uint8), x=30, y=-30)  # A diagonal of 3 cells dies in 2 generations
+
+    for _ in range(5):
+        world.step(parse_rule(Rules.b3_s23))
+
+    assert world.population == 0
+    assert world.chunks == {}
+    assert world.bounds() is None
+
+
+def test_chunk_world_keeps_chunk_next_to_still_life() -> None:
+    world = ChunkWorld(chunk=8, idle_generations=2)
+    block = np.ones((2, 2), dtype=np.uint8)
+    world.load(block, x=6, y=6)  # In the corner of its chunk, next to 3 empty chunks
+
+    for _ in range(50):
+        world.step(parse_rule(Rules.b3_s23))
+
+    assert world.population == 4
+    assert world.stats.chunks == 4
+    assert world.stats.allocated == 4
+    assert world.stats.freed == 0
+
+
+def test_chunk_world_rejects_b0() -> None:
+    with pytest.raises(ValueError, match="B0"):
+        ChunkWorld().step(parse_rule("b03/s23"))
+
+
+def test_chunked_engine_keeps_cells_out_of_view() -> None:
+    case = Case(target="chunked", size=24, start="glider", mode=Mode.MOORE, rule="b3/s23")
+    engine = new_engine(case, place(GLIDER, 24, 24))
+    try:
+        for _ in range(60):  # The glider leaves the visible region
+            engine.process()
+        assert not engine.field.any()
+
+        assert engine.chunk_world is not None
+        assert engine.chunk_world.population == 5
+        engine.load_field(place(GLIDER, 24, 24))
+        assert engine.chunk_world.population == 5
+        assert engine.chunk_world.stats.chunks == 1
+    finally:
+        close_engine(engine)
+
+
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("rule", [*Rules, *EXTRA_RULES])
+def test_sparse_engine_matches_check_cells(mode: Mode, rule: Rules | str) -> None:
+    width, height = 40, 30
+    # A dense block and a few cells, so the engine switches between the dense and the sparse calculation
+    expected_field = np.zeros((height, width), dtype=np.int64)
+    expected_field[2:8, 2:8] = random_field(6, 6, seed=5)
+    expected_field[20, 30:33] = 1
+
+    engine = SparseEngine(width, height, threshold=0.02)
+    current, following = expected_field.copy(), np.zeros_like(expected_field)
+    modes = set()
+    for _ in range(30):
+        expected_field, expected_cells = check_cells(
+            current_field=expected_field,
+            next_field=np.zeros_like(expected_field),
+            width=width,
+            height=height,
+            rule=parse_rule(rule),
+            mode=mode.get_name(),
+        )
+        modes.add(engine.sparse)
+        following, cells = engine.check_cells(current, following, width, height, parse_rule(rule), mode.get_name())
+        current, following = following, current
+
+        assert np.array_equal(current, expected_field)
+        assert sorted_cells(cells) == sorted(expected_cells)
+        assert engine.population == len(expected_cells)
+
+    if rule is Rules.b3_s23:
+        assert modes == {True, False}
+
+
+def test_sparse_engine_goes_dense_when_filled() -> None:
+    width, height = 32, 32
+    current = np.zeros((height, width), dtype=np.int64)
+    current[16, 15:18] = 1
+    following = np.zeros_like(current)
+    engine = SparseEngine(width, height, threshold=0.02)
+
+    following, _cells = engine.check_cells(current, following, width, height, parse_rule(Rules.b3_s23))
+    current, following = following, current
+    assert engine.sparse
+
+    # B1 makes the field grow in all directions
+    for _ in range(6):
+        following, _cells = engine.check_cells(current, following, width, height, parse_rule(Rules.b1_s012345678))
+        current, following = following, current
+    assert not engine.sparse
+
+
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("kernel", [check_cells, check_cells_vectorized])
+def test_tile_map_matches_check_cells(mode: Mode, kernel: Callable[..., CheckCells]) -> None:
+    width, height = 45, 37
+    expected_field = np.zeros((height, width), dtype=np.int64)
+    expected_field[3:12, 4:14] = random_field(10, 9, seed=6)
+
+    tile_map = TileMap(width, height, tile=8, kernel=kernel)
+    current, following = expected_field.copy(), np.zeros_like(expected_field)
+    for generation in range(20):
+        rule = parse_rule(Rules.b3_s23 if generation < 15 else "B2/S34/C4")
+        expected_field, expected_cells = check_cells(
+            current_field=expected_field,
+            next_field=np.zeros_like(expected_field),
+            width=width,
+            height=height,
+            rule=rule,
+            mode=mode.get_name(),
+        )
+        following, cells = tile_map.check_cells(current, following, width, height, rule, mode.get_name())
+        current, following = following, current
+
+        assert np.array_equal(current, expected_field)
+        assert sorted_cells(cells) == sorted(expected_cells)
+
+
+def test_tile_map_skips_stable_tiles() -> None:
+    width, height = 64, 64
+    current = np.zeros((height, width), dtype=np.int64)
+    current[1:3, 1:3] = 1  # block, a still life
+    current[40, 40:43] = 1  # blinker
+    following = np.zeros_like(current)
+    tile_map = TileMap(width, height, tile=16)
+
+    for _ in range(4):
+        following, _cells = tile_map.check_cells(current, following, width, height, parse_rule(Rules.b3_s23))
+        current, following = following, current
+
+    # Only the tile of the blinker and its 8 neighbors are left
+    assert tile_map.stats.tiles == 16
+    assert tile_map.stats.changed == 1
+    assert tile_map.stats.computed == 9
+    assert tile_map.stats.skipped == 7
+    assert 0 < tile_map.stats.skipped_ratio < 1
+
+
+def joined_step(field: np.ndarray, rule: np.ndarray, mode: Mode, topology: Topology) -> np.ndarray:
+    """The next state cell by cell, the neighbors beyond the edges are found by the topology."""
+    height, width = field.shape
+    result = np.empty_like(field)
+    for y in range(height):
+        for x in range(width):
+            mask = 0
+            for bit, (row, column) in enumerate(NEIGHBOR_OFFSETS):
+                ny, nx = y + row, x + column
+                if topology is not Topology.DEAD:
+                    if topology is Topology.KLEIN and not 0 <= ny < height:
+                        nx = width - 1 - nx  # Across the top or the bottom edge of a Klein bottle
+                    ny, nx = ny % height, nx % width
+                inside = 0 <= ny < height and 0 <= nx < width
+                if inside and (mode is Mode.MOORE or not row or not column) and field[ny, nx] == 1:
+                    mask |= 1 << bit
+            result[y, x] = rule[field[y, x], mask]
+    return result
+
+
+@pytest.mark.parametrize("topology", list(Topology))
+def test_fill_halo_matches_pad_field(topology: Topology) -> None:
+    field = random_field(9, 6, seed=8).astype(np.uint8) * np.arange(1, 10, dtype=np.uint8)
+    padded = np.full((8, 11), 99, dtype=np.uint8)
+    padded[1:-1, 1:-1] = field
+
+    fill_halo(padded, TOPOLOGY_CODES[topology])
+
+    assert np.array_equal(padded, pad_field(field, topology))
+
+
+@pytest.mark.parametrize("topology", list(Topology))
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("rule", [Rules.b3_s23, *EXTRA_RULES])
+def test_topology_kernels_match_joined_step(topology: Topology, mode: Mode, rule: Rules | str) -> None:
+    width, height = 13, 10
+    expected_field = random_field(width, height, seed=9).astype(np.uint8)
+    buffer = DoubleBuffer(width, height, topology=topology)
+    current, following = buffer.areas
+    current[:] = expected_field
+    vectorized = expected_field.copy()
+    for _ in range(6):
+        expected_field = joined_step(expected_field, parse_rule(rule), mode, topology)
+        following, _cells = buffer.check_cells(current, following, width, height, parse_rule(rule), mode.get_name())
+        current, following = following, current
+        vectorized, _cells = check_cells_vectorized(
+            vectorized,
+            np.zeros_like(vectorized),
+            width,
+            height,
+            parse_rule(rule),
+            mode.get_name(),
+            topology,
+        )
+
+        assert np.array_equal(current, expected_field)
+        assert np.array_equal(vectorized, expected_field)
+
+    buffer.step_many(current, following, parse_rule(rule), mode is Mode.MOORE, 3)
+    for _ in range(3):
+        expected_field = joined_step(expected_field, parse_rule(rule), mode, topology)
+    assert np.array_equal(following, expected_field)
+
+
+@pytest.mark.parametrize("backend", [Backend.NUMBA, Backend.NUMPY])
+def test_glider_goes_round_torus(backend: Backend) -> None:
+    field = place(GLIDER, 16, 16)
+    engine = GameEngine(size=Size(width=16, height=16), backend=backend, topology=Topology.TORUS)
+    engine.mode = Mode.MOORE
+    engine.load_field(field)
+    try:
+        engine.turbo = 16
+        for _ in range(4):  # The glider moves by a cell every 4 generations
+            engine.process()
+        assert engine.generation == 64
+        assert np.array_equal(engine.field, field)
+    finally:
+        close_engine(engine)
+
+
+def test_engine_rejects_topology_of_dead_edges_backend() -> None:
+    with pytest.raises(ValueError, match="dead edges only"):
+        GameEngine(size=Size(width=16, height=16), backend=Backend.BITPACKED, topology=Topology.KLEIN)
+
+
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("rule", [*Rules, *EXTRA_RULES])
+def test_double_buffer_matches_check_cells(mode: Mode, rule: Rules | str) -> None:
+    width, height = 37, 23
+    expected_field = random_field(width, height).astype(np.uint8)
+
+    buffer = DoubleBuffer(width, height)
+    current, following = buffer.areas
+    current[:] = expected_field
+    for _ in range(5):
+        expected_field, expected_cells = check_cells(
+            current_field=expected_field,
+            next_field=np.zeros_like(expected_field),
+            width=width,
+            height=height,
+            rule=parse_rule(rule),
+            mode=mode.get_name(),
+        )
+        following, cells = buffer.check_cells(current, following, width, height, parse_rule(rule), mode.get_name())
+        current, following = following, current
+
+        assert np.array_equal(current, expected_field)
+        assert isinstance(cells, np.ndarray)
+        assert cells.tolist() == [list(cell) for cell in expected_cells]
+
+
+def test_double_buffer_allocates_nothing() -> None:
+    width, height = 200, 150
+    buffer = DoubleBuffer(width, height)
+    current, following = buffer.areas
+    current[:] = random_field(width, height)
+    rule = parse_rule(Rules.b3_s23)
+    for _ in range(3):  # compilation
+        following, _cells = buffer.check_cells(current, following, width, height, rule)
+        current, following = following, current
+
+    tracemalloc.start()
+    try:
+        start, _peak = tracemalloc.get_traced_memory()
+        for _ in range(50):
+            following, cells = buffer.check_cells(current, following, width, height, rule)
+            current, following = following, current
+        end, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # A list of the living cells alone would take hundreds of kilobytes
+    assert len(cells) > 1000
+    assert end - start < 1024
+    assert peak - start < 4096
+
+
+@pytest.mark.parametrize("rule", [Rules.b3_s23, "B2/S34/C4"])
+def test_field_changes_rebuild_next_generation(rule: Rules | str) -> None:
+    previous = random_field(41, 29, seed=5).astype(np.uint8)
+    previous, _ = check_cells(previous, np.zeros_like(previous), 41, 29, parse_rule(rule), "Moore")
+    field, _ = check_cells(previous, np.zeros_like(previous), 41, 29, parse_rule(rule), "Moore")
+
+    births, deaths = field_changes(previous, field)
+
+    assert (field[births[:, 1], births[:, 0]] == 1).all()
+    assert (field[deaths[:, 1], deaths[:, 0]] != 1).all()
+    rebuilt = previous.copy()
+    for x, y in np.concatenate((births, deaths)):
+        rebuilt[y, x] = field[y, x]
+    assert np.array_equal(rebuilt, field)
+
+
+def test_compile_kernels_adds_signatures() -> None:
+    compile_kernels(neighbors_mask)
+
+    assert SIGNATURES[neighbors_mask].args in neighbors_mask.signatures
+
+
+@pytest.mark.parametrize("backend", [Backend.NUMBA, Backend.NUMPY, Backend.BITPACKED, Backend.SPARSE, Backend.CHUNKED])
+def test_warm_up_compiles_backend(backend: Backend) -> None:
+    warm_up = WarmUp(backend)
+
+    assert warm_up.wait(timeout=120)
+    assert warm_up.seconds is not None
+
+
+def test_warm_up_compiles_padded_kernels() -> None:
+    assert WarmUp(Backend.NUMBA).wait(timeout=120)
+    assert all(signature.args in kernel.signatures for kernel, signature in BUFFERED_SIGNATURES.items())
+
+    compiled = {kernel: len(kernel.signatures) for kernel in BUFFERED_SIGNATURES}
+    field = random_field(48, 48, seed=5).astype(np.uint8)
+    engine = new_engine(Case(target="numba", size=48, start="soup", mode=Mode.NEUMANN, rule="b3/s23"), field)
+    engine.turbo = 4
+    engine.process()
+    # The engine calls the kernels with the types they are compiled for, nothing is compiled on the first generation
+    assert {kernel: len(kernel.signatures) for kernel in BUFFERED_SIGNATURES} == compiled
+
+
+@pytest.mark.parametrize("mode", list(Mode))
+@pytest.mark.parametrize("rule", [Rules.b3_s23, "B2/S34/C4"])
+@pytest.mark.parametrize("generations", [1, 4, 7])
+def test_step_many_matches_check_cells(mode: Mode, rule: Rules | str, generations: int) -> None:
+    field = random_field(37, 23, seed=3).astype(np.uint8)
+    buffer = DoubleBuffer(37, 23)
+    areas = buffer.areas
+    areas[0][:] = field
+    buffer.step_many(areas[0], areas[1], parse_rule(rule), mode is Mode.MOORE, generations)
+
+    expected = field
+    for _ in range(generations):
+        expected, _ = check_cells(expected, np.zeros_like(expected), 37, 23, parse_rule(rule), mode.get_name())
+    assert np.array_equal(areas[generations % 2], expected)
+
+
+@pytest.mark.parametrize("backend", ["numba", "numpy", "bitpacked", "sparse", "tiled"])
+def test_turbo_draws_last_generation(backend: str) -> None:
+    field = random_field(48, 48, seed=4).astype(np.uint8)
+    engine = new_engine(Case(target=backend, size=48, start="soup", mode=Mode.MOORE, rule="b3/s23"), field)
+    engine.track_changes = True
+    try:
+        engine.process()
+        previous = engine.field.copy()
+        engine.turbo = 6
+        cells = engine.process()
+
+        expected = previous
+        for _ in range(6):
+            expected, _ = check_cells(expected, np.zeros_like(expected), 48, 48, parse_rule(Rules.b3_s23), "Moore")
+        assert engine.generation == 7
+        assert np.array_equal(engine.field, expected)
+        assert sorted_cells(cells) == sorted(zip(*np.nonzero(expected.T), strict=True))
+
+        births, deaths = field_changes(previous, expected)
+        assert np.array_equal(engine.births, births)
+        assert np.array_equal(engine.deaths, deaths)
+    finally:
+        close_engine(engine)
@@ -0,0 +1,192 @@
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pygame as pg
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.engines import Case, close_engine, new_engine
+from benchmarks.patterns import soup
+from src import config
+from src.engines.core import check_cells
+from src.engines.rules import compile_rule
+from src.export import (
+    ExportResult,
+    encode_gif_frame,
+    encode_png,
+    export,
+    export_frames,
+    gif_header,
+    lzw_encode,
+    rasterize,
+)
+from src.interfaces.renderer import CellRenderer, build_palette
+from src.misc.states import Mode
+from src.misc.type_aliases import Size
+
+PALETTE = build_palette(config.GameSettings.GUIColors.cell, config.GameSettings.GUIColors.back_ground, states=2)
+
+
+def lzw_decode(data: bytes, min_size: int) -> list[int]:
+    """The LZW decoder of GIF, written the plain way."""
+    clear, end = 1 << min_size, (1 << min_size) + 1
+    table: list[list[int]] = [[code] for code in range(clear)] + [[], []]
+    size, position, previous = min_size + 1, 0, None
+    pixels: list[int] = []
+    while True:
+        start = position >> 3
+        code = int.from_bytes(data[start : start + 3], "little") >> (position & 7) & ((1 << size) - 1)
+        position += size
+        if code == clear:
+            del table[clear + 2 :]
+            size, previous = min_size + 1, None
+            continue
+        if code == end:
+            return pixels
+
+        if code < len(table):
+            entry = table[code]
+        else:  # The code being defined: the previous entry and its first pixel
+            assert previous is not None
+            entry = previous + previous[:1]
+        if previous is not None and len(table) < 4096:
+            table.append(previous + entry[:1])
+        pixels.extend(entry)
+        if len(table) == 1 << size and size < 12:
+            size += 1
+        previous = entry
+
+
+def gif_frames(data: bytes) -> tuple[np.ndarray, list[np.ndarray]]:
+    """The color table and the frames of an animated GIF."""
+    assert data[:6] == b"GIF89a"
+    width, height, packed = struct.unpack_from("<HHB", data, 6)
+    colors = 2 << (packed & 7)
+    palette = np.frombuffer(data, dtype=np.uint8, count=colors * 3, offset=13).reshape(-1, 3)
+    position, frames = 13 + colors * 3, []
+    while data[position] != 0x3B:
+        image = data[position] == 0x2C  # Else an extension: its label and sub-blocks
+        min_size = data[position + 10] if image else 0
+        position += 11 if image else 2
+        chunks = []
+        while data[position]:
+            chunks.append(data[position + 1 : position + 1 + data[position]])
+            position += data[position] + 1
+        position += 1
+        if image:
+            pixels = lzw_decode(b"".join(chunks), min_size)
+            frames.append(np.array(pixels, dtype=np.uint8).reshape(height, width))
+    return palette, frames
+
+
+def png_pixels(data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """The palette and the pixels of an indexed PNG without filters."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    position, chunks = 8, {}
+    while position < len(data):
+        (length,) = struct.unpack_from(">I", data, position)
+        kind = data[position + 4 : position + 8]
+        chunks[kind] = data[position + 8 : position + 8 + length]
+        position += length + 12
+    width, height = struct.unpack_from(">II", chunks[b"IHDR"])
+    rows = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, width + 1)
+    assert not rows[:, 0].any()
+    return np.frombuffer(chunks[b"PLTE"], dtype=np.uint8).reshape(-1, 3), rows[:, 1:]
+
+
+@pytest.mark.parametrize("cell", [1, 2, 8])
+def test_rasterize_draws_like_the_renderer(cell: int) -> None:
+    field = np.random.default_rng(3).integers(0, 3, size=(9, 13), dtype=np.uint8)
+    renderer = CellRenderer(Size(width=13, height=9), cell, build_palette((255, 255, 255), (0, 0, 0), states=3))
+
+    drawn = pg.surfarray.array2d(renderer.render(field)).T
+
+    assert np.array_equal(rasterize(field, cell), drawn)
+
+
+@pytest.mark.parametrize(
+    ("pixels", "min_size"),
+    [
+        (np.zeros(1, dtype=np.uint8), 2),
+        (np.random.default_rng(1).integers(0, 4, size=20000, dtype=np.uint8), 2),
+        (np.random.default_rng(2).integers(0, 256, size=30000, dtype=np.uint8), 8),
+        (np.repeat(np.arange(2, dtype=np.uint8), 50000), 2),
+    ],
+)
+def test_lzw_matches_the_gif_decoder(pixels: np.ndarray, min_size: int) -> None:
+    encoded = lzw_encode(pixels, min_size).tobytes()
+
+    assert lzw_decode(encoded, min_size) == pixels.tolist()
+
+
+def test_png_keeps_pixels_and_palette() -> None:
+    pixels = rasterize(soup(30, 20, density=0.4), cell=3)
+
+    palette, decoded = png_pixels(encode_png(pixels, PALETTE))
+
+    assert np.array_equal(palette, PALETTE)
+    assert np.array_equal(decoded, pixels)
+
+
+def test_gif_frame_keeps_pixels() -> None:
+    pixels = rasterize(soup(30, 20, density=0.4), cell=3)
+    data = gif_header(90, 60, PALETTE) + encode_gif_frame(pixels, colors=2, delay=4) + b"\x3b"
+
+    palette, frames = gif_frames(data)
+
+    assert np.array_equal(palette, PALETTE)
+    assert len(frames) == 1
+    assert np.array_equal(frames[0], pixels)
+
+
+def test_gif_rejects_large_image() -> None:
+    with pytest.raises(ValueError, match="too large for GIF"):
+        gif_header(70000, 10, PALETTE)
+
+
+def expected_fields(field: np.ndarray, frames: int, turbo: int) -> list[np.ndarray]:
+    height, width = field.shape
+    fields = [field]
+    for _ in range(frames - 1):
+        for _ in range(turbo):
+            field, _ = check_cells(field, np.zeros_like(field), width, height, compile_rule("b3/s23").table, "Moore")
+        fields.append(field)
+    return fields
+
+
+@pytest.mark.parametrize("output", ["run.gif", "frames"])
+def test_export_frames(tmp_path: Path, output: str) -> None:
+    field = soup(24, 24, density=0.4, seed=6)
+    engine = new_engine(Case(target="numba", size=24, start="soup", mode=Mode.MOORE, rule="b3/s23"), field)
+    engine.turbo = 2
+    try:
+        result = export_frames(engine, frames=5, output=tmp_path / output, cell=2, workers=2)
+    finally:
+        close_engine(engine)
+
+    expected = [rasterize(field, 2) for field in expected_fields(field, 5, turbo=2)]
+    if output.endswith(".gif"):
+        assert result.files == [tmp_path / output]
+        _palette, frames = gif_frames(result.files[0].read_bytes())
+    else:
+        assert [path.name for path in result.files] == [f"frame_{index:06d}.png" for index in range(5)]
+        frames = [png_pixels(path.read_bytes())[1] for path in result.files]
+    assert len(frames) == 5
+    assert all(np.array_equal(frame, pixels) for frame, pixels in zip(frames, expected, strict=True))
+    assert result.size == sum(path.stat().st_size for path in result.files)
+
+
+# noinspection PyTypeChecker
+def test_export_command(tmp_path: Path) -> None:
+    output = tmp_path / "run.gif"
+    runner = CliRunner()
+    args = ["-X", "12", "-Y", "10", "-S", "4", "-G", "3", "-C", "4", "-W", "1", "-O", str(output)]
+    result = runner.invoke(export, args, standalone_mode=False)
+
+    assert result.exit_code == 0, result.output
+    summary: ExportResult = result.return_value
+    assert summary.frames == 3
+    assert "frames: 3 of 48x40 px" in result.output
+    assert pg.image.load(output).get_size() == (48, 40)
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import numpy as np
+from click.testing import CliRunner
+
+from src.engines.core import check_cells
+from src.engines.rules import compile_rule
+from src.headless import BatchResult, batch
+
+
+# noinspection PyTypeChecker
+def test_batch_matches_check_cells(tmp_path: Path) -> None:
+    width, height, seed, generations = 37, 23, 7, 12
+    runner = CliRunner()
+    args = ["-X", width, "-Y", height, "-S", seed, "-G", generations, "-R", "B36/S23", "-D", 5, "-O", tmp_path]
+    result = runner.invoke(batch, [str(arg) for arg in args], standalone_mode=False)
+
+    assert result.exit_code == 0, result.output
+    field = np.random.default_rng(seed).integers(0, 2, size=(height, width), dtype=np.uint8)
+    table = compile_rule("B36/S23").table
+    expected = {}
+    for generation in range(1, generations + 1):
+        field, _ = check_cells(field, np.zeros_like(field), width, height, table, "Moore")
+        expected[generation] = field
+
+    summary: BatchResult = result.return_value
+    assert summary.generations == generations
+    assert summary.population == np.count_nonzero(field)
+    assert f"final population: {summary.population}" in result.output
+    assert [path.name for path in summary.dumps] == ["generation_00000005.npy", "generation_00000010.npy"]
+    for path, generation in zip(summary.dumps, (5, 10), strict=True):
+        assert np.array_equal(np.load(path), expected[generation])
+
+
+# noinspection PyTypeChecker
+def test_batch_rejects_invalid_rule() -> None:
+    runner = CliRunner()
+    result = runner.invoke(batch, ["--rule", "B9/S"])
+
+    assert result.exit_code == 2
+    assert "invalid" in result.output
+
+
+# noinspection PyTypeChecker
+def test_batch_twice_in_one_process(tmp_path: Path) -> None:
+    runner = CliRunner()
+    args = ["-X", "40", "-Y", "30", "-S", "1", "-G", "3", "-O", str(tmp_path)]
+    first = runner.invoke(batch, args, standalone_mode=False)
+    assert first.exit_code == 0, first.output
+
+    args = ["-X", "20", "-Y", "10", "-S", "2", "-G", "3", "-B", "numpy", "-O", str(tmp_path)]
+    second = runner.invoke(batch, args, standalone_mode=False)
+    assert second.exit_code == 0, second.output
+    field = np.random.default_rng(2).integers(0, 2, size=(10, 20), dtype=np.uint8)
+    table = compile_rule("b3/s23").table
+    for _ in range(3):
+        field, _ = check_cells(field, np.zeros_like(field), 20, 10, table, "Moore")
+    summary: BatchResult = second.return_value
+    assert summary.population == np.count_nonzero(field)
@@ -0,0 +1,192 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.engines import Case, close_engine, new_engine
+from benchmarks.patterns import GLIDER, place, soup
+from src.engines import GameEngine
+from src.engines.history import HistoryReader, index_path
+from src.engines.snapshots import capture, write_snapshot
+from src.headless import batch
+from src.misc.states import Mode
+from src.misc.type_aliases import Size
+
+
+def recorded_run(
+    path: Path,
+    backend: str = "numba",
+    rule: str = "b3/s23",
+    generations: int = 30,
+    turbo: int = 1,
+) -> dict[int, np.ndarray]:
+    """Records the run of a soup with a keyframe every 7 generations, returns the fields of its generations."""
+    case = Case(target=backend, size=40, start="soup", mode=Mode.MOORE, rule=rule)
+    engine = new_engine(case, soup(40, 40, density=0.4, seed=2))
+    engine.turbo = turbo
+    try:
+        engine.record_history(path, keyframe_every=7)
+        fields = {engine.generation: engine.field.copy()}
+        for _ in range(generations):
+            engine.process()
+            fields[engine.generation] = engine.field.copy()
+        engine.stop_recording()
+    finally:
+        close_engine(engine)
+    return fields
+
+
+@pytest.mark.parametrize(("backend", "rule"), [("numba", "b3/s23"), ("bitpacked", "B36/S23"), ("numpy", "B2/S/C4")])
+def test_seek_decodes_every_generation(tmp_path: Path, backend: str, rule: str) -> None:
+    path = tmp_path / "run.hist"
+    fields = recorded_run(path, backend=backend, rule=rule)
+
+    reader = HistoryReader(path)
+    try:
+        assert reader.info.rule == rule
+        assert reader.keyframes[:, 0].tolist() == [0, 7, 14, 21, 28]
+        for generation, field in fields.items():
+            found, decoded = reader.seek(generation)
+            assert found == generation
+            assert np.array_equal(decoded, field)
+    finally:
+        reader.close()
+
+
+def test_frames_replay_the_run(tmp_path: Path) -> None:
+    path = tmp_path / "run.hist"
+    fields = recorded_run(path)
+
+    reader = HistoryReader(path)
+    try:
+        frames = [(generation, field.copy()) for generation, field in reader.frames()]
+    finally:
+        reader.close()
+
+    assert [generation for generation, _field in frames] == list(fields)
+    assert all(np.array_equal(field, fields[generation]) for generation, field in frames)
+
+
+def test_seek_between_turbo_generations(tmp_path: Path) -> None:
+    path = tmp_path / "run.hist"
+    fields = recorded_run(path, generations=10, turbo=4)
+
+    reader = HistoryReader(path)
+    try:
+        found, field = reader.seek(18)
+        assert found == 16
+        assert np.array_equal(field, fields[16])
+        with pytest.raises(ValueError, match="starts at the generation 0"):
+            reader.seek(-1)
+    finally:
+        reader.close()
+
+
+def test_reader_rebuilds_missing_index(tmp_path: Path) -> None:
+    path = tmp_path / "run.hist"
+    fields = recorded_run(path)
+    index_path(path).unlink()
+
+    reader = HistoryReader(path)
+    try:
+        assert reader.keyframes[:, 0].tolist() == [0, 7, 14, 21, 28]
+        assert np.array_equal(reader.seek(25)[1], fields[25])
+    finally:
+        reader.close()
+
+
+def test_reader_ignores_cut_record(tmp_path: Path) -> None:
+    path = tmp_path / "run.hist"
+    fields = recorded_run(path)
+    with path.open("r+b") as stream:
+        stream.truncate(path.stat().st_size - 3)
+
+    reader = HistoryReader(path)
+    try:
+        found, field = reader.seek(30)
+        assert found == 29
+        assert np.array_equal(field, fields[29])
+    finally:
+        reader.close()
+
+
+def test_reader_rejects_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "run.hist"
+    path.write_bytes(b"LIFESNAP and something else")
+
+    with pytest.raises(ValueError, match="not a history log"):
+        HistoryReader(path)
+
+
+def test_replayed_cycle_is_recorded(tmp_path: Path) -> None:
+    path = tmp_path / "run.hist"
+    engine = GameEngine(size=Size(width=16, height=16), auto_freeze=True)
+    engine.mode = Mode.MOORE
+    field = np.zeros((16, 16), dtype=np.uint8)
+    field[8, 7:10] = 1  # A blinker
+    engine.load_field(field)
+    try:
+        engine.record_history(path)
+        fields = {}
+        for _ in range(10):
+            engine.process()
+            fields[engine.generation] = engine.field.copy()
+        assert engine.frozen
+        engine.stop_recording()
+    finally:
+        close_engine(engine)
+
+    reader = HistoryReader(path)
+    try:
+        for generation, expected in fields.items():
+            assert np.array_equal(reader.seek(generation)[1], expected)
+    finally:
+        reader.close()
+
+
+def test_restart_writes_keyframe_or_stops(tmp_path: Path) -> None:
+    path, snapshot = tmp_path / "run.hist", tmp_path / "later.snap"
+    later = np.roll(place(GLIDER, 32, 32), (9, -7), axis=(0, 1))
+    case = Case(target="numba", size=32, start="glider", mode=Mode.MOORE, rule="b3/s23")
+    engine = new_engine(case, place(GLIDER, 32, 32))
+    try:
+        write_snapshot(snapshot, capture(later, engine.snapshot_info()._replace(generation=10)))
+        engine.record_history(path, keyframe_every=100)
+        for _ in range(3):
+            engine.process()
+        engine.load_snapshot(snapshot)  # Forward, the field is a keyframe
+        engine.process()
+        assert engine.recorder is not None
+        assert engine.recorder.keyframes == 2
+
+        engine.load_field(place(GLIDER, 32, 32))  # Back to the generation 0, the log ends
+        assert engine.recorder is None
+    finally:
+        close_engine(engine)
+
+    reader = HistoryReader(path)
+    try:
+        assert reader.keyframes[:, 0].tolist() == [0, 10]
+        assert np.array_equal(reader.seek(10)[1], later)
+        assert reader.seek(11)[0] == 11
+    finally:
+        reader.close()
+
+
+# noinspection PyTypeChecker
+def test_batch_records_history(tmp_path: Path) -> None:
+    path = tmp_path / "batch.hist"
+    runner = CliRunner()
+    args = ["-X", "30", "-Y", "20", "-S", "1", "-G", "40", "-H", str(path)]
+    result = runner.invoke(batch, args, standalone_mode=False)
+
+    assert result.exit_code == 0, result.output
+    assert "history: 41 generations, 1 keyframes" in result.output
+    reader = HistoryReader(path)
+    try:
+        generation, field = reader.seek(40)
+        assert generation == 40
+        assert np.count_nonzero(field) == result.return_value.population
+    finally:
+        reader.close()
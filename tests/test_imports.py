@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def loaded_modules(code: str, modules: list[str]) -> list[str]:
+    """Modules of `modules` imported by `code` in a fresh interpreter."""
+    check = f"import sys\n{code}\nprint(' '.join(name for name in {modules!r} if name in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True)  # noqa: S603
+    return result.stdout.splitlines()[-1].split()
+
+
+def test_package_import_is_lazy() -> None:
+    assert loaded_modules("import src", ["src.config", "pygame", "numba", "numpy"]) == []
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numba"])
+def test_engine_does_not_load_gui(backend: str) -> None:
+    code = (
+        "from src.engines import GameEngine\n"
+        "from src.misc.states import Backend, Mode\n"
+        "from src.misc.type_aliases import Size\n"
+        f"engine = GameEngine(size=Size(width=8, height=8), backend=Backend({backend!r}))\n"
+        "engine.mode = Mode.MOORE\n"
+        "engine.process()"
+    )
+    loaded = loaded_modules(code, ["pygame", "src.interfaces", "src.main", "numba"])
+
+    assert loaded == ([] if backend == "numpy" else ["numba"])
+
+
+def test_cli_help_does_not_load_pygame() -> None:
+    code = "from src.cli import run\ntry:\n    run(['--help'])\nexcept SystemExit:\n    pass"
+    assert loaded_modules(code, ["pygame", "numba"]) == []
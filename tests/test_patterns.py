@@ -0,0 +1,190 @@
+from itertools import groupby
+from pathlib import Path
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.engines import Case, close_engine, new_engine
+from benchmarks.patterns import PATTERNS, Pattern, parse_plaintext, soup
+from src.engines.patterns import DecodedPattern, place_pattern, read_pattern
+from src.headless import BatchResult, batch
+from src.misc.states import Backend, Mode
+
+GLIDER_MACROCELL = """[M2] (golly 4.2)
+#R B3/S23
+.*$..*$***$
+4 1 0 0 0
+"""
+
+
+def to_rle(field: np.ndarray, rule: str = "B3/S23") -> str:
+    rows = []
+    for row in field.tolist():
+        runs = [(len(list(group)), "o" if state else "b") for state, group in groupby(row)]
+        rows.append("".join(f"{count if count > 1 else ''}{tag}" for count, tag in runs))
+    height, width = field.shape
+    return f"#C written by the tests\nx = {width}, y = {height}, rule = {rule}\n" + "$\n".join(rows) + "!\n"
+
+
+def decoded_field(pattern: DecodedPattern) -> np.ndarray:
+    field = np.zeros((pattern.height, pattern.width), dtype=np.uint8)
+    place_pattern(pattern, field, offset=(0, 0))
+    return field
+
+
+@pytest.mark.parametrize("pattern", PATTERNS.values(), ids=list(PATTERNS))
+def test_rle_matches_plaintext(tmp_path: Path, pattern: Pattern) -> None:
+    cells = parse_plaintext(pattern.cells)
+    (tmp_path / "pattern.rle").write_text(to_rle(cells))
+    (tmp_path / "pattern.cells").write_text(f"!Name: {pattern.name}\n{pattern.cells.strip()}\n")
+
+    from_rle = read_pattern(tmp_path / "pattern.rle")
+    from_plaintext = read_pattern(tmp_path / "pattern.cells")
+
+    assert from_rle.rule == "B3/S23"
+    assert from_plaintext.rule is None
+    assert np.array_equal(decoded_field(from_rle), cells)
+    assert np.array_equal(decoded_field(from_plaintext), cells)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 20])
+def test_rle_streams_in_chunks(tmp_path: Path, chunk_size: int) -> None:
+    field = soup(300, 200, density=0.3, seed=2)
+    path = tmp_path / "soup.rle"
+    path.write_text(to_rle(field))
+
+    pattern = read_pattern(path, chunk_size=chunk_size)
+
+    assert (pattern.width, pattern.height) == (300, 200)
+    assert np.array_equal(decoded_field(pattern), field)
+
+
+def test_rle_long_runs_and_states(tmp_path: Path) -> None:
+    path = tmp_path / "states.rle"
+    path.write_text("x = 0, y = 0, rule = B2/S345/C30\n2.A$3$pA3B.xX!ignored $ text\n")
+
+    pattern = read_pattern(path)
+
+    assert (pattern.width, pattern.height) == (6, 5)
+    expected = np.zeros((5, 6), dtype=np.uint8)
+    expected[0, 2] = 1
+    expected[4, :5] = [25, 2, 2, 2, 0]
+    expected[4, 5] = 24 * 9 + 24  # `x` is the 9th prefix
+    assert np.array_equal(decoded_field(pattern), expected)
+
+
+def test_rle_rejects_unknown_tag(tmp_path: Path) -> None:
+    path = tmp_path / "broken.rle"
+    path.write_text("x = 3, y = 1\n3z!\n")
+
+    with pytest.raises(ValueError, match="unexpected 'z'"):
+        read_pattern(path)
+
+
+def test_life_106(tmp_path: Path) -> None:
+    path = tmp_path / "glider.lif"
+    path.write_text("#Life 1.06\n#D a glider\n0 -1\n1 0\n-1 1\n0 1\n1 1\n")
+
+    pattern = read_pattern(path, chunk_size=5)
+
+    assert np.array_equal(decoded_field(pattern), parse_plaintext(PATTERNS["glider"].cells))
+
+
+def test_life_106_rejects_other_versions(tmp_path: Path) -> None:
+    path = tmp_path / "glider.life"
+    path.write_text("#Life 1.05\n#P -1 -1\n.*\n")
+
+    with pytest.raises(ValueError, match=r"#Life 1\.06"):
+        read_pattern(path)
+
+
+def test_macrocell(tmp_path: Path) -> None:
+    path = tmp_path / "glider.mc"
+    path.write_text(GLIDER_MACROCELL)
+
+    pattern = read_pattern(path)
+
+    assert pattern.rule == "B3/S23"
+    assert np.array_equal(decoded_field(pattern), parse_plaintext(PATTERNS["glider"].cells))
+
+
+def test_macrocell_shares_nodes(tmp_path: Path) -> None:
+    path = tmp_path / "blocks.mc"
+    path.write_text("[M2]\n**$**$\n4 1 1 1 1\n5 2 0 0 2\n")
+
+    pattern = read_pattern(path)
+
+    block = np.zeros((8, 8), dtype=np.uint8)
+    block[:2, :2] = 1
+    quarter = np.tile(block, (2, 2))
+    expected = np.zeros((32, 32), dtype=np.uint8)
+    expected[:16, :16] = expected[16:, 16:] = quarter
+    assert np.array_equal(decoded_field(pattern), expected[:26, :26])
+
+
+def test_macrocell_states(tmp_path: Path) -> None:
+    path = tmp_path / "states.mc"
+    path.write_text("[M2]\n#R B2/S/C3\n1 1 2 0 1\n2 1 0 0 1\n")
+
+    pattern = read_pattern(path)
+
+    assert np.array_equal(decoded_field(pattern), [[1, 2, 0, 0], [0, 1, 0, 0], [0, 0, 1, 2], [0, 0, 0, 1]])
+
+
+def test_place_pattern_centered_and_at_offset() -> None:
+    pattern = DecodedPattern(xs=np.array([0, 2]), ys=np.array([0, 1]), states=np.array([1, 1]), width=3, height=2)
+    field = np.ones((6, 7), dtype=np.uint8)
+
+    place_pattern(pattern, field)
+    assert list(zip(*np.nonzero(field), strict=True)) == [(2, 2), (3, 4)]
+
+    place_pattern(pattern, field, offset=(4, 0))
+    assert list(zip(*np.nonzero(field), strict=True)) == [(0, 4), (1, 6)]
+
+    with pytest.raises(ValueError, match="does not fit"):
+        place_pattern(pattern, field, offset=(5, 0))
+    assert field.sum() == 2
+
+
+@pytest.mark.parametrize("backend", [Backend.NUMBA.value, Backend.BITPACKED.value, Backend.HASHLIFE.value])
+def test_engine_loads_pattern(tmp_path: Path, backend: str) -> None:
+    (tmp_path / "glider.rle").write_text(to_rle(parse_plaintext(PATTERNS["glider"].cells)))
+    pattern = read_pattern(tmp_path / "glider.rle")
+    engine = new_engine(Case(target=backend, size=32, start="soup", mode=Mode.MOORE, rule="b3/s23"), soup(32, 32, 0.5))
+    try:
+        engine.process()
+        engine.load_pattern(pattern, offset=(5, 6))
+
+        expected = np.zeros((32, 32), dtype=np.uint8)
+        expected[6:9, 5:8] = parse_plaintext(PATTERNS["glider"].cells)
+        assert engine.generation == 0
+        assert np.array_equal(engine.field, expected)
+        engine.process()
+        assert np.count_nonzero(engine.field) == 5
+    finally:
+        close_engine(engine)
+
+
+def test_engine_rejects_more_states_than_rule() -> None:
+    states = np.array([2], dtype=np.uint8)
+    pattern = DecodedPattern(xs=np.array([0]), ys=np.array([0]), states=states, width=1, height=1)
+    engine = new_engine(Case(target="numba", size=8, start="soup", mode=Mode.MOORE, rule="b3/s23"), soup(8, 8, 0.5))
+    try:
+        with pytest.raises(ValueError, match="state 2"):
+            engine.load_pattern(pattern)
+    finally:
+        close_engine(engine)
+
+
+# noinspection PyTypeChecker
+def test_batch_takes_rule_of_pattern(tmp_path: Path) -> None:
+    (tmp_path / "glider.mc").write_text(GLIDER_MACROCELL.replace("B3/S23", "B36/S23"))
+    runner = CliRunner()
+    args = ["-X", "20", "-Y", "20", "-G", "8", "--pattern", str(tmp_path / "glider.mc")]
+    result = runner.invoke(batch, args, standalone_mode=False)
+
+    assert result.exit_code == 0, result.output
+    summary: BatchResult = result.return_value
+    assert summary.population == 5
+    assert "rule: B36/S23" in result.output
@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.misc.profiler import FrameProfiler
+from src.misc.states import Phase
+
+
+def record(profiler: FrameProfiler, frames: int) -> None:
+    for _ in range(frames):
+        profiler.begin()
+        for phase in Phase:
+            profiler.lap(phase)
+        profiler.end()
+
+
+def test_ring_keeps_last_frames() -> None:
+    profiler = FrameProfiler(capacity=4)
+    record(profiler, 3)
+    assert profiler.history().shape == (3, len(Phase))
+
+    record(profiler, 7)
+    assert profiler.frames == 10
+    assert profiler.history().shape == (4, len(Phase))
+    assert (profiler.history() >= 0).all()
+
+
+def test_ring_is_chronological() -> None:
+    profiler = FrameProfiler(capacity=3)
+    for frame in range(5):
+        profiler.begin()
+        profiler._times[frame % 3, 0] = frame  # Marks the frame instead of a time
+        profiler.end()
+
+    assert profiler.history()[:, 0].tolist() == [2, 3, 4]
+
+
+def test_lap_adds_to_phase() -> None:
+    profiler = FrameProfiler(capacity=2)
+    profiler.begin()
+    profiler.lap(Phase.SIMULATE)
+    profiler.lap(Phase.DRAW_UI)
+    profiler.lap(Phase.SIMULATE)
+    profiler.end()
+
+    history = profiler.history()
+    assert history[0, list(Phase).index(Phase.DRAW_CELLS)] == 0
+    assert history[0, list(Phase).index(Phase.SIMULATE)] > 0
+
+
+def test_percentiles() -> None:
+    profiler = FrameProfiler(capacity=100)
+    assert profiler.percentiles(50, 99) == {phase: [0.0, 0.0] for phase in Phase}
+
+    record(profiler, 100)
+    profiler._times[:, 0] = np.arange(100)
+    times = profiler.percentiles(50, 99)
+    assert times[Phase.SIMULATE] == pytest.approx([49.5, 98.01])
+    assert list(times) == list(Phase)
+
+
+def test_export_csv_and_jsonl(tmp_path: Path) -> None:
+    profiler = FrameProfiler(capacity=2)
+    record(profiler, 3)
+
+    profiler.export(tmp_path / "frames.csv")
+    lines = (tmp_path / "frames.csv").read_text().splitlines()
+    assert lines[0] == "frame,simulate,draw-cells,draw-ui,display-flip"
+    assert [line.split(",")[0] for line in lines[1:]] == ["1", "2"]
+
+    profiler.export(tmp_path / "frames.jsonl")
+    rows = [json.loads(line) for line in (tmp_path / "frames.jsonl").read_text().splitlines()]
+    assert [row["frame"] for row in rows] == [1, 2]
+    assert rows[1]["simulate"] == profiler.history()[1, 0]
+
+
+def test_export_rejects_unknown_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="unknown format"):
+        FrameProfiler().export(tmp_path / "frames.txt")
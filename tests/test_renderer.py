@@ -0,0 +1,80 @@
+import numpy as np
+import pygame as pg
+import pytest
+
+from src.interfaces.renderer import CellRenderer, build_palette, dirty_rects
+from src.misc.type_aliases import Size
+from src.misc.utils import field_changes
+
+CELL_COLOR = (241, 196, 15)
+BACKGROUND = (50, 50, 50)
+
+
+@pytest.mark.parametrize("cell", [1, 2, 8])
+def test_renderer_matches_draw_rect(cell: int) -> None:
+    width, height = 23, 17
+    field = np.random.default_rng(0).integers(0, 2, size=(height, width), dtype=np.uint8)
+
+    expected = pg.Surface((width * cell, height * cell))
+    expected.fill(BACKGROUND)
+    for y, x in zip(*np.nonzero(field), strict=True):
+        pg.draw.rect(expected, CELL_COLOR, (x * cell, y * cell, cell - 1, cell - 1))
+
+    renderer = CellRenderer(Size(width=width, height=height), cell, build_palette(CELL_COLOR, BACKGROUND))
+    surface = renderer.render(field)
+
+    if cell == 1:
+        # `pg.draw.rect` draws nothing for rectangles of zero size, so the cells are single pixels here
+        assert np.array_equal(pg.surfarray.array3d(surface)[..., 0] == CELL_COLOR[0], field.T == 1)
+    else:
+        assert np.array_equal(pg.surfarray.array3d(surface), pg.surfarray.array3d(expected))
+
+
+def test_palette_fades_dying_states() -> None:
+    palette = build_palette(CELL_COLOR, BACKGROUND, states=4)
+
+    assert palette.tolist()[:2] == [list(BACKGROUND), list(CELL_COLOR)]
+    # Every dying state is closer to the background than the previous one
+    distances = np.abs(palette[1:].astype(int) - BACKGROUND).sum(axis=1)
+    assert (np.diff(distances) < 0).all()
+
+
+@pytest.mark.parametrize("cell", [1, 8])
+def test_update_repaints_only_changed_cells(cell: int) -> None:
+    width, height = 23, 17
+    rng = np.random.default_rng(1)
+    previous = rng.integers(0, 3, size=(height, width), dtype=np.uint8)
+    field = np.where(rng.random((height, width)) < 0.1, rng.integers(0, 3, size=(height, width)), previous)
+    field = field.astype(np.uint8)
+    births, deaths = field_changes(previous, field)
+
+    palette = build_palette(CELL_COLOR, BACKGROUND, states=3)
+    renderer = CellRenderer(Size(width=width, height=height), cell, palette)
+    renderer.render(previous)
+    updated = pg.surfarray.array2d(renderer.update(field, np.concatenate((births, deaths))))
+
+    expected = pg.surfarray.array2d(CellRenderer(Size(width=width, height=height), cell, palette).render(field))
+    assert np.array_equal(updated, expected)
+
+
+@pytest.mark.parametrize("limit", [1, 3, 64])
+def test_dirty_rects_cover_changed_cells(limit: int) -> None:
+    size, cell = Size(width=200, height=112), 8
+    cells = np.random.default_rng(2).integers(0, [size.width, size.height], size=(40, 2))
+
+    rects = dirty_rects(cells, size=size, cell=cell, limit=limit, tile=16)
+
+    assert 0 < len(rects) <= limit
+    for x, y in cells.tolist():
+        assert any(rect.contains((x * cell, y * cell, cell, cell)) for rect in rects)
+    bounds = pg.Rect(0, 0, size.width * cell, size.height * cell)
+    assert all(bounds.contains(rect) for rect in rects)
+
+
+def test_dirty_rects_join_neighboring_tiles() -> None:
+    cells = np.array([[0, 0], [16, 0], [33, 0], [70, 0]])
+
+    rects = dirty_rects(cells, size=Size(width=100, height=100), cell=2, limit=64, tile=16)
+
+    assert rects == [pg.Rect(0, 0, 96, 32), pg.Rect(128, 0, 32, 32)]
+    assert dirty_rects(cells[:0], size=Size(width=100, height=100), cell=2, limit=64) == []
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from src.engines.rules import NEIGHBORHOODS, RuleFamily, compile_rule, hensel_letters, totalistic_masks
+from src.misc.states import Rules
+
+
+def test_compile_rule_is_memoized() -> None:
+    assert compile_rule("b3/s23") is compile_rule("b3/s23")
+    assert not compile_rule("b3/s23").table.flags.writeable
+
+
+@pytest.mark.parametrize("rule", list(Rules))
+def test_totalistic_presets(rule: Rules) -> None:
+    b, s = rule.value.split("/")
+    compiled = compile_rule(rule.value)
+
+    assert compiled.family is RuleFamily.TOTALISTIC
+    assert compiled.states == 2
+    assert totalistic_masks(compiled.table) == (
+        sum(1 << int(i) for i in b[1:]),
+        sum(1 << int(i) for i in s[1:]),
+    )
+
+
+@pytest.mark.parametrize("rule", ["B3/S23", "S23/B3", "23/3", "b3/s2-3", "B3-/S23"])
+def test_notations_of_life(rule: str) -> None:
+    if "-" in rule:
+        with pytest.raises(ValueError, match="invalid"):
+            compile_rule(rule)
+    else:
+        assert np.array_equal(compile_rule(rule).table, compile_rule("b3/s23").table)
+
+
+def test_hensel_letters() -> None:
+    letters = hensel_letters()
+    expected = {0: 1, 1: 2, 2: 6, 3: 10, 4: 13, 5: 10, 6: 6, 7: 2, 8: 1}
+
+    assert len(letters) == NEIGHBORHOODS
+    for count, number in expected.items():
+        assert len({letter for c, letter in letters.values() if c == count}) == number
+    for mask, (count, _letter) in letters.items():
+        assert mask.bit_count() == count
+
+
+def test_isotropic_rule() -> None:
+    compiled = compile_rule("B2-a/S12")
+    letters = hensel_letters()
+
+    assert compiled.family is RuleFamily.ISOTROPIC
+    for mask, (count, letter) in letters.items():
+        assert compiled.table[0, mask] == (count == 2 and letter != "a")
+        assert compiled.table[1, mask] == (count in {1, 2})
+    with pytest.raises(ValueError, match="outer-totalistic"):
+        totalistic_masks(compiled.table)
+    # All the letters of a count are the same as the count itself
+    assert np.array_equal(compile_rule("B3ceaiknjqry/S2ceaikn3").table, compile_rule("b3/s23").table)
+
+
+def test_generations_rule() -> None:
+    compiled = compile_rule("B2/S/C3")  # Brian's Brain
+
+    assert compiled.family is RuleFamily.GENERATIONS
+    assert compiled.states == 3
+    assert np.array_equal(compiled.table, compile_rule("/2/3").table)
+    assert (compiled.table[1] == 2).all()
+    assert (compiled.table[2] == 0).all()
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "",
+        "b3",
+        "b9/s23",
+        "b3/s23/c1",
+        "b3/s2x",
+        "x3/s23",
+        "1/2/3/4",
+        "B3/S23C3",
+        "B3/S23C4",
+        "B2C3/S",
+        "b3/s233",
+    ],
+)
+def test_invalid_rules(rule: str) -> None:
+    with pytest.raises(ValueError, match="invalid"):
+        compile_rule(rule)
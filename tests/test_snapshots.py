@@ -0,0 +1,193 @@
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.engines import Case, close_engine, new_engine
+from benchmarks.patterns import soup
+from src.engines.core import check_cells
+from src.engines.rules import compile_rule
+from src.engines.snapshots import (
+    SnapshotInfo,
+    SnapshotWriter,
+    capture,
+    read_info,
+    read_snapshot,
+    write_snapshot,
+)
+from src.headless import BatchResult, batch
+from src.misc.states import Mode
+
+
+def info_of(field: np.ndarray, states: int = 2, generation: int = 7) -> SnapshotInfo:
+    height, width = field.shape
+    return SnapshotInfo(
+        width=width,
+        height=height,
+        rule="b3/s23" if states == 2 else f"B2/S/C{states}",
+        mode=Mode.NEUMANN,
+        generation=generation,
+        seed=42,
+        states=states,
+    )
+
+
+@pytest.mark.parametrize("states", [2, 5])
+@pytest.mark.parametrize("block_rows", [1, 5, 256])
+def test_snapshot_roundtrip(tmp_path: Path, states: int, block_rows: int) -> None:
+    field = np.random.default_rng(1).integers(0, states, size=(23, 37), dtype=np.uint8)
+    path = tmp_path / "game.snap"
+
+    write_snapshot(path, capture(field, info_of(field, states)), block_rows=block_rows)
+    info, loaded = read_snapshot(path)
+
+    assert info == info_of(field, states)
+    assert read_info(path) == info
+    assert np.array_equal(loaded, field)
+    assert [file.name for file in tmp_path.iterdir()] == ["game.snap"]
+
+
+def test_capture_does_not_share_the_field() -> None:
+    field = soup(16, 8, density=0.5)
+    snapshot = capture(field, info_of(field))
+    field[:] = 0
+
+    assert snapshot.packed
+    assert snapshot.cells.shape == (8, 2)
+    assert np.unpackbits(snapshot.cells, axis=1).any()
+
+
+def test_failed_write_keeps_previous_snapshot(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "game.snap"
+    previous = soup(20, 10, density=0.5, seed=1)
+    write_snapshot(path, capture(previous, info_of(previous)))
+
+    def fail(*_args: object) -> None:
+        msg = "disk full"
+        raise OSError(msg)
+
+    monkeypatch.setattr("os.fsync", fail)
+    field = soup(20, 10, density=0.5, seed=2)
+    with pytest.raises(OSError, match="disk full"):
+        write_snapshot(path, capture(field, info_of(field)))
+
+    assert np.array_equal(read_snapshot(path)[1], previous)
+    assert [file.name for file in tmp_path.iterdir()] == ["game.snap"]
+
+
+def test_read_rejects_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "game.snap"
+    path.write_bytes(b"not a snapshot at all")
+
+    with pytest.raises(ValueError, match="not a snapshot"):
+        read_snapshot(path)
+    with pytest.raises(ValueError, match="not a snapshot"):
+        read_info(path)
+
+
+def test_read_rejects_damaged_snapshot(tmp_path: Path) -> None:
+    field = soup(64, 64, density=0.5)
+    path = tmp_path / "game.snap"
+    write_snapshot(path, capture(field, info_of(field)), block_rows=16)
+    data = bytearray(path.read_bytes())
+    data[-20:] = bytes(20)
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="damaged at the row 48"):
+        read_snapshot(path)
+
+
+def test_read_decodes_into_field_block_by_block(tmp_path: Path) -> None:
+    field = soup(2048, 2048, density=0.3)
+    path = tmp_path / "game.snap"
+    write_snapshot(path, capture(field, info_of(field)))
+    target = np.zeros_like(field)
+
+    tracemalloc.start()
+    read_snapshot(path, target)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert np.array_equal(target, field)
+    assert peak < field.nbytes / 4  # About one unpacked block of 256 rows
+
+
+def test_writer_keeps_newest_snapshot(tmp_path: Path) -> None:
+    path = tmp_path / "game.snap"
+    writer = SnapshotWriter(level=1)
+    fields = [soup(300, 300, density=0.5, seed=seed) for seed in range(5)]
+    for generation, field in enumerate(fields):
+        writer.save(path, capture(field, info_of(field, generation=generation)))
+
+    assert writer.flush(timeout=30)
+    assert 1 <= writer.written <= 5
+    assert writer.error is None
+    info, loaded = read_snapshot(path)
+    assert info.generation == 4
+    assert np.array_equal(loaded, fields[-1])
+
+
+@pytest.mark.parametrize("backend", ["numba", "bitpacked", "sparse"])
+def test_engine_resumes_from_snapshot(tmp_path: Path, backend: str) -> None:
+    path = tmp_path / "game.snap"
+    case = Case(target=backend, size=48, start="soup", mode=Mode.NEUMANN, rule="B36/S23")
+    engine = new_engine(case, soup(48, 48, density=0.4, seed=3))
+    try:
+        for _ in range(10):
+            engine.process()
+        write_snapshot(path, capture(engine.field, engine.snapshot_info()))
+        for _ in range(5):
+            engine.process()
+        expected = engine.field.copy()
+    finally:
+        close_engine(engine)
+
+    other = Case(target=backend, size=48, start="soup", mode=Mode.MOORE, rule="b3/s23")
+    engine = new_engine(other, soup(48, 48, density=0.5, seed=4))
+    try:
+        info = engine.load_snapshot(path)
+        assert info.generation == engine.generation == 10
+        assert (engine.preset, engine.mode) == ("B36/S23", Mode.NEUMANN)
+        for _ in range(5):
+            engine.process()
+        assert np.array_equal(engine.field, expected)
+    finally:
+        close_engine(engine)
+
+
+def test_engine_rejects_snapshot_of_other_size(tmp_path: Path) -> None:
+    path = tmp_path / "game.snap"
+    field = soup(20, 10, density=0.5)
+    write_snapshot(path, capture(field, info_of(field)))
+    engine = new_engine(Case(target="numba", size=16, start="soup", mode=Mode.MOORE, rule="b3/s23"), soup(16, 16, 0.5))
+    try:
+        with pytest.raises(ValueError, match="20x10, expected 16x16"):
+            engine.load_snapshot(path)
+    finally:
+        close_engine(engine)
+
+
+# noinspection PyTypeChecker
+def test_batch_saves_and_resumes(tmp_path: Path) -> None:
+    path = tmp_path / "batch.snap"
+    width, height, seed = 41, 29, 5
+    runner = CliRunner()
+    args = ["-X", width, "-Y", height, "-S", seed, "-G", 12, "-R", "B36/S23", "-Z", 4, "-V", path]
+    first = runner.invoke(batch, [str(arg) for arg in args], standalone_mode=False)
+
+    assert first.exit_code == 0, first.output
+    summary: BatchResult = first.return_value
+    assert summary.snapshots >= 1
+    assert read_info(path).generation == 12
+
+    second = runner.invoke(batch, ["-U", str(path), "-G", "8"], standalone_mode=False)
+
+    assert second.exit_code == 0, second.output
+    assert "last generation: 20" in second.output
+    field = np.random.default_rng(seed).integers(0, 2, size=(height, width), dtype=np.uint8)
+    table = compile_rule("B36/S23").table
+    for _ in range(20):
+        field, _ = check_cells(field, np.zeros_like(field), width, height, table, "Moore")
+    assert second.return_value.population == np.count_nonzero(field)
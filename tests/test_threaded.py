@@ -0,0 +1,144 @@
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.engines import Case, close_engine, new_engine
+from benchmarks.patterns import GOSPER_GUN, place
+from src.engines import GameEngine
+from src.engines.core import check_cells
+from src.engines.rules import compile_rule
+from src.engines.snapshots import SnapshotInfo
+from src.engines.threaded import FrameQueue, Generation, Simulation
+from src.misc.states import Backend, Mode
+
+
+def generation(number: int) -> Generation:
+    field = np.zeros((4, 4), dtype=np.uint8)
+    info = SnapshotInfo(width=4, height=4, rule="b3/s23", mode=Mode.MOORE, generation=number, seed=None, states=2)
+    changes = np.array([[number, number]])
+    return Generation(number=number, field=field, cells=[], changes=changes, states=2, info=info)
+
+
+def wait_for(simulation: Simulation, number: int, timeout: float = 60) -> Generation:
+    end = time.perf_counter() + timeout
+    while time.perf_counter() < end:
+        taken = simulation.take()
+        if taken is not None and taken.number >= number:
+            return taken
+        time.sleep(0.001)
+    msg = f"no generation {number} in {timeout} s"
+    raise TimeoutError(msg)
+
+
+def test_frame_queue_keeps_changes_of_dropped() -> None:
+    queue = FrameQueue(maxsize=2)
+    for number in range(1, 4):
+        queue.put(generation(number))
+
+    assert len(queue) == 2
+    assert queue.dropped == 1
+    taken = queue.take()
+    assert taken is not None
+    assert taken.number == 3
+    assert taken.changes.tolist() == [[1, 1], [2, 2], [3, 3]]
+    assert queue.dropped == 2
+    assert queue.take() is None
+
+
+def test_frame_queue_of_one() -> None:
+    queue = FrameQueue(maxsize=1)
+    queue.put(generation(1))
+    queue.put(generation(2))
+
+    taken = queue.take()
+    assert taken is not None
+    assert taken.number == 2
+    assert taken.changes.tolist() == [[1, 1], [2, 2]]
+
+
+@pytest.mark.parametrize("backend", [Backend.NUMBA, Backend.SPARSE])
+def test_simulation_matches_check_cells(backend: Backend) -> None:
+    field = place(GOSPER_GUN, 64, 64)
+    engine = new_engine(Case(target=backend.value, size=64, start="gosper-gun", mode=Mode.MOORE, rule="b3/s23"), field)
+    simulation = Simulation(engine, paused=lambda: False, queue_size=1)
+    try:
+        simulation.start()
+        taken = wait_for(simulation, 30)
+    finally:
+        simulation.stop()
+        close_engine(engine)
+
+    expected = field
+    table = compile_rule("b3/s23").table
+    for _ in range(taken.number):
+        expected, _ = check_cells(expected, np.zeros_like(expected), 64, 64, table, "Moore")
+    assert np.array_equal(taken.field, expected)
+    assert simulation.queue.dropped > 0
+
+
+def test_simulation_waits_while_paused() -> None:
+    paused = True
+    engine = new_engine(
+        Case(target="numpy", size=32, start="soup-0.5", mode=Mode.MOORE, rule="b3/s23"),
+        np.ones((32, 32), dtype=np.uint8),
+    )
+    simulation = Simulation(engine, paused=lambda: paused)
+    try:
+        simulation.start()
+        time.sleep(0.05)
+        assert simulation.take() is None
+        assert engine.generation == 0
+
+        paused = False
+        assert wait_for(simulation, 1).number >= 1
+    finally:
+        simulation.stop()
+        close_engine(engine)
+
+
+def test_simulation_applies_changes_between_generations() -> None:
+    field = place(GOSPER_GUN, 64, 64)
+    engine = new_engine(Case(target="numba", size=64, start="gosper-gun", mode=Mode.MOORE, rule="b3/s23"), field)
+    paused = True
+    simulation = Simulation(engine, paused=lambda: paused, queue_size=1)
+
+    def change(engine: GameEngine) -> None:
+        engine.preset = "b36/s23"
+        engine.mode = Mode.NEUMANN
+
+    try:
+        simulation.start()
+        simulation.submit(change)
+        end = time.perf_counter() + 10
+        while engine.mode != Mode.NEUMANN and time.perf_counter() < end:  # Applied even while paused
+            time.sleep(0.001)
+        assert engine.snapshot_info().rule == "b36/s23"
+        assert engine.generation == 0
+
+        paused = False
+        taken = wait_for(simulation, 1)
+    finally:
+        simulation.stop()
+        close_engine(engine)
+
+    assert taken.info.generation == taken.number
+    assert (taken.info.rule, taken.info.mode) == ("b36/s23", Mode.NEUMANN)
+
+
+def test_simulation_raises_error_of_thread() -> None:
+    engine = new_engine(
+        Case(target="hashlife", size=32, start="soup-0.5", mode=Mode.MOORE, rule="b3/s23"),
+        np.ones((32, 32), dtype=np.uint8),
+    )
+    engine.preset = "B0/S8"
+    simulation = Simulation(engine, paused=lambda: False)
+    try:
+        simulation.start()
+        end = time.perf_counter() + 10
+        while simulation.running and time.perf_counter() < end:  # The thread stops by itself
+            time.sleep(0.001)
+        with pytest.raises(ValueError, match="B0"):
+            simulation.take()
+    finally:
+        close_engine(engine)